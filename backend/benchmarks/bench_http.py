@@ -0,0 +1,130 @@
+"""
+HTTP benchmark: requests/sec and p99 latency of /signin and /profile/<id>
+under the dev server and the production (waitress) server.
+
+Each mode runs `api.serve_http` in a child process, with MongoDB replaced by
+mongomock and seeded with one student. The parent drives it from CONCURRENCY
+client threads over keep-alive connections.
+
+Run from the backend directory:
+    python -m benchmarks.bench_http [seconds-per-endpoint]
+"""
+import argparse
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+CONCURRENCY = 16
+ANDREW_ID = "bench"
+PASSWORD = "bench-password"
+
+
+def serve(mode, port):
+    """Child process: seed an in-memory database and serve the REST API"""
+    import logging
+
+    import mongomock
+    import pymongo
+    from werkzeug.security import generate_password_hash
+
+    # api.py connects at import time; swap in an in-memory client (the Atlas URI is ignored)
+    pymongo.MongoClient = lambda *args, **kwargs: mongomock.MongoClient()
+    import api
+
+    api.users_collection.insert_one({
+        'andrewID': ANDREW_ID,
+        'password': generate_password_hash(PASSWORD),
+        'first_name': 'Bench',
+        'profile': {'program': 'EAI', 'courses': {'semesters': []}}
+    })
+    if mode == "production":
+        api.serve_http("production", port)
+    else:
+        logging.getLogger("werkzeug").setLevel(logging.DEBUG)
+        api.serve_http("dev", port)
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def drive(port, method, path, body, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    payload = json.dumps(body) if body is not None else None
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                latencies.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException):
+                errors.append("connection")
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(CONCURRENCY)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float("nan")
+    return len(latencies) / duration, p99, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("duration", nargs="?", type=float, default=5.0)
+    parser.add_argument("--serve", choices=["dev", "production"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    endpoints = [
+        ("POST", "/signin", {"andrew_ID": ANDREW_ID, "password": PASSWORD}),
+        ("GET", f"/profile/{ANDREW_ID}", None),
+    ]
+    for mode in ("dev", "production"):
+        port = free_port()
+        child = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_http", "--serve", mode, "--port", str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            for method, path, body in endpoints:
+                rps, p99, errors = drive(port, method, path, body, args.duration)
+                print(f"{mode:10s} {method:4s} {path:16s} {rps:8.0f} req/s   p99 {p99 * 1e3:8.1f} ms   errors {errors}")
+        finally:
+            child.terminate()
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
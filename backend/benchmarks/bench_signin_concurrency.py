@@ -0,0 +1,92 @@
+"""
+Concurrency check for the sign-in handoff.
+
+Fires SESSIONS parallel sign-ins against UserService on an in-process gRPC
+server. Each simulated Chainlit session then claims its own profile by
+andrew_id (GetUser) or by the one-shot /signin token (WatchSignIns, or GetUser
+when every watcher slot is taken, as the Chainlit client does). The run
+fails if any session receives another student's profile. It also reports
+throughput, and checks that the store stays bounded when a login storm is
+never claimed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_signin_concurrency [sessions]
+"""
+import json
+import logging
+import sys
+import time
+from concurrent import futures
+
+import grpc
+import mongomock
+import pymongo
+
+# api.py connects at import time; swap in an in-memory client (the Atlas URI is ignored)
+pymongo.MongoClient = lambda *args, **kwargs: mongomock.MongoClient()
+
+import api  # noqa: E402
+import user_pb2  # noqa: E402
+import user_pb2_grpc  # noqa: E402
+from sign_in_store import SignInStore  # noqa: E402
+
+
+def start_server(max_workers):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    user_pb2_grpc.add_UserServiceServicer_to_server(api.UserService(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def session(stub, index):
+    """Sign a student in, then claim the handoff the way a Chainlit session would"""
+    andrew_id = f"student{index:04d}"
+    token = api.sign_in_store.put({
+        'first_name': f"Student {index}",
+        'andrew_id': andrew_id,
+        'profile': {'program': 'EAI', 'student_number': index}
+    })
+    if index % 2:
+        response = stub.GetUser(user_pb2.UserRequest(andrew_id=andrew_id))
+    else:
+        stream = stub.WatchSignIns(user_pb2.UserRequest(token=token), wait_for_ready=True)
+        try:
+            response = next(stream)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.RESOURCE_EXHAUSTED:
+                raise
+            response = stub.GetUser(user_pb2.UserRequest(token=token))
+        stream.cancel()
+    profile = json.loads(response.profile_json)
+    return response.andrew_id == andrew_id and profile['student_number'] == index
+
+
+def main(sessions=1000):
+    logging.disable(logging.CRITICAL)
+    server, target = start_server(max_workers=64)
+    try:
+        with grpc.insecure_channel(target) as channel:
+            stub = user_pb2_grpc.UserServiceStub(channel)
+            start = time.perf_counter()
+            with futures.ThreadPoolExecutor(max_workers=64) as pool:
+                results = list(pool.map(lambda index: session(stub, index), range(sessions)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.stop(grace=None)
+
+    mismatches = results.count(False)
+    print(f"{sessions} parallel sign-ins in {elapsed:.2f}s ({sessions / elapsed:.0f}/s), "
+          f"wrong profiles: {mismatches}, left pending: {len(api.sign_in_store)}")
+
+    storm = SignInStore(ttl_seconds=60, max_entries=1000)
+    for index in range(50 * storm.max_entries):
+        storm.put({'andrew_id': f"storm{index}"})
+    print(f"unclaimed storm of {50 * storm.max_entries} sign-ins -> {len(storm)} entries held (bound {storm.max_entries})")
+
+    if mismatches or len(storm) > storm.max_entries:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
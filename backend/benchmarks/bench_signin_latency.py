@@ -0,0 +1,123 @@
+"""
+Latency benchmark: time from a successful sign-in to the Chainlit welcome message.
+
+Starts UserService on an in-process gRPC server, signs users in the same way
+/signin does and measures how long each client strategy takes to produce the
+welcome message:
+
+  polling    - the old loop: new channel + GetUser every POLL_INTERVAL seconds
+  streaming  - a single WatchSignIns stream held open while waiting
+
+MongoDB is replaced by mongomock so no database is needed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_signin_latency [rounds]
+"""
+import json
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import mongomock
+import pymongo
+
+# api.py connects at import time; swap in an in-memory client (the Atlas URI is ignored)
+pymongo.MongoClient = lambda *args, **kwargs: mongomock.MongoClient()
+
+import api  # noqa: E402
+import user_pb2  # noqa: E402
+import user_pb2_grpc  # noqa: E402
+
+POLL_INTERVAL = 1.0
+
+
+def start_server():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    user_pb2_grpc.add_UserServiceServicer_to_server(api.UserService(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def sign_in(andrew_id):
+    """What /signin does once the password has been checked"""
+    api.sign_in_store.put({
+        'first_name': andrew_id.title(),
+        'andrew_id': andrew_id,
+        'profile': {'program': 'EAI', 'interests': 'machine learning'}
+    })
+
+
+def welcome_message(response):
+    profile = json.loads(response.profile_json)
+    return f"Welcome {response.first_name}! I see you're a {profile['program']} student interested in {profile['interests']}."
+
+
+def polling_client(target, andrew_id):
+    while True:
+        channel = grpc.insecure_channel(target)
+        try:
+            response = user_pb2_grpc.UserServiceStub(channel).GetUser(user_pb2.UserRequest(andrew_id=andrew_id))
+            if response.andrew_id:
+                return welcome_message(response)
+        except grpc.RpcError:
+            pass
+        finally:
+            channel.close()
+        time.sleep(POLL_INTERVAL)
+
+
+def streaming_client(target, andrew_id):
+    with grpc.insecure_channel(target) as channel:
+        stream = user_pb2_grpc.UserServiceStub(channel).WatchSignIns(
+            user_pb2.UserRequest(andrew_id=andrew_id), wait_for_ready=True)
+        for response in stream:
+            if response.andrew_id:
+                stream.cancel()
+                return welcome_message(response)
+
+
+def measure(client, target, rounds):
+    latencies = []
+    for round_index in range(rounds):
+        done = threading.Event()
+        finished_at = []
+
+        andrew_id = f"student{round_index}"
+
+        def run_client():
+            client(target, andrew_id)
+            finished_at.append(time.perf_counter())
+            done.set()
+
+        thread = threading.Thread(target=run_client)
+        thread.start()
+        time.sleep(random.uniform(0.05, POLL_INTERVAL))  # The user signs in at an arbitrary moment
+        signed_in_at = time.perf_counter()
+        sign_in(andrew_id)
+        done.wait()
+        thread.join()
+        latencies.append(finished_at[0] - signed_in_at)
+    return latencies
+
+
+def main(rounds=10):
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+    server, target = start_server()
+    try:
+        for label, client in (("polling", polling_client), ("streaming", streaming_client)):
+            latencies = measure(client, target, rounds)
+            print(f"{label:9s} login-to-welcome: mean {statistics.mean(latencies) * 1e3:8.1f} ms   "
+                  f"max {max(latencies) * 1e3:8.1f} ms")
+    finally:
+        server.stop(grace=None)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,114 @@
+"""
+Load test: drive GetUser against a local UserService.
+
+By default an in-process server is started in the requested mode (mongomock
+replaces MongoDB); pass --target to hit an already running backend instead.
+WATCHERS idle WatchSignIns streams are held open during the run, the way
+waiting Chainlit sessions do. In thread mode each one pins a worker thread, up to
+GRPC_MAX_WATCHERS (half the workers by default); the rest are refused.
+
+Run from the backend directory:
+    python -m benchmarks.load_test_getuser --mode thread --watchers 10
+    python -m benchmarks.load_test_getuser --mode aio --watchers 10
+    python -m benchmarks.load_test_getuser --target localhost:50051
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import threading
+import time
+
+import grpc
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+
+
+def start_local_server(mode, max_workers):
+    """Start api.serve_grpc on a free port in a background thread and return its address"""
+    import os
+    import socket
+
+    import mongomock
+    import pymongo
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    os.environ.update(GRPC_MODE=mode, GRPC_PORT=str(port), GRPC_MAX_WORKERS=str(max_workers))
+    # api.py connects at import time; swap in an in-memory client (the Atlas URI is ignored)
+    pymongo.MongoClient = lambda *args, **kwargs: mongomock.MongoClient()
+    import api
+
+    threading.Thread(target=api.serve_grpc, daemon=True).start()
+    return api, f"127.0.0.1:{port}"
+
+
+async def wait_until_serving(channel, timeout=10):
+    stub = health_pb2_grpc.HealthStub(channel)
+    response = await stub.Check(health_pb2.HealthCheckRequest(service="UserService"),
+                                wait_for_ready=True, timeout=timeout)
+    return response.status == health_pb2.HealthCheckResponse.SERVING
+
+
+async def run(target, concurrency, duration, watchers):
+    import user_pb2
+    import user_pb2_grpc
+
+    async with grpc.aio.insecure_channel(target) as channel:
+        if not await wait_until_serving(channel):
+            raise SystemExit(f"{target} is not SERVING")
+        stub = user_pb2_grpc.UserServiceStub(channel)
+        streams = [stub.WatchSignIns(user_pb2.UserRequest(andrew_id=f"nobody{index}")) for index in range(watchers)]
+        await asyncio.sleep(0.2)  # Let the streams reach the server
+
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    await stub.GetUser(user_pb2.UserRequest(andrew_id="nobody"), timeout=5)
+                except grpc.aio.AioRpcError as e:
+                    if e.code() != grpc.StatusCode.NOT_FOUND:  # NOT_FOUND is the normal "not signed in" answer
+                        errors += 1
+                        continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        for stream in streams:
+            stream.cancel()
+
+    latencies.sort()
+    if not latencies:
+        print(f"0 successful calls, {errors} errors")
+        return
+    print(f"{len(latencies) / duration:8.0f} calls/s   p50 {statistics.median(latencies) * 1e3:7.2f} ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e3:7.2f} ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="address of a running backend; omit to start one in-process")
+    parser.add_argument("--mode", choices=["aio", "thread"], default="aio")
+    parser.add_argument("--max-workers", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--watchers", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    api = None
+    target = args.target
+    if target is None:
+        api, target = start_local_server(args.mode, args.max_workers)
+    try:
+        asyncio.run(run(target, args.concurrency, args.duration, args.watchers))
+    finally:
+        if api is not None:
+            api.stop_grpc(grace=1)
+
+
+if __name__ == "__main__":
+    main()
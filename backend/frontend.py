@@ -1,6 +1,9 @@
 import dash
 from dash import dcc, html, Input, Output
 import requests
+from urllib.parse import urlencode
+
+CHAINLIT_URL = "http://localhost:8000"  # Assuming Chainlit runs on port 8000
 
 app = dash.Dash(__name__)
 
@@ -17,7 +20,7 @@ app.layout = html.Div([
     # Section for interacting with the LLM using Chainlit
     html.Hr(),
     html.H3("LLM Interaction"),
-    html.Iframe(src="http://localhost:8000",  # Assuming Chainlit runs on port 8000
+    html.Iframe(id='chainlit-frame', src=CHAINLIT_URL,
                 style={"width": "100%", "height": "500px"}),
 
     # Section for other tools implemented using Langchain
@@ -26,6 +29,7 @@ app.layout = html.Div([
 
 @app.callback(
     Output('auth-response', 'children'),
+    Output('chainlit-frame', 'src'),
     Input('sign-up-button', 'n_clicks'),
     Input('sign-in-button', 'n_clicks'),
     [Input('username', 'value'), Input('password', 'value')]
@@ -36,13 +40,18 @@ def authenticate_user(sign_up_clicks, sign_in_clicks, username, password):
             'username': username,
             'password': password
         })
-        return response.text
+        return response.text, dash.no_update
     elif sign_in_clicks:
         response = requests.post('http://127.0.0.1:5000/signin', json={
-            'username': username,
+            'andrew_ID': username,
             'password': password
         })
-        return response.text
+        if response.ok:
+            # Reopen Chainlit with the one-shot token so that session claims this user's sign-in
+            token = response.json().get('handoff_token', '')
+            return response.text, f"{CHAINLIT_URL}/?{urlencode({'handoff_token': token})}"
+        return response.text, dash.no_update
+    return dash.no_update, dash.no_update
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -0,0 +1,141 @@
+import asyncio
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class SignInStore:
+    """
+    Keyed handoff of authenticated users from /signin to the Chainlit sessions.
+
+    Every sign-in is stored under a one-shot token and indexed by andrew_id, so a
+    session can claim exactly its own profile. Entries expire after ttl_seconds and
+    the store never holds more than max_entries, so a login storm cannot grow it
+    without bound. All operations are O(1) (amortized for eviction).
+
+    A claim naming neither a token nor an andrew_id matches nothing unless single_user
+    is set, in which case it takes the oldest pending sign-in. That is only safe when a
+    single person signs in at a time, e.g. a local development setup.
+    """
+
+    def __init__(self, ttl_seconds: float = 120.0, max_entries: int = 10000, clock=time.monotonic,
+                 single_user: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.single_user = single_user
+        self._clock = clock
+        self._entries = OrderedDict()  # token -> (expires_at, user_info), oldest first
+        self._tokens_by_user = {}  # andrew_id -> token of that user's pending sign-in
+        self._cond = threading.Condition()
+        self._listeners = set()  # Wake-up callbacks of wait_for_async callers
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def put(self, user_info: dict, token: str = None) -> str:
+        """Store a sign-in and return the one-shot token that claims it"""
+        token = token or secrets.token_urlsafe(16)
+        andrew_id = user_info.get('andrew_id', '')
+        with self._cond:
+            self._evict_expired()
+            # A newer sign-in replaces the user's pending one
+            stale_token = self._tokens_by_user.get(andrew_id)
+            if stale_token is not None:
+                self._discard(stale_token)
+            while len(self._entries) >= self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+            self._entries[token] = (self._clock() + self.ttl_seconds, user_info)
+            self._tokens_by_user[andrew_id] = token
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for wake in listeners:
+            wake()
+        return token
+
+    def claim(self, andrew_id: str = '', token: str = ''):
+        """
+        Remove and return the pending sign-in matching token or andrew_id.
+        With neither, the oldest pending sign-in is returned in single_user mode only.
+        Returns None if nothing matches.
+        """
+        with self._cond:
+            self._evict_expired()
+            return self._claim_locked(andrew_id, token)
+
+    def wait_for(self, andrew_id: str = '', token: str = '', timeout: float = None):
+        """Like claim, but block up to timeout seconds for a matching sign-in to arrive"""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                self._evict_expired()
+                user_info = self._claim_locked(andrew_id, token)
+                if user_info is not None:
+                    return user_info
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    async def wait_for_async(self, andrew_id: str = '', token: str = '', timeout: float = None):
+        """Coroutine version of wait_for, for grpc.aio handlers; waits without holding a thread"""
+        loop = asyncio.get_running_loop()
+        arrived = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(arrived.set)
+
+        with self._cond:
+            self._listeners.add(wake)
+        try:
+            deadline = None if timeout is None else loop.time() + timeout
+            while True:
+                arrived.clear()
+                user_info = self.claim(andrew_id, token)
+                if user_info is not None:
+                    return user_info
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+        finally:
+            with self._cond:
+                self._listeners.discard(wake)
+
+    def _claim_locked(self, andrew_id: str, token: str):
+        if token:
+            key = token
+        elif andrew_id:
+            key = self._tokens_by_user.get(andrew_id)
+        elif self.single_user:
+            key = next(iter(self._entries), None)
+        else:
+            return None  # Anonymous claims could hand one user's profile to another session
+
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            return None
+        if andrew_id and entry[1].get('andrew_id', '') != andrew_id:
+            return None  # The token belongs to somebody else
+        return self._discard(key)
+
+    def _discard(self, token: str) -> dict:
+        _, user_info = self._entries.pop(token)
+        andrew_id = user_info.get('andrew_id', '')
+        if self._tokens_by_user.get(andrew_id) == token:
+            del self._tokens_by_user[andrew_id]
+        return user_info
+
+    def _evict_expired(self):
+        # Entries are inserted with a constant TTL, so the oldest always expires first
+        now = self._clock()
+        while self._entries:
+            token, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._discard(token)
@@ -39,6 +39,11 @@ class UserServiceStub(object):
                 request_serializer=user__pb2.UserRequest.SerializeToString,
                 response_deserializer=user__pb2.UserInfo.FromString,
                 _registered_method=True)
+        self.WatchSignIns = channel.unary_stream(
+                '/UserService/WatchSignIns',
+                request_serializer=user__pb2.UserRequest.SerializeToString,
+                response_deserializer=user__pb2.UserInfo.FromString,
+                _registered_method=True)
 
 
 class UserServiceServicer(object):
@@ -50,6 +55,13 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchSignIns(self, request, context):
+        """Pushes each sign-in to the caller as soon as /signin succeeds
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +70,11 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=user__pb2.UserRequest.FromString,
                     response_serializer=user__pb2.UserInfo.SerializeToString,
             ),
+            'WatchSignIns': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchSignIns,
+                    request_deserializer=user__pb2.UserRequest.FromString,
+                    response_serializer=user__pb2.UserInfo.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'UserService', rpc_method_handlers)
@@ -95,3 +112,30 @@ class UserService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def WatchSignIns(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/UserService/WatchSignIns',
+            user__pb2.UserRequest.SerializeToString,
+            user__pb2.UserInfo.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,84 @@
+"""
+Load test: concurrent conversations through the tool-calling agent.
+
+Every conversation makes two fake LLM calls and one retriever-like tool call,
+each with simulated network latency. Two ways of running it are compared:
+
+  thread pool - the old handle_message: cl.make_async(agent_executor.invoke),
+                where every run holds a worker thread from start to finish
+  native async - agent_executor.ainvoke on the event loop
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_agent_concurrency
+"""
+import asyncio
+import time
+
+from chainlit import make_async
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
+from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import StructuredTool
+
+from benchmarks.fakes import FakeToolCallingChatModel
+
+LLM_LATENCY = 1.0
+TOOL_LATENCY = 0.3
+
+
+def search(query: str) -> str:
+    time.sleep(TOOL_LATENCY)
+    return f"course_code: 18-661\ncourse_name: Introduction to Machine Learning ({query})"
+
+
+async def asearch(query: str) -> str:
+    await asyncio.sleep(TOOL_LATENCY)
+    return f"course_code: 18-661\ncourse_name: Introduction to Machine Learning ({query})"
+
+
+def build_agent_executor(llm=None):
+    course_search = StructuredTool.from_function(
+        func=search, coroutine=asearch, name="course_search", description="Search for information about courses.")
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are an AI assistant helping a CMU-Africa student."),
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("user", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    agent = (
+        {
+            "input": lambda x: x["input"],
+            "agent_scratchpad": lambda x: format_to_openai_tool_messages(x["intermediate_steps"]),
+            "chat_history": lambda x: x["chat_history"]
+        }
+        | prompt
+        | (llm or FakeToolCallingChatModel(latency=LLM_LATENCY))
+        | OpenAIToolsAgentOutputParser()
+    )
+    return AgentExecutor(agent=agent, tools=[course_search])
+
+
+async def run_conversations(agent_executor, conversations, native_async):
+    inputs = {"input": "Recommend machine learning courses", "chat_history": []}
+    start = time.perf_counter()
+    if native_async:
+        await asyncio.gather(*(agent_executor.ainvoke(inputs) for _ in range(conversations)))
+    else:
+        await asyncio.gather(*(make_async(agent_executor.invoke)(inputs) for _ in range(conversations)))
+    return time.perf_counter() - start
+
+
+async def main():
+    agent_executor = build_agent_executor()
+    single_run = 2 * LLM_LATENCY + TOOL_LATENCY
+    print(f"one conversation takes ~{single_run:.2f}s of (simulated) network time")
+    for conversations in (10, 100, 400):
+        threaded = await run_conversations(agent_executor, conversations, native_async=False)
+        native = await run_conversations(agent_executor, conversations, native_async=True)
+        print(f"{conversations:4d} concurrent: thread pool {threaded:6.2f}s ({conversations / threaded:6.1f} conv/s)   "
+              f"native async {native:6.2f}s ({conversations / native:6.1f} conv/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
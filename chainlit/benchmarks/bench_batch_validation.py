@@ -0,0 +1,87 @@
+"""
+Benchmark: validating a cohort of PLANS degree plans after a requirements change.
+
+  one by one - validate_full_plan per plan (stdout silenced; it still prints)
+  batch      - DegreeValidator.validate_plans, all plans encoded as NumPy course
+               membership / unit matrices
+Plans are random: EAI and MSECE, four to six semesters of three to five courses, core
+and project courses drawn more often than the rest of the catalog. Median of REPEAT runs
+each, every run starting with only the plans alive.
+
+Both are timed again with the cyclic collector disabled around the call, which a batch
+job can do itself: the reports are ~20 new containers per plan, and the collections they
+trigger traverse the reports built so far. gc.freeze() after loading the plans does not
+help, since the reports are the objects being traversed.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_batch_validation
+"""
+import contextlib
+import gc
+import io
+import random
+import statistics
+import time
+
+from validators.models import DegreePlan, Program, SemesterPlan
+from validators.validator import DegreeValidator
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+PLANS = 50000
+REPEAT = 5
+
+
+def cohort(validator, count, seed=0):
+    picker = random.Random(seed)
+    catalog = validator.catalog
+    requirements = validator.program_requirements["EAI"]
+    required = [code for courses in requirements["core_sections"].values() for code in courses]
+    required = [code for code in required + list(requirements["project_areas"]) if code in catalog]
+    plans = []
+    for number in range(count):
+        semesters = [SemesterPlan(semester, [
+            catalog[picker.choice(required if picker.random() < 0.3 else catalog.codes)].to_course()
+            for _ in range(picker.randint(3, 5))]) for semester in range(1, picker.randint(4, 6) + 1)]
+        plans.append(DegreePlan(f"student-{number}", picker.choice([Program.MS_EAI, Program.MS_ECE]), semesters))
+    return plans
+
+
+def main():
+    validator = DegreeValidator(COURSE_DATA_PATH).with_program_requirements("EAI", core_units=60)
+    plans = cohort(validator, PLANS)
+    courses = sum(len(semester.courses) for plan in plans for semester in plan.semesters)
+    print(f"{PLANS} plans, {courses} planned courses")
+
+    def one_by_one():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [validator.validate_full_plan(plan) for plan in plans]
+
+    def batch():
+        return validator.validate_plans(plans)
+
+    # Every timed run starts with only the plans alive
+    timings = {}
+    for collecting in (True, False):
+        for _ in range(REPEAT):
+            for name, validate in (("one by one", one_by_one), ("batch", batch)):
+                if not collecting:
+                    gc.disable()
+                started = time.perf_counter()
+                reports = validate()
+                elapsed = time.perf_counter() - started
+                gc.enable()
+                timings.setdefault(f"{name}{'' if collecting else ', gc disabled'}", []).append(elapsed)
+                reports = None
+    batch_reports, single_reports = batch(), one_by_one()
+
+    print(f"{'method':<26}{'seconds':>9}{'plans/s':>10}")
+    for name, runs in timings.items():
+        seconds = statistics.median(runs)
+        print(f"{name:<26}{seconds:>9.2f}{PLANS / seconds:>10,.0f}")
+    print(f"reports identical: {batch_reports == single_reports}; "
+          f"valid {sum(report['is_valid'] for report in batch_reports)}, "
+          f"with prerequisite warnings {sum(any('earlier semester' in w for w in r['warnings']) for r in batch_reports)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Micro-benchmark: looking up a single course by code.
+
+Compares the old per-call `courses_df.to_dict('records')` scan with the
+indexed CourseCatalog lookup.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_catalog
+"""
+import random
+import timeit
+
+import pandas as pd
+
+from validators.catalog import CourseCatalog
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+
+
+def scan_lookup(courses_df, course_code):
+    return next(course for course in courses_df.to_dict('records') if course['course_code'] == course_code)
+
+
+def main(number=2000):
+    courses_df = pd.read_csv(COURSE_DATA_PATH)
+    catalog = CourseCatalog.from_dataframe(courses_df)
+    codes = list(catalog.codes)
+    random.seed(0)
+    queries = [random.choice(codes) for _ in range(number)]
+
+    scan_time = timeit.timeit(lambda: [scan_lookup(courses_df, code) for code in queries[:200]], number=1) / 200
+    index_time = timeit.timeit(lambda: [catalog[code] for code in queries], number=1) / number
+    build_time = timeit.timeit(lambda: CourseCatalog.from_dataframe(courses_df), number=5) / 5
+
+    print(f"Catalog size:            {len(catalog)} courses")
+    print(f"to_dict scan per lookup: {scan_time * 1e6:10.2f} us")
+    print(f"indexed per lookup:      {index_time * 1e6:10.2f} us")
+    print(f"speedup:                 {scan_time / index_time:10.0f}x")
+    print(f"one-off catalog build:   {build_time * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: prompt tokens per turn over a 200-turn conversation.
+
+  unbounded - the old module-level list, extended every turn and sent whole
+  window     - ChatHistory with the default token budget
+  window + summary - the same, folding dropped turns into a rolling summary
+                     (a fake summarizer that keeps the last 600 characters)
+
+Tokens are counted with the gpt-4o tokenizer (estimated if tiktoken cannot load it).
+Run from the chainlit directory:
+    python -m benchmarks.bench_chat_history
+"""
+import asyncio
+import random
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from utils.chat_history import ChatHistory, count_message_tokens, count_tokens
+
+TURNS = 200
+REPORT_AT = (1, 10, 25, 50, 100, 150, 200)
+SYSTEM_PROMPT_TOKENS = 1100  # Roughly the personalized system prompt plus tool schemas
+
+QUESTIONS = [
+    "Which machine learning courses are offered in the fall?",
+    "What do students say about 18-661?",
+    "Add 18-785 to semester 2.",
+    "Can I take 04-800-A without any prerequisites?",
+    "Show my degree plan.",
+    "Is my plan valid for graduation?",
+]
+ANSWER_SENTENCE = "This course covers the fundamentals and students describe the workload as demanding but fair. "
+
+
+async def fake_summarizer(summary, messages):
+    text = summary + " " + " ".join(message.content for message in messages)
+    return text[-600:]
+
+
+def prompt_tokens(history_messages, question):
+    return (SYSTEM_PROMPT_TOKENS + sum(count_message_tokens(m) for m in history_messages)
+            + count_tokens(question))
+
+
+async def run(label, history=None):
+    rng = random.Random(0)
+    unbounded = []
+    per_turn = []
+    for _ in range(TURNS):
+        question = rng.choice(QUESTIONS)
+        answer = ANSWER_SENTENCE * rng.randint(2, 8)
+        messages = history.messages() if history is not None else unbounded
+        per_turn.append(prompt_tokens(messages, question))
+        if history is not None:
+            await history.add_turn(question, answer)
+        else:
+            unbounded.extend([HumanMessage(content=question), AIMessage(content=answer)])
+
+    columns = "  ".join(f"{per_turn[turn - 1]:>7}" for turn in REPORT_AT)
+    print(f"{label:<18}{columns}   max {max(per_turn)}")
+
+
+async def main():
+    print("prompt tokens per turn")
+    print(f"{'turn':<18}" + "  ".join(f"{turn:>7}" for turn in REPORT_AT))
+    await run("unbounded")
+    await run("window", ChatHistory())
+    await run("window + summary", ChatHistory(summarizer=fake_summarizer))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark: size of course_search results and the latency they add to an agent turn.
+
+  rows  - the old course tool: FAISS over whole CSV rows (CSVLoader), top 4 rows
+  cards - HybridCourseRetriever over field chunks, one compact card per course
+
+Tokens are counted on the text the tool hands the agent (documents joined the way
+create_retriever_tool does). The real indexes need OpenAI embeddings, so both use
+stand-in indexes built with a bag-of-words fake embedder that sleeps EMBEDDING_LATENCY
+per query. The LLM cost of a result is not measured but modeled: every returned token
+is read again by the model in the follow-up call, at PREFILL_TOKENS_PER_SECOND, and
+usually sent again on later turns of the conversation.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_course_chunking
+"""
+import statistics
+import time
+
+from langchain.tools.retriever import create_retriever_tool
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.bench_hybrid_retrieval import COURSE_DATA_PATH, LABELED_QUERIES, StaticStore
+from benchmarks.fakes import KeywordFakeEmbeddings
+from helper import load_file
+from retrieval import CourseCorpus, HybridCourseRetriever
+from utils.chat_history import count_tokens
+
+EMBEDDING_LATENCY = 0.15
+# Assumed prompt processing rate of a hosted gpt-4o-class model
+PREFILL_TOKENS_PER_SECOND = 5000
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    rows_embeddings = KeywordFakeEmbeddings(size=1024)
+    rows = FAISS.from_documents(load_file(COURSE_DATA_PATH, "csv"), rows_embeddings)
+    rows_embeddings.latency = EMBEDDING_LATENCY
+    chunks_embeddings = KeywordFakeEmbeddings(size=1024)
+    chunks = FAISS.from_documents(load_file(COURSE_DATA_PATH, "course_csv"), chunks_embeddings)
+    chunks_embeddings.latency = EMBEDDING_LATENCY
+
+    tools = {
+        "rows": create_retriever_tool(rows.as_retriever(), "course_search", "Search for information about courses."),
+        "cards": create_retriever_tool(
+            HybridCourseRetriever(corpus=CourseCorpus(COURSE_DATA_PATH), vector_store=StaticStore(chunks)),
+            "course_search", "Search for information about courses."),
+    }
+
+    print(f"{len(LABELED_QUERIES)} queries, embedding latency {EMBEDDING_LATENCY * 1000:.0f} ms, "
+          f"modeled prefill {PREFILL_TOKENS_PER_SECOND} tokens/s")
+    print(f"{'tool':<7}{'tokens mean':>12}{'p95':>7}{'max':>7}{'search ms':>11}{'+ prefill ms':>14}")
+    for name, tool in tools.items():
+        tool.invoke({"query": "warm up"})
+        tokens, timings = [], []
+        for query, _ in LABELED_QUERIES:
+            started = time.perf_counter()
+            output = tool.invoke({"query": query})
+            timings.append(time.perf_counter() - started)
+            tokens.append(count_tokens(output))
+        search_ms = statistics.mean(timings) * 1000
+        prefill_ms = statistics.mean(tokens) / PREFILL_TOKENS_PER_SECOND * 1000
+        print(f"{name:<7}{statistics.mean(tokens):>12.0f}{percentile(tokens, 0.95):>7}{max(tokens):>7}"
+              f"{search_ms:>11.1f}{search_ms + prefill_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: end-to-end latency of a 5-course recommendation question, by how the agent
+gathers student reviews of the courses course_search found.
+
+  one by one    - what the old system prompt asked for: a student_reviews call per
+                  course, each in its own model round-trip
+  parallel      - all five student_reviews calls in one model message (parallel tool
+                  calls; AgentExecutor runs them concurrently, if the model does this)
+  combined      - one course_with_reviews call, which looks the courses up concurrently
+
+The model is a scripted fake (LLM_LATENCY per call); the course and review indexes are
+stand-ins built from the real data with a bag-of-words fake embedder that sleeps
+EMBEDDING_LATENCY per query.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_course_reviews
+"""
+import asyncio
+import statistics
+import time
+from typing import List
+
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
+from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
+from langchain.tools.retriever import create_retriever_tool
+from langchain_community.vectorstores import FAISS
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+from benchmarks.bench_hybrid_retrieval import COURSE_DATA_PATH, StaticStore
+from benchmarks.fakes import KeywordFakeEmbeddings, ScriptedToolCallingChatModel
+from helper import load_file, load_pdfs, source_files
+from retrieval import CourseCorpus, HybridCourseRetriever, course_reviews
+
+LLM_LATENCY = 1.0
+EMBEDDING_LATENCY = 0.15
+REPEAT = 3
+
+QUESTION = "Recommend five machine learning courses for next semester and tell me what students think of them"
+COURSES = ["18-661", "11-785", "18-785", "04-650", "18-797"]
+SEARCH = ("course_search", {"query": "machine learning"})
+SCRIPTS = {
+    "one by one": [[SEARCH]] + [[("student_reviews", {"query": code})] for code in COURSES],
+    "parallel": [[SEARCH], [("student_reviews", {"query": code}) for code in COURSES]],
+    "combined": [[SEARCH], [("course_with_reviews", {"courses": COURSES})]],
+}
+
+
+def build_tools():
+    embeddings = KeywordFakeEmbeddings(size=1024)
+    courses = FAISS.from_documents(load_file(COURSE_DATA_PATH, "course_csv"), embeddings)
+    reviews_by_file = load_pdfs(source_files("data/student_reviews", "pdf"), 1)
+    reviews = FAISS.from_documents([page for pages in reviews_by_file.values() for page in pages], embeddings)
+    embeddings.latency = EMBEDDING_LATENCY
+
+    course_retriever = HybridCourseRetriever(corpus=CourseCorpus(COURSE_DATA_PATH), vector_store=StaticStore(courses), k=5)
+    reviews_retriever = reviews.as_retriever()
+
+    @tool
+    async def course_with_reviews(courses: List[str]) -> str:
+        """Get the official details and the student reviews of a list of courses in one call."""
+        return await course_reviews(course_retriever, reviews_retriever, courses)
+
+    return embeddings, [
+        create_retriever_tool(course_retriever, "course_search", "Search for information about courses."),
+        create_retriever_tool(reviews_retriever, "student_reviews", "Search for student reviews of courses."),
+        course_with_reviews,
+    ]
+
+
+def build_agent_executor(llm, tools):
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are an AI assistant helping a CMU-Africa student."),
+        ("user", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    agent = (
+        {
+            "input": lambda x: x["input"],
+            "agent_scratchpad": lambda x: format_to_openai_tool_messages(x["intermediate_steps"]),
+        }
+        | prompt
+        | llm
+        | OpenAIToolsAgentOutputParser()
+    )
+    return AgentExecutor(agent=agent, tools=tools, return_intermediate_steps=True)
+
+
+async def main():
+    embeddings, tools = build_tools()
+    print(f"LLM latency {LLM_LATENCY * 1000:.0f} ms, embedding latency {EMBEDDING_LATENCY * 1000:.0f} ms, "
+          f"median of {REPEAT}")
+    print(f"{'reviews gathered':<18}{'seconds':>9}{'LLM calls':>11}{'embeds':>8}{'tool output chars':>19}")
+    for name, script in SCRIPTS.items():
+        timings = []
+        for _ in range(REPEAT):
+            llm = ScriptedToolCallingChatModel(latency=LLM_LATENCY, script=script)
+            agent_executor = build_agent_executor(llm, tools)
+            embeds_before = embeddings.calls
+            started = time.perf_counter()
+            result = await agent_executor.ainvoke({"input": QUESTION})
+            timings.append(time.perf_counter() - started)
+        output_chars = sum(len(str(observation)) for _, observation in result["intermediate_steps"])
+        print(f"{name:<18}{statistics.median(timings):>9.2f}{llm.calls:>11}"
+              f"{embeddings.calls - embeds_before:>8}{output_chars:>19}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
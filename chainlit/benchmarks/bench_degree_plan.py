@@ -0,0 +1,95 @@
+"""
+Benchmark: the degree-plan checks run while a student edits a plan.
+
+SESSIONS synthetic sessions each add EDITS courses to a plan (over six semesters) and,
+as the agent does, check every addition first and validate the whole plan after it.
+  addition check - validate_course_addition's plan lookups: completed courses, whether
+                   the course is already in the semester, the semester's units
+  full plan      - validate_full_plan
+each timed two ways:
+  rescan      - as before: sets and sums rebuilt from every course of the plan
+  incremental - DegreePlan's running aggregates (completed_before, has_course,
+                semester_units, units_in)
+stdout is silenced while timing (validate_full_plan still prints).
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_degree_plan
+"""
+import contextlib
+import io
+import random
+import statistics
+import time
+
+from benchmarks.check_degree_plan import full_validation
+from validators.models import DegreePlan, Program
+from validators.validator import DegreeValidator
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+SESSIONS = 200
+EDITS = 30
+REPEAT = 5
+
+
+def synthetic_sessions(catalog, count, seed=0):
+    picker = random.Random(seed)
+    return [[(picker.randint(1, 6), picker.choice(catalog.codes)) for _ in range(EDITS)] for _ in range(count)]
+
+
+def rescan_addition_check(catalog, plan, semester, course_code):
+    completed = set()
+    for sem in plan.semesters:
+        if sem.semester < semester:
+            completed.update(course.course_code for course in sem.courses)
+    catalog.prerequisite_graph.missing(course_code, completed)
+    units = 0
+    for sem in plan.semesters:
+        if sem.semester == semester:
+            course_code in [course.course_code for course in sem.courses]
+            units = sum(int(course.units) for course in sem.courses)
+    return course_code in completed, units
+
+
+def incremental_addition_check(catalog, plan, semester, course_code):
+    completed = plan.completed_before(semester)
+    catalog.prerequisite_graph.missing(course_code, completed)
+    plan.has_course(course_code, semester)
+    return course_code in completed, plan.semester_units(semester)
+
+
+def run(validator, sessions, addition_check, validate):
+    """Seconds spent in the addition checks and in the full-plan validations"""
+    checking = validating = 0.0
+    for number, edits in enumerate(sessions):
+        plan = DegreePlan(f"student-{number}", Program.MS_EAI, [])
+        for semester, course_code in edits:
+            started = time.perf_counter()
+            addition_check(validator.catalog, plan, semester, course_code)
+            checking += time.perf_counter() - started
+            plan.add_course(semester, validator.catalog[course_code].to_course())
+            started = time.perf_counter()
+            validate(validator, plan)
+            validating += time.perf_counter() - started
+    return checking, validating
+
+
+def main():
+    validator = DegreeValidator(COURSE_DATA_PATH)
+    sessions = synthetic_sessions(validator.catalog, SESSIONS)
+    methods = (("rescan", rescan_addition_check, full_validation),
+               ("incremental", incremental_addition_check, DegreeValidator.validate_full_plan))
+    operations = SESSIONS * EDITS
+    print(f"{SESSIONS} sessions x {EDITS} additions (plans end at {EDITS} courses), median of {REPEAT}")
+    print(f"{'method':<13}{'addition check us':>19}{'full plan us':>14}")
+    for name, addition_check, validate in methods:
+        timings = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(REPEAT):
+                timings.append(run(validator, sessions, addition_check, validate))
+        checking = statistics.median(timing[0] for timing in timings)
+        validating = statistics.median(timing[1] for timing in timings)
+        print(f"{name:<13}{checking / operations * 1e6:>19.2f}{validating / operations * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: opening a vector store and fetching the documents of a query.
+
+  pickle - FAISS.load_local of a pickled copy (the old format): the whole docstore is
+           unpickled up front, then documents are dict lookups
+  sqlite - indexes.load_version: nothing is decoded up front, each query reads and
+           decodes only its top-k documents from SQLite
+
+Measured on the course index and on a synthetic index of SYNTHETIC_DOCS documents.
+Queries use precomputed vectors, so no embedding time is included.
+
+Run from the chainlit directory (after `python ingest.py`):
+    python -m benchmarks.bench_docstore
+"""
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.bench_worker_memory import DIMENSIONS, SYNTHETIC_DOCS, build_synthetic
+from benchmarks.fakes import CountingFakeEmbeddings
+from helper import load_vector_store
+from indexes import INDEX_ROOT, current_version, load_version
+
+LOADS = 10
+QUERIES = 500
+K = 4
+
+
+def timed(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def bench(label, path, pickled):
+    embeddings = CountingFakeEmbeddings(size=DIMENSIONS)
+    vectors = np.random.default_rng(0).standard_normal((QUERIES, DIMENSIONS)).astype(np.float32)
+    print(f"\n{label}")
+    print(f"{'format':<8}{'open ms':>10}{'fetch top-%d us' % K:>16}{'search + fetch us':>20}")
+    for name, open_store in (
+        ("pickle", lambda: FAISS.load_local(pickled, embeddings, allow_dangerous_deserialization=True)),
+        ("sqlite", lambda: load_version(path, embeddings)),
+    ):
+        load_seconds, store = timed(open_store, LOADS)
+        _, positions = store.index.search(vectors, K)
+
+        started = time.perf_counter()
+        for row in positions:
+            for position in row:
+                store.docstore.search(store.index_to_docstore_id[int(position)])
+        fetch = (time.perf_counter() - started) / QUERIES
+
+        started = time.perf_counter()
+        for vector in vectors:
+            store.similarity_search_by_vector(vector.tolist(), k=K)
+        search = (time.perf_counter() - started) / QUERIES
+
+        print(f"{name:<8}{load_seconds * 1e3:>10.2f}{fetch * 1e6:>16.1f}{search * 1e6:>20.1f}")
+
+
+def main():
+    courses = os.path.join(INDEX_ROOT, "courses", current_version("courses"))
+    with tempfile.TemporaryDirectory(dir=INDEX_ROOT) as directory:
+        synthetic = os.path.join(directory, "synthetic")
+        build_synthetic(synthetic)
+        for label, path in (("courses (103 documents)", courses), (f"synthetic ({SYNTHETIC_DOCS} documents)", synthetic)):
+            pickled = os.path.join(directory, "pickled-" + os.path.basename(path))
+            load_vector_store(path, CountingFakeEmbeddings(size=DIMENSIONS)).save_local(pickled)
+            bench(label, path, pickled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: rebuilding the course index through the embedding cache.
+
+The course CSV documents are embedded into a FAISS store by a fake embedding
+model (0.2 s per request plus 5 ms per text, roughly OpenAI's batch latency).
+Every rebuild opens the cache file afresh, as a restarted process would:
+
+  cold         - empty cache
+  0% changed   - the same documents again
+  100% changed - every document edited
+  queries      - 200 retriever queries drawn from 20 distinct questions
+
+and reports the memory held by an in-memory LRU of MEMORY_VECTORS vectors of OpenAI's
+1536 dimensions, against the same vectors as lists of Python floats.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_embedding_cache
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.fakes import CountingFakeEmbeddings
+from helper import process_data
+from utils.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+REQUEST_LATENCY = 0.2
+TEXT_LATENCY = 0.005
+MEMORY_VECTORS = 10000
+
+
+def rebuild(label, cache_path, documents):
+    fake = CountingFakeEmbeddings(latency=REQUEST_LATENCY, latency_per_text=TEXT_LATENCY)
+    store = EmbeddingStore(cache_path)
+    started = time.perf_counter()
+    FAISS.from_documents(documents, CachedEmbeddings(fake, store, namespace="fake"))
+    elapsed = time.perf_counter() - started
+    store.close()
+    print(f"{label:<14}{len(documents):>6} docs {fake.texts_embedded:>6} embedded "
+          f"{fake.calls:>4} calls {elapsed:8.3f} s")
+
+
+def queries(cache_path):
+    rng = random.Random(0)
+    questions = [f"courses about topic {index}" for index in range(20)]
+    fake = CountingFakeEmbeddings(latency=REQUEST_LATENCY, latency_per_text=TEXT_LATENCY)
+    store = EmbeddingStore(cache_path)
+    embeddings = CachedEmbeddings(fake, store, namespace="fake")
+    started = time.perf_counter()
+    for _ in range(200):
+        embeddings.embed_query(rng.choice(questions))
+    elapsed = time.perf_counter() - started
+    store.close()
+    print(f"{'queries':<14}{200:>6} qrys {fake.texts_embedded:>6} embedded "
+          f"{fake.calls:>4} calls {elapsed:8.3f} s")
+
+
+def traced(build):
+    """Bytes still allocated once build() has returned (its result is kept alive until then)"""
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def memory(cache_path):
+    vectors = np.random.default_rng(0).random((MEMORY_VECTORS, 1536), dtype=np.float32)
+    items = {str(index): vector for index, vector in enumerate(vectors)}
+    store = EmbeddingStore(cache_path)
+    held = traced(lambda: store.put_many(items))
+    as_lists = traced(lambda: [vector.tolist() for vector in vectors])
+    print(f"LRU of {len(store._memory)} vectors: {held / 2**20:.0f} MB "
+          f"({store.memory_used / 2**20:.0f} MB counted, bound {store.memory_bytes / 2**20:.0f} MB); "
+          f"as float lists {as_lists / 2**20:.0f} MB")
+    store.close()
+
+
+def main():
+    documents = process_data(COURSE_DATA_PATH, file_type="csv")
+    edited = [doc.copy(update={"page_content": doc.page_content + "\nRevised for 2025."}) for doc in documents]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "embedding_cache.sqlite3")
+        rebuild("cold", cache_path, documents)
+        rebuild("0% changed", cache_path, documents)
+        rebuild("100% changed", cache_path, edited)
+        queries(cache_path)
+        memory(os.path.join(directory, "memory.sqlite3"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput benchmark: GetUser calls per second from the Chainlit process.
+
+  per-call channel - the old get_user_info: open a channel, call, close it
+  pooled (sync)    - the shared UserServiceClient.stub
+  pooled (aio)     - the shared UserServiceClient.aio_stub, CONCURRENCY calls in flight
+
+A minimal UserService answers on an in-process server so only the client
+side is measured.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_grpc_channel [calls]
+"""
+import asyncio
+import logging
+import sys
+import time
+from concurrent import futures
+
+import grpc
+import user_pb2
+import user_pb2_grpc
+
+from utils.grpc_client import UserServiceClient
+
+CONCURRENCY = 32
+
+
+class FixedUserService(user_pb2_grpc.UserServiceServicer):
+    def GetUser(self, request, context):
+        return user_pb2.UserInfo(andrew_id="student", first_name="Student", profile_json="{}")
+
+
+def per_call_channel(target, calls):
+    for _ in range(calls):
+        channel = grpc.insecure_channel(target)
+        try:
+            user_pb2_grpc.UserServiceStub(channel).GetUser(user_pb2.UserRequest())
+        finally:
+            channel.close()
+
+
+def pooled_sync(client, calls):
+    for _ in range(calls):
+        client.stub.GetUser(user_pb2.UserRequest())
+
+
+async def pooled_aio(client, calls):
+    async def worker(count):
+        for _ in range(count):
+            await client.aio_stub.GetUser(user_pb2.UserRequest())
+
+    await asyncio.gather(*(worker(calls // CONCURRENCY) for _ in range(CONCURRENCY)))
+    await client.aclose()
+
+
+def report(label, calls, elapsed):
+    print(f"{label:17s} {calls / elapsed:9.0f} calls/s")
+
+
+def main(calls=2000):
+    logging.disable(logging.CRITICAL)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=CONCURRENCY))
+    user_pb2_grpc.add_UserServiceServicer_to_server(FixedUserService(), server)
+    target = f"127.0.0.1:{server.add_insecure_port('127.0.0.1:0')}"
+    server.start()
+    try:
+        start = time.perf_counter()
+        per_call_channel(target, calls // 4)
+        report("per-call channel", calls // 4, time.perf_counter() - start)
+
+        client = UserServiceClient(target)
+        start = time.perf_counter()
+        pooled_sync(client, calls)
+        report("pooled (sync)", calls, time.perf_counter() - start)
+        client.close()
+
+        total = calls // CONCURRENCY * CONCURRENCY
+        start = time.perf_counter()
+        asyncio.run(pooled_aio(UserServiceClient(target), total))
+        report("pooled (aio)", total, time.perf_counter() - start)
+    finally:
+        server.stop(grace=None)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
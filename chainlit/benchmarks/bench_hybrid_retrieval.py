@@ -0,0 +1,120 @@
+"""
+Benchmark: recall@k and latency of course search on a small labeled query set.
+
+  vector        - FAISS similarity search over the course field chunks only
+  bm25          - the in-process BM25 index only
+  hybrid        - BM25 and vector rankings merged with reciprocal rank fusion
+  hybrid + fast - HybridCourseRetriever as used by the app: lookups of known course
+                  codes skip the embedding call and are answered directly, other
+                  queries naming a course rank it first
+
+The real index needs OpenAI embeddings, so a stand-in course index is built with a
+bag-of-words fake embedder that sleeps EMBEDDING_LATENCY per call like an API request.
+Absolute vector recall is therefore not representative; the fast path and fusion are.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_hybrid_retrieval
+"""
+import statistics
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.fakes import KeywordFakeEmbeddings
+from helper import load_file
+from retrieval import CourseCorpus, HybridCourseRetriever, course_code_of, reciprocal_rank_fusion
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+EMBEDDING_LATENCY = 0.15
+K = 4
+
+SECURITY = {"04-623", "04-720", "18-631", "14-735", "04-625", "18-731", "04-800-AH", "14-817", "04-622", "17-734"}
+MACHINE_LEARNING = {"18-661", "04-650", "18-785", "11-785", "18-797/11-755", "11-741", "04-800-AB", "18-640"}
+
+LABELED_QUERIES = [
+    # Exact codes
+    ("04-800-AF", {"04-800-AF"}),
+    ("18-661 prerequisites", {"18-661"}),
+    ("What is 04-801-T4 about?", {"04-801-T4"}),
+    ("reviews of 11-785", {"11-785"}),
+    ("Is 15-619 offered in the fall?", {"15-619"}),
+    ("How many units is 18-797?", {"18-797/11-755"}),
+    ("04-622 workload", {"04-622"}),
+    ("Compare 04-645 and 18-759", {"04-645", "18-759"}),
+    # Course names
+    ("applied cryptography", {"04-622"}),
+    ("recommender systems", {"04-800-B"}),
+    ("cloud infrastructure and computing", {"04-800-J"}),
+    ("natural language processing", {"11-611"}),
+    ("ethical hacking", {"04-720"}),
+    ("introduction to deep learning", {"11-785"}),
+    ("software architecture and design", {"04-634"}),
+    ("augmented and virtual reality", {"04-730"}),
+    # Topics
+    ("courses on cybersecurity and defending networks", SECURITY),
+    ("machine learning", MACHINE_LEARNING),
+    ("solar photovoltaic energy", {"18-865", "19-625"}),
+    ("robotics", {"18-799-L", "04-800-G"}),
+    ("entrepreneurship and startups", {"04-800-E", "04-616", "04-910", "04-603"}),
+    ("AI in healthcare", {"04-801-T4", "04-801-T3", "90-834"}),
+    ("geographic information systems mapping", {"90-834", "94-802"}),
+    ("big data analytics", {"18-788-K4", "04-637", "18-787-K3", "04-638"}),
+    ("courses similar to 18-661", MACHINE_LEARNING),
+]
+
+
+class StaticStore:
+    def __init__(self, store):
+        self.store = store
+
+    def get(self):
+        return self.store
+
+    async def aget(self):
+        return self.store
+
+
+def recall(found, relevant):
+    return len(set(found[:K]) & relevant) / min(len(relevant), K)
+
+
+def main():
+    corpus = CourseCorpus(COURSE_DATA_PATH).get()
+    embeddings = KeywordFakeEmbeddings(size=1024)
+    vector_store = FAISS.from_documents(load_file(COURSE_DATA_PATH, "course_csv"), embeddings)
+    embeddings.latency = EMBEDDING_LATENCY
+    retriever = HybridCourseRetriever(corpus=corpus, vector_store=StaticStore(vector_store), k=K)
+
+    def courses(chunks):
+        return list(dict.fromkeys(course_code_of(chunk) for chunk in chunks))
+
+    def vector(query):
+        return courses(vector_store.similarity_search(query, k=retriever.fetch_k))[:K]
+
+    def lexical(query):
+        return courses(corpus.lexical_search(query, retriever.fetch_k))[:K]
+
+    def hybrid(query):
+        dense = courses(vector_store.similarity_search(query, k=retriever.fetch_k))
+        return reciprocal_rank_fusion([courses(corpus.lexical_search(query, retriever.fetch_k)), dense])[:K]
+
+    def hybrid_fast(query):
+        return [course_code_of(document) for document in retriever.invoke(query)][:K]
+
+    print(f"{len(LABELED_QUERIES)} labeled queries, recall@{K}, embedding latency {EMBEDDING_LATENCY * 1000:.0f} ms")
+    print(f"{'method':<15}{'recall codes':>13}{'names':>8}{'topics':>8}{'all':>8}{'mean ms':>10}{'embeds':>8}")
+    for name, search in (("vector", vector), ("bm25", lexical), ("hybrid", hybrid), ("hybrid + fast", hybrid_fast)):
+        calls_before = embeddings.calls
+        recalls, timings = [], []
+        for query, relevant in LABELED_QUERIES:
+            started = time.perf_counter()
+            found = search(query)
+            timings.append(time.perf_counter() - started)
+            recalls.append(recall(found, relevant))
+        groups = [statistics.mean(recalls[0:8]), statistics.mean(recalls[8:16]), statistics.mean(recalls[16:])]
+        print(f"{name:<15}{groups[0]:>13.2f}{groups[1]:>8.2f}{groups[2]:>8.2f}{statistics.mean(recalls):>8.2f}"
+              f"{statistics.mean(timings) * 1000:>10.1f}{embeddings.calls - calls_before:>8}")
+
+
+if __name__ == "__main__":
+    main()
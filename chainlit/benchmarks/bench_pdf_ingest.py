@@ -0,0 +1,55 @@
+"""
+Benchmark: ingest wall time of the handbook directory with 1 vs N PDF parsing processes.
+
+  parse - helper.load_pdfs alone
+  build - initialize_vector_store from scratch into a temporary directory, with fake
+          embeddings (no network), so the time is parsing, FAISS and saving
+
+Process start-up is included: each run creates its own pool, as ingest.py does.
+Speedup is bounded by the cores available; `nproc` is printed alongside.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_pdf_ingest
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fakes import CountingFakeEmbeddings
+from helper import initialize_vector_store, load_pdfs, source_files
+
+HANDBOOK_PATH = "data/handbook"
+WORKERS = sorted({1, 2, 4, os.cpu_count() or 1})
+REPEAT = 3
+
+
+def timed(function):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def build(workers):
+    with tempfile.TemporaryDirectory() as directory:
+        initialize_vector_store(os.path.join(directory, "handbook"), HANDBOOK_PATH, CountingFakeEmbeddings(), "pdf", workers)
+
+
+def main():
+    paths = source_files(HANDBOOK_PATH, "pdf")
+    pages = sum(len(documents) for documents in load_pdfs(paths, 1).values())
+    print(f"{HANDBOOK_PATH}: {len(paths)} files, {pages} pages, {os.cpu_count()} cores, median of {REPEAT}")
+    print(f"{'workers':>7}{'parse s':>10}{'build s':>10}{'speedup':>9}")
+    baseline = None
+    for workers in WORKERS:
+        parse = timed(lambda: load_pdfs(paths, workers))
+        total = timed(lambda: build(workers))
+        baseline = baseline or total
+        print(f"{workers:>7}{parse:>10.2f}{total:>10.2f}{baseline / total:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
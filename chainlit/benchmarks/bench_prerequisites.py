@@ -0,0 +1,74 @@
+"""
+Benchmark: checking the prerequisites of PLANS synthetic degree plans.
+
+  regex each check - the old validate_course_addition: every check re-extracts the codes
+                     from the course's prerequisite text, and all of them are required
+  graph            - PrerequisiteGraph.plan_issues: AND/OR groups parsed once at catalog
+                     load, each check a few set lookups
+
+Plans are four semesters of four courses, sampled so that courses with prerequisites
+usually (not always) come after them. The two methods disagree on some plans by design:
+the graph drops anti-requisites and exclusions and accepts any alternative of an OR group.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_prerequisites
+"""
+import random
+import re
+import statistics
+import time
+
+from validators.catalog import CourseCatalog
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+PLANS = 1000
+REPEAT = 5
+OLD_CODE_PATTERN = r'\b\d{2}-\d{3}(?:-[A-Za-z0-9]+)?\b'
+
+
+def synthetic_plans(catalog, count, seed=0):
+    picker = random.Random(seed)
+    order = list(catalog.prerequisite_graph.order)
+    codes = [code for code in order if code in catalog]  # Roughly prerequisites first
+    plans = []
+    for _ in range(count):
+        courses = picker.sample(codes, 16)
+        if picker.random() < 0.7:
+            courses.sort(key=order.index)
+        plans.append([courses[index:index + 4] for index in range(0, 16, 4)])
+    return plans
+
+
+def regex_each_check(catalog, plan):
+    issues, completed = [], set()
+    for index, courses in enumerate(plan):
+        for code in courses:
+            for prerequisite in dict.fromkeys(re.findall(OLD_CODE_PATTERN, catalog[code].prerequisites_text)):
+                if prerequisite not in completed:
+                    issues.append((index, code, prerequisite))
+        completed.update(courses)
+    return issues
+
+
+def main():
+    started = time.perf_counter()
+    catalog = CourseCatalog.from_csv(COURSE_DATA_PATH)
+    load = time.perf_counter() - started
+    graph = catalog.prerequisite_graph
+    plans = synthetic_plans(catalog, PLANS)
+    print(f"catalog with prerequisite graph loaded in {load * 1000:.1f} ms; {PLANS} plans of 16 courses, "
+          f"median of {REPEAT}")
+    print(f"{'method':<18}{'total ms':>10}{'us/plan':>9}{'plans with issues':>19}")
+    for name, validate in (("regex each check", lambda plan: regex_each_check(catalog, plan)),
+                           ("graph", graph.plan_issues)):
+        timings = []
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            flagged = sum(bool(validate(plan)) for plan in plans)
+            timings.append(time.perf_counter() - started)
+        total = statistics.median(timings)
+        print(f"{name:<18}{total * 1000:>10.2f}{total / PLANS * 1e6:>9.1f}{flagged:>19}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: CourseRecommender over a synthetic population of PROFILES students.
+
+Each profile has a random program, a random interests phrase, one to four completed
+semesters of courses taken from the catalog, and asks for the next semester's courses.
+Course vectors come from a stand-in course index (field chunks embedded with the
+bag-of-words fake embedder) via CourseRecommender.from_vector_store, as in the app.
+Interest vectors are embedded before timing: in the app that is one embedding call per
+request (cached for repeated interests), the same as a course_search call needs.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_recommender
+"""
+import random
+import statistics
+import time
+from collections import Counter
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from benchmarks.fakes import KeywordFakeEmbeddings
+from helper import load_file
+from recommender import PROGRAM_DISCIPLINES, CourseRecommender
+from validators.catalog import CourseCatalog
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+PROFILES = 10000
+K = 5
+
+TOPICS = ["machine learning", "cybersecurity", "entrepreneurship", "data science", "robotics", "solar energy",
+          "software engineering", "networks", "healthcare", "finance", "cloud computing", "artificial intelligence"]
+
+
+def synthetic_profiles(catalog, count, seed=0):
+    picker = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        semesters = picker.randint(1, 4)
+        completed = picker.sample(catalog.codes, min(len(catalog), 4 * semesters))
+        profiles.append({
+            "program": picker.choice(list(PROGRAM_DISCIPLINES)),
+            "interests": " and ".join(picker.sample(TOPICS, 2)),
+            "semester": "Spring" if semesters % 2 else "Fall",
+            "completed": completed,
+        })
+    return profiles
+
+
+def main():
+    catalog = CourseCatalog.from_csv(COURSE_DATA_PATH)
+    embeddings = KeywordFakeEmbeddings(size=1024)
+    store = FAISS.from_documents(load_file(COURSE_DATA_PATH, "course_csv"), embeddings)
+
+    started = time.perf_counter()
+    recommender = CourseRecommender.from_vector_store(catalog, store)
+    build = time.perf_counter() - started
+
+    profiles = synthetic_profiles(catalog, PROFILES)
+    texts = sorted({profile["interests"] for profile in profiles})
+    interests = {text: np.asarray(vector) for text, vector in zip(texts, embeddings.embed_documents(texts))}
+
+    timings, sizes, codes = [], [], Counter()
+    started = time.perf_counter()
+    for profile in profiles:
+        before = time.perf_counter()
+        recommendations = recommender.recommend(
+            interests[profile["interests"]], profile["semester"], profile["completed"], profile["program"], K)
+        timings.append(time.perf_counter() - before)
+        sizes.append(len(recommendations))
+        codes.update(r.course_code for r in recommendations)
+    total = time.perf_counter() - started
+
+    timings.sort()
+    print(f"{len(catalog)} courses, {store.index.ntotal} index vectors, recommender built in {build * 1000:.1f} ms")
+    print(f"{PROFILES} profiles in {total:.2f} s ({PROFILES / total:,.0f} recommendations/s)")
+    print(f"per profile: median {statistics.median(timings) * 1e6:.0f} us, "
+          f"p99 {timings[int(0.99 * len(timings))] * 1e6:.0f} us, max {timings[-1] * 1e6:.0f} us")
+    print(f"results per profile: mean {statistics.mean(sizes):.2f} of {K}, empty {sizes.count(0)}; "
+          f"{len(codes)} distinct courses recommended")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: hit rate and agent time saved by the semantic response cache.
+
+A stream of questions (a few templates about popular courses, asked in different
+wordings by students of two programs with a handful of distinct plans) goes through
+SemanticResponseCache the way handle_message uses it. Agent runs are not executed;
+each miss is charged AGENT_SECONDS, a typical multi-tool GPT-4o turn. Halfway through,
+the knowledge version changes, as after an index rebuild.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_response_cache
+"""
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.fakes import KeywordFakeEmbeddings
+from utils.response_cache import SemanticResponseCache
+
+QUESTIONS = 2000
+AGENT_SECONDS = 6.0
+COURSES = ["18-661", "04-800", "18-785", "04-801", "18-664", "04-650", "18-668", "04-635",
+           "18-799", "04-638", "18-660", "04-602"]
+TEMPLATES = [
+    ["What are the prerequisites for {code}?", "prerequisites for {code}", "{code} prerequisites?"],
+    ["What do students say about {code}?", "reviews of {code}", "Student reviews {code}"],
+    ["When is {code} offered?", "{code} offered when", "Which semester is {code} offered in?"],
+]
+PROGRAMS = ["IT", "MSECE"]
+PLANS = ["plan-a", "plan-b", "plan-c"]
+
+
+def questions(rng):
+    # Popular courses are asked about much more often
+    weights = [1 / (rank + 1) for rank in range(len(COURSES))]
+    for _ in range(QUESTIONS):
+        code = rng.choices(COURSES, weights)[0]
+        wording = rng.choice(rng.choice(TEMPLATES)).format(code=code)
+        yield wording, (rng.choice(PROGRAMS), rng.choice(PLANS))
+
+
+async def main():
+    rng = random.Random(0)
+    cache = SemanticResponseCache(KeywordFakeEmbeddings(size=512), threshold=0.95)
+    agent_runs = 0
+    overhead = []
+
+    for index, (question, scope) in enumerate(questions(rng)):
+        version = 1 if index < QUESTIONS // 2 else 2
+        started = time.perf_counter()
+        vector = await cache.embed(question)
+        answer = cache.lookup(vector, scope, version)
+        overhead.append(time.perf_counter() - started)
+        if answer is None:
+            agent_runs += 1
+            cache.store(vector, scope, f"answer to {question}", AGENT_SECONDS, version)
+
+    hit_rate, seconds_saved = cache.stats()
+    print(f"{QUESTIONS} questions, {agent_runs} agent runs, {len(cache)} cached answers at the end")
+    print(f"hit rate        {hit_rate:.1%}")
+    print(f"agent time      {QUESTIONS * AGENT_SECONDS:8.0f} s without cache, "
+          f"{agent_runs * AGENT_SECONDS:8.0f} s with cache ({seconds_saved:.0f} s saved)")
+    print(f"lookup overhead p50 {statistics.median(overhead) * 1e3:.3f} ms   "
+          f"p95 {sorted(overhead)[int(0.95 * len(overhead))] * 1e3:.3f} ms (excluding the embedding API call)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: agent setup cost per new chat session.
+
+  per session - the old poll_for_user_sign_in + setup_chain: a ChatOpenAI client,
+                bound tool schemas, prompt and AgentExecutor built for every session
+                (twice, once with each model)
+  shared      - get_agent_executor() (built once per process) plus the per-user
+                prompt variables
+
+No request is sent to OpenAI; a placeholder key is used if none is configured.
+Run from the chainlit directory:
+    python -m benchmarks.bench_session_start
+"""
+import logging
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import main2  # noqa: E402
+
+SESSIONS = 200
+
+USER_INFO = {
+    "first_name": "Ada",
+    "profile": {
+        "program": "MSIT",
+        "starting_year": 2024,
+        "interests": "machine learning, cloud computing",
+        "previous_experience": "two years as a backend developer",
+    },
+}
+
+
+def per_session():
+    # Both builds the old code did for every session
+    main2.get_agent_executor.__wrapped__("gpt-4")
+    return main2.get_agent_executor.__wrapped__("gpt-4o"), main2.get_personalized_prompt_variables(USER_INFO)
+
+
+def shared():
+    return main2.get_agent_executor(), main2.get_personalized_prompt_variables(USER_INFO)
+
+
+def measure(setup):
+    timings = []
+    for _ in range(SESSIONS):
+        started = time.perf_counter()
+        setup()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<12} mean {statistics.mean(timings) * 1000:8.3f} ms   "
+          f"p95 {sorted(timings)[int(0.95 * len(timings))] * 1000:8.3f} ms")
+
+
+def main():
+    logging.disable(logging.INFO)
+    print(f"{SESSIONS} session starts")
+    report("per session", measure(per_session))
+
+    main2.get_agent_executor.cache_clear()
+    started = time.perf_counter()
+    main2.get_agent_executor()
+    print(f"first shared build {(time.perf_counter() - started) * 1000:.3f} ms (once per process)")
+    report("shared", measure(shared))
+
+
+if __name__ == "__main__":
+    main()
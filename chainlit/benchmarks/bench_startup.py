@@ -0,0 +1,74 @@
+"""
+Benchmark: import time of main2.py, i.e. Chainlit cold start / hot reload per worker.
+
+  lazy   - main2 as it is: index loading deferred to the first query
+  eager  - main2 plus loading all three indexes, which is what importing it used to do
+  --rev  - additionally time main2.py as of a git revision (e.g. the commit before
+           the ingest command), run against the current helper and data
+
+Each measurement is a fresh interpreter; the median of RUNS is reported.
+Indexes are built with ingest first, so no embedding happens. No request goes to OpenAI.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_startup [--rev <commit>]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+TIMED_IMPORT = """
+import time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{after}
+print(imported - started, time.perf_counter() - started)
+"""
+
+LOAD_ALL = "for store in {module}.vector_stores.values(): store.get()"
+
+
+def measure(module, after=""):
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"))
+    script = TIMED_IMPORT.format(module=module, after=after.format(module=module))
+    runs = []
+    for _ in range(RUNS):
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+        runs.append([float(value) for value in result.stdout.split()[-2:]])
+    return statistics.median(run[0] for run in runs), statistics.median(run[1] for run in runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rev", help="Also time main2.py from this git revision")
+    args = parser.parse_args()
+
+    # Make sure every index has a built version, as after `python ingest.py`
+    subprocess.run([sys.executable, "-c", "import main2\n" + LOAD_ALL.format(module="main2")],
+                   env=dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark")),
+                   capture_output=True, check=True)
+
+    print(f"median of {RUNS} fresh interpreters   import s   ready for first query s")
+    lazy = measure("main2")
+    print(f"{'lazy (import only)':<36}{lazy[0]:>9.2f}")
+    eager = measure("main2", LOAD_ALL)
+    print(f"{'eager (import + load indexes)':<36}{eager[0]:>9.2f}   {eager[1]:>9.2f}")
+
+    if args.rev:
+        source = subprocess.run(["git", "show", f"{args.rev}:./main2.py"], capture_output=True, text=True, check=True)
+        module = f"_main2_{args.rev.replace('~', '_').replace('^', '_')}"
+        with open(f"{module}.py", "w", encoding="utf-8") as f:
+            f.write(source.stdout)
+        try:
+            old = measure(module)
+            print(f"{'main2.py at ' + args.rev:<36}{old[0]:>9.2f}")
+        finally:
+            os.remove(f"{module}.py")
+
+
+if __name__ == "__main__":
+    main()
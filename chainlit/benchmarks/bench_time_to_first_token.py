@@ -0,0 +1,57 @@
+"""
+Benchmark: when does the user see the first token of the answer?
+
+Drives main2.stream_agent_response, the streaming loop of handle_message, with the
+agent running a fake tool-calling model with simulated latency, in a Chainlit HTTP
+context (nothing is sent to a browser). Time to first token is what the handler
+records in its agent_time_to_first_token_seconds histogram; it is compared with the
+full response time, when the old non-streaming handler could send anything. A run
+with a model that talks before its tool calls checks that the message shows only the answer.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_time_to_first_token
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from chainlit.context import init_http_context
+
+# main2 builds its OpenAI clients at import; no request is made with this key
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import main2  # noqa: E402
+from benchmarks.bench_agent_concurrency import LLM_LATENCY, build_agent_executor  # noqa: E402
+from benchmarks.fakes import FakeToolCallingChatModel  # noqa: E402
+
+RUNS = 10
+
+# A typical multi-course recommendation is a few hundred tokens long
+LONG_ANSWER = " ".join(["18-661 Introduction to Machine Learning: students found the projects demanding but rewarding."] * 25)
+
+
+async def measure(agent_executor):
+    inputs = {"input": "Recommend machine learning courses", "chat_history": []}
+    observed = main2.time_to_first_token.count, main2.time_to_first_token.total
+    thinking_msg = main2.cl.Message(content="Thinking...")
+    started = time.perf_counter()
+    response_msg, output, _ = await main2.stream_agent_response(agent_executor, inputs, thinking_msg, started)
+    elapsed = time.perf_counter() - started
+    assert output.strip() == LONG_ANSWER and main2.time_to_first_token.count == observed[0] + 1
+    assert response_msg.content == output
+    return main2.time_to_first_token.total - observed[1], elapsed
+
+
+async def main():
+    init_http_context()
+    agent_executor = build_agent_executor(FakeToolCallingChatModel(latency=LLM_LATENCY, final_answer=LONG_ANSWER))
+    results = [await measure(agent_executor) for _ in range(RUNS)]
+    await measure(build_agent_executor(FakeToolCallingChatModel(
+        latency=LLM_LATENCY, final_answer=LONG_ANSWER, preamble="Let me look up those courses first.")))
+    print(f"time to first token (streaming): {statistics.mean(r[0] for r in results):.2f}s")
+    print(f"full response (non-streaming):   {statistics.mean(r[1] for r in results):.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
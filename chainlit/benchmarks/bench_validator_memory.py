@@ -0,0 +1,54 @@
+"""
+Memory benchmark: per-session growth from building the degree validator.
+
+"before" mimics the old session setup, which built two DegreeValidator
+instances (one in poll_for_user_sign_in, one in setup_chain) per session.
+"after" uses the process-wide DegreeValidator.shared instance.
+
+Run from the chainlit directory:
+    python -m benchmarks.bench_validator_memory [sessions]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+from validators.validator import DegreeValidator
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (Linux), or 0 when unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def measure(label, make_session, sessions):
+    gc.collect()
+    tracemalloc.start()
+    rss_before = current_rss()
+    live_sessions = [make_session() for _ in range(sessions)]
+    gc.collect()
+    rss_after = current_rss()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:7s} RSS growth/session: {(rss_after - rss_before) / sessions / 1024:9.1f} KiB   "
+          f"python heap/session: {traced / sessions / 1024:9.1f} KiB")
+    return live_sessions
+
+
+def main(sessions=200):
+    # Warm up imports and the shared instance so neither side pays for them
+    DegreeValidator.shared(COURSE_DATA_PATH)
+
+    before = measure("before", lambda: (DegreeValidator(COURSE_DATA_PATH), DegreeValidator(COURSE_DATA_PATH)), sessions)
+    del before
+    measure("after", lambda: DegreeValidator.shared(COURSE_DATA_PATH), sessions)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,116 @@
+"""
+Benchmark: memory per Chainlit worker process holding the vector indexes.
+
+N worker processes each open the indexes and run a few queries, then report, while
+all N are alive, how much their RSS and PSS (proportional set size: shared pages
+divided among the processes sharing them) grew from loading the indexes:
+
+  pickle - FAISS.load_local of pickled copies (the old format): vectors read into
+           private memory, docstore unpickled
+  mmap   - indexes.load_version: memory-mapped vectors, SQLite docstore read per query
+
+The real indexes are small, so a synthetic index of SYNTHETIC_DOCS 1536-dimensional
+vectors with ~1 KB documents is loaded as well, to show how this scales.
+
+Run from the chainlit directory (after `python ingest.py`):
+    python -m benchmarks.bench_worker_memory
+"""
+import multiprocessing
+import os
+import tempfile
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from benchmarks.fakes import CountingFakeEmbeddings
+from helper import load_vector_store, save_vector_store
+from indexes import INDEX_ROOT, INDEX_SPECS, current_version, load_version
+
+WORKERS = (1, 4, 8)
+SYNTHETIC_DOCS = 20000
+DIMENSIONS = 1536
+
+
+def memory_kb():
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def build_synthetic(path):
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(DIMENSIONS)
+    index.add(rng.standard_normal((SYNTHETIC_DOCS, DIMENSIONS)).astype(np.float32))
+    ids = {position: f"doc-{position}" for position in range(SYNTHETIC_DOCS)}
+    docstore = InMemoryDocstore({
+        doc_id: Document(page_content=f"Course description {doc_id}. " + "lorem ipsum " * 80,
+                         metadata={"source": "synthetic.csv", "row": position})
+        for position, doc_id in ids.items()
+    })
+    save_vector_store(FAISS(CountingFakeEmbeddings(size=DIMENSIONS), index, docstore, ids), path)
+
+
+def pickled_copy(path, directory):
+    copy = os.path.join(directory, "pickled-" + os.path.basename(os.path.dirname(path)) + "-" + os.path.basename(path))
+    load_vector_store(path, CountingFakeEmbeddings(size=DIMENSIONS)).save_local(copy)
+    return copy
+
+
+def worker(mode, paths, ready, release, results):
+    embeddings = CountingFakeEmbeddings(size=DIMENSIONS)
+    before = memory_kb()
+    stores = []
+    for path in paths:
+        if mode == "pickle":
+            stores.append(FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True))
+        else:
+            stores.append(load_version(path, embeddings))
+    for store in stores:
+        for query in ("machine learning", "prerequisites", "workload"):
+            store.similarity_search(query, k=4)
+    ready.wait()  # Measure while every worker has its indexes open
+    after = memory_kb()
+    results.put((after["Rss"] - before["Rss"], after["Pss"] - before["Pss"]))
+    release.wait()
+
+
+def run(mode, paths, workers):
+    context = multiprocessing.get_context("spawn")
+    ready, release = context.Barrier(workers), context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, paths, ready, release, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    release.wait()
+    for process in processes:
+        process.join()
+    rss = sum(m[0] for m in measurements) / workers / 1024
+    pss = sum(m[1] for m in measurements) / 1024
+    print(f"{mode:<8}{workers:>8}   {rss:>14.1f}   {pss / workers:>14.1f}   {pss:>10.1f}")
+
+
+def main():
+    real = [os.path.join(INDEX_ROOT, name, current_version(name)) for name in INDEX_SPECS]
+    # Next to the real indexes, so both are on the same filesystem
+    with tempfile.TemporaryDirectory(dir=INDEX_ROOT) as directory:
+        synthetic = os.path.join(directory, "synthetic")
+        build_synthetic(synthetic)
+        pickled = {path: pickled_copy(path, directory) for path in real + [synthetic]}
+        for label, paths in (("the three app indexes", real), (f"+ synthetic {SYNTHETIC_DOCS} docs", real + [synthetic])):
+            print(f"\n{label}")
+            print(f"{'mode':<8}{'workers':>8}   {'RSS/worker MB':>14}   {'PSS/worker MB':>14}   {'PSS total':>10}")
+            for mode in ("pickle", "mmap"):
+                for workers in WORKERS:
+                    run(mode, [pickled[path] for path in paths] if mode == "pickle" else paths, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Check: DegreeValidator.validate_plans against validate_full_plan, plan by plan.
+
+PLANS random plans (both validated programs, one to six semesters, empty semesters,
+semesters out of order or listed twice, repeated courses, core and project courses,
+codes missing from the catalog) are
+validated in one batch and one at a time; every report must be identical. The same is
+checked for a plan meeting every requirement, with the requirements changed through
+with_program_requirements, and for an empty batch.
+Exits with status 1 if any expectation fails.
+
+Run from the chainlit directory:
+    python -m benchmarks.check_batch_validation
+"""
+import contextlib
+import io
+import random
+import sys
+
+from validators.models import Course, DegreePlan, Program, SemesterPlan
+from validators.validator import DegreeValidator
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+PLANS = 2000
+
+results = []
+
+
+def check(label, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    results.append(bool(ok))
+
+
+def random_plans(validator, count, seed=0):
+    picker = random.Random(seed)
+    catalog = validator.catalog
+    requirements = validator.program_requirements["EAI"]
+    required = [code for courses in requirements["core_sections"].values() for code in courses]
+    required = [code for code in required + list(requirements["project_areas"]) if code in catalog]
+    plans = []
+    for number in range(count):
+        semesters = []
+        for semester in sorted(picker.sample(range(1, 7), picker.randint(1, 6))):
+            courses = []
+            for _ in range(picker.randint(0, 6)):
+                draw = picker.random()
+                if draw < 0.05:
+                    courses.append(Course("99-999", "Transfer credit", 12, [], [], "EAI"))
+                else:
+                    code = picker.choice(required if draw < 0.4 else catalog.codes)
+                    courses.append(catalog[code].to_course())
+            semesters.append(SemesterPlan(semester, courses))
+        # Some plans list their semesters out of order, or one semester twice
+        if picker.random() < 0.2:
+            picker.shuffle(semesters)
+        if picker.random() < 0.1:
+            semesters.append(SemesterPlan(semesters[0].semester, [catalog[picker.choice(required)].to_course()]))
+        plans.append(DegreePlan(f"student-{number}", picker.choice([Program.MS_EAI, Program.MS_ECE]), semesters))
+    return plans
+
+
+def complete_plan(validator):
+    """An EAI plan meeting every requirement: a course from each core section, the projects, electives"""
+    catalog = validator.catalog
+    electives = [code for code in catalog.codes if catalog[code].units == 12
+                 and code not in ("18-751", "04-655", "18-661", "18-785", "04-654", "04-652", "04-950")][:6]
+    semesters = [["18-751", "04-655", "18-661", "18-785"], ["04-654", "04-652", "04-651", "04-653"],
+                 ["04-950"] + electives[:3], electives[3:]]
+    return DegreePlan("complete", Program.MS_EAI, [
+        SemesterPlan(number, [catalog[code].to_course() for code in codes]) for number, codes in enumerate(semesters, 1)])
+
+
+def mismatches(validator, plans):
+    with contextlib.redirect_stdout(io.StringIO()):
+        one_by_one = [validator.validate_full_plan(plan) for plan in plans]
+    batch = validator.validate_plans(plans)
+    return len(batch) != len(plans) or sum(a != b for a, b in zip(batch, one_by_one))
+
+
+def main():
+    validator = DegreeValidator(COURSE_DATA_PATH)
+    plans = random_plans(validator, PLANS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reports = [validator.validate_full_plan(plan) for plan in plans]
+    found = mismatches(validator, plans)
+    check(f"{PLANS} random plans, {sum(not report['is_valid'] for report in reports)} invalid and "
+          f"{sum(bool(report['warnings']) for report in reports)} with warnings, match validate_full_plan "
+          f"({found} mismatches)", found == 0)
+    complete = complete_plan(validator)
+    check("a plan meeting every requirement is valid in both",
+          validator.validate_plans([complete])[0]["is_valid"] and mismatches(validator, [complete]) == 0)
+
+    changed = validator.with_program_requirements(
+        "EAI", core_sections={"Intro to ML": ["18-661", "10-601"], "Security": ["18-631", "18-661"]},
+        project_areas=["04-651", "04-651", "04-950"], core_units=24)
+    check("with changed requirements (a code in two sections, a repeated project code)",
+          mismatches(changed, plans[:PLANS // 4]) == 0)
+    check("an empty batch gives no reports", validator.validate_plans([]) == [])
+    check("reports keep the order of the plans",
+          validator.validate_plans(plans[::-1])[::-1] == validator.validate_plans(plans))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
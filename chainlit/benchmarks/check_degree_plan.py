@@ -0,0 +1,177 @@
+"""
+Check: DegreePlan's running aggregates against full rescans of the plan.
+
+Random sequences of OPERATIONS add_course / remove_course calls (on a few SEQUENCES
+seeded plans, duplicates, unknown codes and missing semesters included) are applied
+to a plan, and after every call:
+  - units per semester, total units, units by course code and has_course match a
+    rescan of plan.semesters, whose order the constructor leaves as given
+  - completed_before / get_completed_courses match the courses of earlier semesters
+  - the plan equals a DegreePlan rebuilt from scratch from a copy of its semesters
+and every CHECK_EVERY calls, validate_full_plan matches the full-rescan validation it
+replaced, report for report.
+Exits with status 1 if any expectation fails.
+
+Run from the chainlit directory:
+    python -m benchmarks.check_degree_plan
+"""
+import contextlib
+import copy
+import io
+import random
+import sys
+from collections import Counter
+
+from validators.models import DegreePlan, Program, SemesterPlan
+from validators.prerequisites import describe_unmet
+from validators.validator import DegreeValidator
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+SEQUENCES = 25
+OPERATIONS = 150
+CHECK_EVERY = 10
+SEMESTERS = range(1, 7)
+
+results = []
+
+
+def check(label, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    results.append(bool(ok))
+
+
+def full_validation(validator, plan):
+    """validate_full_plan as it was: every total recomputed from every course of the plan"""
+    program_reqs = validator.program_requirements[plan.program.value]
+    report = {"is_valid": True, "total_units": 0, "core_units": 0, "elective_units": 0, "issues": [],
+              "warnings": [], "requirements_met": {}, "semester_analysis": []}
+    total_units = core_units = project_units = 0
+    core_courses_completed, project_courses_completed = set(), set()
+    for semester_index, semester in enumerate(plan.semesters):
+        semester_units = sum(int(course.units) for course in semester.courses)
+        total_units += semester_units
+        analysis = {"semester_index": semester_index + 1, "units": semester_units, "courses": [], "issues": []}
+        for course in semester.courses:
+            analysis["courses"].append({"code": course.course_code, "name": course.course_name, "units": course.units})
+            for courses in program_reqs.get("core_sections", {}).values():
+                if course.course_code in courses:
+                    core_units += course.units
+                    core_courses_completed.add(course.course_code)
+            if course.course_code in program_reqs.get("project_areas", []):
+                project_units += int(course.units)
+                project_courses_completed.add(course.course_code)
+        if semester_units < validator.MIN_SEMESTER_UNITS:
+            analysis["issues"].append(f"Insufficient units in semester {semester_index + 1}: "
+                                      f"{semester_units}/{validator.MIN_SEMESTER_UNITS}")
+            report["issues"].append(f"Semester {semester_index + 1} has insufficient units ({semester_units})")
+        elif semester_units > validator.MAX_SEMESTER_UNITS:
+            analysis["issues"].append(f"Too many units in semester {semester_index + 1}: "
+                                      f"{semester_units}/{validator.MAX_SEMESTER_UNITS}")
+            report["issues"].append(f"Semester {semester_index + 1} has too many units ({semester_units})")
+        report["semester_analysis"].append(analysis)
+    graph = validator.catalog.prerequisite_graph
+    for semester_index, semester in enumerate(plan.semesters):
+        completed = {course.course_code for other in plan.semesters if other.semester < semester.semester
+                     for course in other.courses}
+        alongside = {course.course_code for other in plan.semesters if other.semester == semester.semester
+                     for course in other.courses}
+        for course in semester.courses:
+            unmet = graph.missing(course.course_code, completed, alongside)
+            if unmet:
+                report["warnings"].append(f"Semester {semester_index + 1}: {course.course_code} needs {describe_unmet(unmet)}")
+    if plan.program.value == "MSECE":
+        validator._validate_msece_requirements(report, total_units, core_courses_completed)
+    elif plan.program.value == "EAI":
+        validator._validate_mseai_requirements(report, total_units, core_units, project_units,
+                                               core_courses_completed, project_courses_completed)
+    report["is_valid"] = len(report["issues"]) == 0
+    report["total_units"] = total_units
+    report["core_units"] = core_units
+    report["project_units"] = project_units
+    report["elective_units"] = total_units - (core_units + project_units)
+    return report
+
+
+def aggregate_mismatches(plan, codes):
+    """Every way the plan's aggregates disagree with a rescan of plan.semesters"""
+    found = []
+    units = Counter()
+    for semester in plan.semesters:
+        if plan.semester_units(semester.semester) != sum(
+                other.total_units for other in plan.semesters if other.semester == semester.semester):
+            found.append(f"units of semester {semester.semester}")
+        for course in semester.courses:
+            units[course.course_code] += int(course.units)
+    if plan.total_units != sum(semester.total_units for semester in plan.semesters):
+        found.append("total units")
+    for code in codes:
+        in_plan = [semester.semester for semester in plan.semesters
+                   if any(course.course_code == code for course in semester.courses)]
+        if plan.units_in([code]) != units[code] or plan.has_course(code) != bool(in_plan):
+            found.append(f"units or presence of {code}")
+        if any(plan.has_course(code, semester) != (semester in in_plan) for semester in SEMESTERS):
+            found.append(f"semesters of {code}")
+    for before in list(SEMESTERS) + [max(SEMESTERS) + 1]:
+        expected = {course.course_code for semester in plan.semesters if semester.semester < before
+                    for course in semester.courses}
+        view = plan.completed_before(before)
+        if (set(view) != expected or len(view) != len(expected) or plan.get_completed_courses(before) != expected
+                or any((code in view) != (code in expected) for code in codes)):
+            found.append(f"completed before {before}")
+    rebuilt = DegreePlan(plan.student_id, plan.program, copy.deepcopy(plan.semesters))
+    if rebuilt != plan or rebuilt.total_units != plan.total_units or rebuilt.units_in(codes) != plan.units_in(codes):
+        found.append("plan rebuilt from scratch")
+    return found
+
+
+def main():
+    validator = DegreeValidator(COURSE_DATA_PATH)
+    catalog = validator.catalog
+    requirements = validator.program_requirements["EAI"]
+    required = [code for courses in requirements["core_sections"].values() for code in courses]
+    required = [code for code in required + list(requirements["project_areas"]) if code in catalog]
+    codes = list(dict.fromkeys(required + list(catalog.codes))) + ["99-999"]
+
+    picker = random.Random(0)
+    aggregate_failures, report_failures, reports = [], 0, 0
+    for sequence in range(SEQUENCES):
+        program = picker.choice([Program.MS_EAI, Program.MS_ECE])
+        # Seeded out of order, with a repeated semester, to exercise the constructor too
+        seeded = [SemesterPlan(semester, [catalog[code].to_course() for code in picker.sample(codes[:-1], 3)])
+                  for semester in picker.sample(list(SEMESTERS), 3)]
+        seeded.append(SemesterPlan(seeded[0].semester, [catalog[picker.choice(required)].to_course()]))
+        given = copy.deepcopy(seeded)
+        plan = DegreePlan(f"student-{sequence}", program, seeded)
+        if seeded != given:
+            aggregate_failures.append(f"sequence {sequence}: the constructor changed the semesters it was given")
+        for operation in range(1, OPERATIONS + 1):
+            semester = picker.choice(SEMESTERS)
+            if picker.random() < 0.6:
+                code = picker.choice(required if picker.random() < 0.4 else codes[:-1])
+                plan.add_course(semester, catalog[code].to_course())
+            else:
+                taken = [course.course_code for course in (plan.semester_plan(semester) or SemesterPlan(semester, [])).courses]
+                code = picker.choice(taken) if taken and picker.random() < 0.8 else picker.choice(codes)
+                removed = plan.remove_course(semester, code)
+                if (removed is None) == (code in taken):
+                    aggregate_failures.append(f"sequence {sequence}: remove {code} from {semester}")
+            aggregate_failures += [f"sequence {sequence}, operation {operation}: {mismatch}"
+                                   for mismatch in aggregate_mismatches(plan, codes)]
+            if operation % CHECK_EVERY == 0:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    incremental, full = validator.validate_full_plan(plan), full_validation(validator, plan)
+                reports += 1
+                report_failures += incremental != full
+
+    for failure in aggregate_failures[:5]:
+        print(f"     {failure}")
+    check(f"aggregates match a rescan after each of {SEQUENCES * OPERATIONS} operations "
+          f"({len(aggregate_failures)} mismatches)", not aggregate_failures)
+    check(f"{reports} validation reports match the full-rescan validation ({report_failures} mismatches)",
+          report_failures == 0)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
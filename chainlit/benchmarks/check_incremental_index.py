@@ -0,0 +1,61 @@
+"""
+Check: initialize_vector_store only embeds what changed.
+
+Builds a review index from one PDF with a counting fake embedder, then
+  - reloads it unchanged               -> nothing embedded
+  - adds the second review PDF          -> only that PDF's pages embedded
+  - deletes the first PDF               -> its vectors removed, nothing embedded
+Exits with status 1 if any expectation fails.
+
+Run from the chainlit directory:
+    python -m benchmarks.check_incremental_index
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.fakes import CountingFakeEmbeddings
+from helper import initialize_vector_store, load_file
+
+REVIEWS_DIRECTORY = "data/student_reviews"
+
+
+def update(label, store_path, data_path, expected_embedded, expected_total):
+    embeddings = CountingFakeEmbeddings()
+    started = time.perf_counter()
+    vector_store = initialize_vector_store(store_path, data_path, embeddings, file_type="pdf")
+    elapsed = time.perf_counter() - started
+    ok = embeddings.texts_embedded == expected_embedded and vector_store.index.ntotal == expected_total
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<22} embedded {embeddings.texts_embedded:>3} (expected {expected_embedded:>3}), "
+          f"index holds {vector_store.index.ntotal:>3} (expected {expected_total:>3}), {elapsed:.2f} s")
+    return ok
+
+
+def main():
+    first, second = sorted(
+        os.path.join(REVIEWS_DIRECTORY, name) for name in os.listdir(REVIEWS_DIRECTORY) if name.endswith(".pdf"))[:2]
+    first_pages = len(load_file(first, "pdf"))
+    second_pages = len(load_file(second, "pdf"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = os.path.join(directory, "reviews")
+        store_path = os.path.join(directory, "reviews_faiss")
+        os.makedirs(data_path)
+        shutil.copy(first, data_path)
+
+        results = [
+            update("initial build", store_path, data_path, first_pages, first_pages),
+            update("unchanged", store_path, data_path, 0, first_pages),
+        ]
+        shutil.copy(second, data_path)
+        results.append(update("one PDF added", store_path, data_path, second_pages, first_pages + second_pages))
+        os.remove(os.path.join(data_path, os.path.basename(first)))
+        results.append(update("one PDF removed", store_path, data_path, 0, second_pages))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
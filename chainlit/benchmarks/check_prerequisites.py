@@ -0,0 +1,124 @@
+"""
+Check: prerequisite parsing and the prerequisite graph.
+
+  - statements from the catalog parse into the expected AND/OR groups (anti-requisites,
+    exclusions, recommendations and corequisites are not requirements; a group with a
+    non-course alternative is advisory, one that may be taken concurrently is concurrent)
+  - on the real catalog: the topological order puts every prerequisite first, the
+    transitive closure matches a depth-first search, and reverse edges mirror forward ones
+  - a cyclic catalog raises PrerequisiteCycleError naming the cycle
+  - plan_issues only accepts prerequisites completed in an earlier semester (or the same
+    one for concurrent groups) and never reports advisory groups
+Exits with status 1 if any expectation fails.
+
+Run from the chainlit directory:
+    python -m benchmarks.check_prerequisites
+"""
+import sys
+
+from validators.catalog import CourseCatalog
+from validators.prerequisites import (
+    PrerequisiteCycleError, PrerequisiteGraph, PrerequisiteGroup as Group, parse_prerequisite_groups)
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+
+PARSES = [
+    ("18-631 Introduction to Information Security", (Group(("18-631",)),)),
+    ("Introduction to Information Security (18-631)andCyber Defense (04-623)orEthical Hacking (04-720)",
+     (Group(("18-631",)), Group(("04-623", "04-720")))),
+    ("Any of the following fall semester courses: 04-720 Ethical Hacking18-731 Network Security04-721 "
+     "Vulnerability Assessment and Testing", (Group(("04-720", "18-731", "04-721")),)),
+    ("04-608 Advanced Academic Skills for Engineers I This is NOT for students taking04-606 Academic Skills",
+     (Group(("04-608",)),)),
+    ("Understanding of Java programming. 18652 Foundations Anti-Requisites: 17-655 Architectures", ()),
+    ("2nd-year MSIT standingWhile there are no prerequisites, students are strongly recommended to take:04-613", ()),
+    ("Corequisite of04-653 Engineering Artificial Intelligence Project Methods", ()),
+    ("or successful completion of04-800-H Quantitative Financial Analytics", (Group(("04-800-H",)),)),
+    ("18-751 and 18-661 or 10-601", (Group(("18-751",)), Group(("18-661", "10-601")))),
+    # Catalog rows with a non-course alternative (04-800-AF, 04-801-T4, 04-801-S4, 18-859-R)
+    ("Background or hands-on experience in quantitative financial research and algorithmic trading, or successful "
+     "completion of04-800-H Quantitative Financial Analytics and Algorithmic Trading, with delivering the "
+     "requirements specified in a passing repository.", (Group(("04-800-H",), advisory=True),)),
+    ("04-801-T3 Applications of AI in Healthcareor by permission of the instructor.",
+     (Group(("04-801-T3",), advisory=True),)),
+    ("04-801-S3\xa0Planning for Digital Transformationor by permission of the instructor",
+     (Group(("04-801-S3",), advisory=True),)),
+    ("04-641 Fundamentals of Telecommunications and Computer Networks(may be taken concurrently) or a similar class.",
+     (Group(("04-641",), advisory=True, concurrent=True),)),
+    # Flags stay with their own group; 'and experience' is a further requirement, not an alternative
+    ("18-751 (may be taken concurrently) and 18-661 or 10-601 or equivalent experience",
+     (Group(("18-751",), concurrent=True), Group(("18-661", "10-601"), advisory=True))),
+    ("18-661 or 10-601 and programming experience", (Group(("18-661", "10-601")),)),
+    (float("nan"), ()),
+]
+
+results = []
+
+
+def check(label, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    results.append(bool(ok))
+
+
+def depth_first_requires(graph, code):
+    found, stack = set(), list(graph.requires.get(code, ()))
+    while stack:
+        prerequisite = stack.pop()
+        if prerequisite not in found:
+            found.add(prerequisite)
+            stack.extend(graph.requires.get(prerequisite, ()))
+    return found
+
+
+def main():
+    for text, expected in PARSES:
+        found = parse_prerequisite_groups(text)
+        check(f"parse {str(text)[:60]!r} -> {found}", found == expected)
+
+    graph = CourseCatalog.from_csv(COURSE_DATA_PATH).prerequisite_graph
+    rank = {code: position for position, code in enumerate(graph.order)}
+    check(f"topological order of {len(graph.order)} codes puts prerequisites first",
+          all(rank[prerequisite] < rank[code] for code, prerequisites in graph.requires.items()
+              for prerequisite in prerequisites))
+    check("transitive closure matches a depth-first search",
+          all(graph.all_requires.get(code, frozenset()) == depth_first_requires(graph, code) for code in graph.requires))
+    check("reverse edges mirror forward edges",
+          {(p, c) for c, ps in graph.requires.items() for p in ps} == {(p, c) for p, cs in graph.unlocks.items() for c in cs})
+    check("reverse closure mirrors the closure",
+          all(code in graph.all_unlocks[prerequisite] for code, closure in graph.all_requires.items() for prerequisite in closure))
+    check("18-631 unlocks 04-720, and through it 04-623",
+          "04-720" in graph.unlocks["18-631"] and "04-623" in graph.all_unlocks["18-631"])
+
+    try:
+        PrerequisiteGraph({"A": (("B",),), "B": (("C", "X"),), "C": (("A",),), "D": (("A",),)})
+        check("a cycle is detected", False)
+    except PrerequisiteCycleError as e:
+        check(f"a cycle is detected: {e}", set(e.cycle) == {"A", "B", "C"} and e.cycle[0] == e.cycle[-1])
+
+    check("AND/OR groups are met by any alternative",
+          graph.is_satisfied("04-800-AH", {"18-631", "04-720"}) and not graph.is_satisfied("04-800-AH", {"04-720"}))
+    issues = graph.plan_issues([["18-631"], ["04-720", "04-800-AH"], ["04-623"]])
+    check("a prerequisite completed earlier counts, the same semester does not",
+          [(index, code, [group.codes for group in unmet]) for index, code, unmet in issues]
+          == [(1, "04-800-AH", [("04-623", "04-720")])])
+    advisory = ["04-800-AF", "04-801-T4", "04-801-S4", "18-859-R"]
+    check(f"advisory prerequisites of {', '.join(advisory)} are never missing",
+          all(graph.groups[code] and not graph.missing(code, set()) for code in advisory)
+          and not graph.plan_issues([[code] for code in advisory]))
+
+    concurrent = PrerequisiteGraph({"A": (Group(("B",), concurrent=True), Group(("C",)))})
+    check("a concurrent group is met in the same semester, an ordinary one is not",
+          concurrent.plan_issues([["C"], ["A", "B"]]) == [] and concurrent.plan_issues([["A", "B", "C"]])
+          == [(0, "A", [Group(("C",))])] and concurrent.plan_issues([["A"], ["B"]]) != [])
+    rows = [("p", 0, "C"), ("p", 1, "A"), ("p", 1, "B"), ("q", 0, "A"), ("q", 1, "B"), ("q", 1, "C")]
+    codes = ["A", "B", "C"]
+    check("batch_plan_issues applies the same rule",
+          concurrent.batch_plan_issues([plan == "q" for plan, _, _ in rows], [semester for _, semester, _ in rows],
+                                       [codes.index(code) for _, _, code in rows], codes)
+          == [(3, [Group(("B",), concurrent=True), Group(("C",))])])
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Check: CourseRecommender's filters and ranking on the real course catalog.
+
+Course vectors are synthetic (random, one per course), so no index or network is needed.
+  - completed courses, courses not offered in the semester, courses with an uncompleted
+    prerequisite and courses closed to the program are never recommended
+  - completing a prerequisite makes its course eligible
+  - either half of a cross-listed code counts as completing the course
+  - the course whose vector equals the interests vector ranks first
+  - results are deterministic, and ties keep catalog order
+  - on RANDOM_PROFILES random profiles, the eligible courses match a plain Python
+    implementation of the same rules
+Exits with status 1 if any expectation fails.
+
+Run from the chainlit directory:
+    python -m benchmarks.check_recommender
+"""
+import random
+import sys
+
+import numpy as np
+
+from recommender import KNOWN_DISCIPLINES, PROGRAM_DISCIPLINES, CourseRecommender, course_disciplines
+from validators.catalog import CourseCatalog
+
+COURSE_DATA_PATH = "data/all_courses_data.csv"
+DIMENSIONS = 32
+RANDOM_PROFILES = 500
+
+results = []
+
+
+def check(label, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    results.append(bool(ok))
+
+
+def reference_eligible(catalog, semester, completed, program):
+    """The recommender's rules, one course at a time"""
+    done = set(completed)
+    for code in completed:
+        for entry in catalog:
+            if code in (part.strip() for part in entry.course_code.split("/")):
+                done.add(entry.course_code)
+    eligible = set()
+    for entry in catalog:
+        disciplines = course_disciplines(entry.program)
+        if (semester in entry.semester_availability
+                and entry.course_code not in done
+                and all(done & set(group) for group in entry.prerequisite_groups if not group.advisory)
+                and (program not in PROGRAM_DISCIPLINES or disciplines & PROGRAM_DISCIPLINES[program]
+                     or not disciplines & KNOWN_DISCIPLINES)):
+            eligible.add(entry.course_code)
+    return eligible
+
+
+def main():
+    catalog = CourseCatalog.from_csv(COURSE_DATA_PATH)
+    rng = np.random.default_rng(0)
+    vectors = {code: rng.standard_normal(DIMENSIONS) for code in catalog.codes}
+    recommender = CourseRecommender(catalog, vectors)
+    everything = len(catalog)
+
+    def codes(semester, completed=(), program=None, interests=None, k=everything):
+        interests = np.zeros(DIMENSIONS) if interests is None else interests
+        return [r.course_code for r in recommender.recommend(interests, semester, completed, program, k)]
+
+    fall = codes("Fall")
+    check("only courses offered in the semester", all("Fall" in catalog[code].semester_availability for code in fall))
+    check("completed courses are excluded", "18-661" in fall and "18-661" not in codes("Fall", ["18-661"]))
+    check("uncompleted prerequisite excludes a course", "04-720" not in fall)
+    check("completed prerequisite makes it eligible", "04-720" in codes("Fall", ["18-631"]))
+    check("either half of a cross-listed code completes it",
+          "18-797/11-755" in fall and "18-797/11-755" not in codes("Fall", ["11-755"]))
+    eai = codes("Fall", program="EAI")
+    check("courses closed to the program are excluded",
+          all(not course_disciplines(catalog[code].program) & KNOWN_DISCIPLINES
+              or "MS EAI" in course_disciplines(catalog[code].program) for code in eai)
+          and len(eai) < len(fall))
+    check("interests equal to a course's vector rank it first", codes("Fall", interests=vectors["18-661"])[0] == "18-661")
+    check("zero interests keep catalog order", fall == [code for code in catalog.codes if code in set(fall)])
+    check("same inputs, same result", codes("Spring", ["18-631"], "IT", vectors["04-622"], 5)
+          == codes("Spring", ["18-631"], "IT", vectors["04-622"], 5))
+    check("k limits the results", len(codes("Fall", k=3)) == 3)
+
+    picker = random.Random(0)
+    mismatches = 0
+    for _ in range(RANDOM_PROFILES):
+        semester = picker.choice(["Fall", "Spring"])
+        program = picker.choice(list(PROGRAM_DISCIPLINES) + [None])
+        completed = picker.sample(catalog.codes, picker.randint(0, 20)) + picker.sample(["17-655", "11-755", "99-999"], 1)
+        expected = reference_eligible(catalog, semester, completed, program)
+        found = {catalog.codes[i] for i in np.flatnonzero(recommender.eligible(semester, completed, program))}
+        mismatches += found != expected
+    check(f"{RANDOM_PROFILES} random profiles match the reference rules ({mismatches} mismatches)", mismatches == 0)
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Offline stand-ins for the OpenAI chat model and embeddings used by the benchmarks.
+Both simulate network latency (time.sleep on the sync path, asyncio.sleep on the
+async path) and count their calls.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeToolCallingChatModel(BaseChatModel):
+    """
+    Answers every user turn with one round of tool calls (tool_calls_per_turn calls
+    to tool_name), then a final answer once the tool results are in the prompt.
+    A preamble is text the model says along with its tool calls.
+    """
+
+    latency: float = 0.2
+    tool_name: str = "course_search"
+    tool_calls_per_turn: int = 1
+    final_answer: str = "Here are the courses that match your interests and what students say about them."
+    preamble: str = ""
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self, messages) -> AIMessage:
+        self.calls += 1
+        if messages and isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=self.final_answer)
+        query = messages[-1].content if messages else ""
+        return AIMessage(content=self.preamble, tool_calls=[
+            {"name": self.tool_name, "args": {"query": f"{query} #{index}"}, "id": f"call_{self.calls}_{index}"}
+            for index in range(self.tool_calls_per_turn)
+        ])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        # The first chunk arrives after the full latency; the rest of the answer streams quickly
+        await asyncio.sleep(self.latency)
+        message = self._next_message(messages)
+        for token in message.content.split(" ") if message.content else []:
+            await asyncio.sleep(0.01)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.message.content, chunk=chunk)
+            yield chunk
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ]))
+
+
+class ScriptedToolCallingChatModel(FakeToolCallingChatModel):
+    """
+    Follows a script of tool-call rounds: the n-th model call after the user's message
+    makes the tool calls in script[n], each a (tool name, args) pair, all in one message.
+    Once the script is done, it gives the final answer.
+    """
+
+    script: list = []
+
+    def _next_message(self, messages) -> AIMessage:
+        self.calls += 1
+        rounds = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            rounds += isinstance(message, AIMessage)
+        if rounds >= len(self.script):
+            return AIMessage(content=self.final_answer)
+        return AIMessage(content="", tool_calls=[
+            {"name": name, "args": args, "id": f"call_{self.calls}_{index}"}
+            for index, (name, args) in enumerate(self.script[rounds])
+        ])
+
+
+class CountingFakeEmbeddings(Embeddings):
+    """Deterministic hash-based embeddings that count how many texts were embedded"""
+
+    def __init__(self, size: int = 64, latency: float = 0.0, latency_per_text: float = 0.0):
+        self.size = size
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        if self.latency or self.latency_per_text:
+            time.sleep(self.latency + self.latency_per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        if self.latency or self.latency_per_text:
+            await asyncio.sleep(self.latency + self.latency_per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class KeywordFakeEmbeddings(CountingFakeEmbeddings):
+    """
+    Bag-of-words embeddings: texts with the same content words (ignoring case,
+    punctuation, word order and common filler words) get the same vector, so
+    paraphrases of a question are near neighbours and different questions are not.
+    """
+
+    STOP_WORDS = {"a", "an", "the", "of", "for", "to", "in", "on", "is", "are", "what", "which",
+                  "do", "does", "me", "my", "i", "can", "you", "tell", "about", "please", "show", "there"}
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size)
+        for word in re.findall(r"[a-z0-9-]+", text.lower()):
+            if word not in self.STOP_WORDS:
+                digest = hashlib.sha256(word.encode("utf-8")).digest()
+                vector[int.from_bytes(digest[:4], "little") % self.size] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
@@ -1,6 +1,41 @@
-from langchain_community.document_loaders import PyPDFDirectoryLoader
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
 from langchain_community.document_loaders import CSVLoader
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+import faiss
+import pandas as pd
+
+from utils.docstore import DOCSTORE_FILE, read_docstore, write_docstore
+from utils.pdf_parsing import extract_pages, page_count
+
+# A saved vector store is a directory holding the vectors (index.faiss), the documents
+# (docstore.sqlite3; never a pickle, so loading one cannot run code) and a manifest with
+# the content hash and vector ids of every source file
+INDEX_FILE = "index.faiss"
+MANIFEST_FILE = "manifest.json"
+
+# Course CSV columns indexed as chunks of their own, and their labels in the chunk text
+COURSE_FIELDS = {
+    "Course description": "Description",
+    "Learning objectives": "Learning objectives",
+    "Outcomes": "Outcomes",
+    "Content details": "Content details",
+    "Prerequisites": "Prerequisites",
+}
+COURSE_CHUNK_SIZE = 1000
+
+# PDFs are parsed in a process pool, PDF_PAGES_PER_TASK pages per task; by default one
+# worker per core (PDF_WORKERS=1 parses in-process)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or os.cpu_count() or 1
+PDF_PAGES_PER_TASK = 4
 
 # Process data
 def process_data(file_path: str, file_type:str):
@@ -8,31 +43,237 @@ def process_data(file_path: str, file_type:str):
     Load data from a file for CSV anf directory for PDF and return a list of documents
     args:
     file_path: str: path to the file (CSV) or directory (PDF) to load
-    file_type: str: type of file to load (csv or pdf)
+    file_type: str: type of file to load (csv, course_csv or pdf)
     """
     if file_type == "csv":
         loader = CSVLoader(file_path=file_path, encoding='utf-8')
         documents = loader.load()
         print(f"""{len(documents)} documents loaded from {file_path}""")
+    elif file_type == "course_csv":
+        documents = load_course_chunks(file_path)
+        print(f"""{len(documents)} documents loaded from {file_path}""")
     elif file_type == "pdf":
-        loader = PyPDFDirectoryLoader(file_path)
-        documents = loader.load()
+        documents = [document for documents in load_pdfs(source_files(file_path, "pdf")).values()
+                     for document in documents]
         print(f"""{len(documents)} documents loaded from {file_path}""")
     else:
-        raise ValueError("Invalid file type. Please provide a valid file type (csv or pdf)")
+        raise ValueError("Invalid file type. Please provide a valid file type (csv, course_csv or pdf)")
     return documents
 
 
 
-# Create or load vector store
-def initialize_vector_store(vector_store_path, data_file_path, embeddings, file_type):
+def course_chunk(code: str, name: str, label: str, text: str, metadata: dict) -> Document:
+    # The first line names the course, so every chunk is findable by code and name
+    return Document(page_content=f"{code} {name}\n{label}: {text}", metadata={**metadata, "field": label})
+
+
+def course_chunk_body(document: Document) -> str:
+    """The field text of a chunk made by course_chunk, without the course line and label"""
+    body = document.page_content.split("\n", 1)[-1]
+    prefix = f"{document.metadata.get('field', '')}: "
+    return body[len(prefix):] if body.startswith(prefix) else body
+
+
+def load_course_chunks(path: str):
+    """
+    Load the course CSV as one small document per field of each course (an overview with
+    units, semesters and faculty, then description, objectives, outcomes, content and
+    prerequisites, split if long), each carrying course_code and field metadata.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=COURSE_CHUNK_SIZE, chunk_overlap=100)
+    courses = pd.read_csv(path, encoding='utf-8', dtype=str).fillna('')
+    documents = []
+    for row_number, row in courses.iterrows():
+        code, name = row['course_code'].strip(), row['course_name'].strip()
+        if not code:
+            continue
+        metadata = {"source": path, "row": row_number, "course_code": code, "course_name": name}
+        overview = " ".join(
+            f"{label}: {' '.join(row[column].split()) or 'not listed'}."
+            for column, label in (("course_units", "Units"), ("course_semester", "Semester"),
+                                  ("Course discipline", "Discipline"), ("Faculty", "Faculty"),
+                                  ("course_location", "Location"))
+        )
+        documents.append(course_chunk(code, name, "Overview", overview, metadata))
+        for column, label in COURSE_FIELDS.items():
+            text = row[column].strip()
+            for part in (splitter.split_text(text) if text else []):
+                documents.append(course_chunk(code, name, label, part, metadata))
+    return documents
+
+
+def load_pdfs(paths, workers: int = None):
+    """
+    Load the pages of PDFs as documents like PyPDFLoader, with their text extracted in
+    parallel across processes. Returns {path: [one document per page]}.
+    """
+    workers = workers or PDF_WORKERS
+    tasks = [(path, start, min(start + PDF_PAGES_PER_TASK, count))
+             for path, count in ((path, page_count(path)) for path in paths)
+             for start in range(0, count, PDF_PAGES_PER_TASK)]
+    if workers == 1 or len(tasks) <= 1:
+        texts = [extract_pages(*task) for task in tasks]
+    else:
+        # Forked workers start instantly; spawned ones would re-import the caller's main module
+        # first (seconds with langchain). Elsewhere fork is unsafe, so spawn.
+        context = multiprocessing.get_context("fork" if sys.platform == "linux" else "spawn")
+        with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=context) as pool:
+            texts = list(pool.map(extract_pages, *zip(*tasks)))
+
+    documents = {path: [] for path in paths}
+    for (path, start, _), pages in zip(tasks, texts):
+        documents[path].extend(
+            Document(page_content=text, metadata={"source": path, "page": start + offset})
+            for offset, text in enumerate(pages)
+        )
+    return documents
+
+
+def source_files(data_file_path: str, file_type: str):
+    """The files a vector store is built from: the CSV itself, or every PDF in the directory"""
+    if file_type in ("csv", "course_csv"):
+        return [os.path.normpath(data_file_path)]
+    elif file_type == "pdf":
+        return sorted(
+            os.path.normpath(os.path.join(data_file_path, name)) for name in os.listdir(data_file_path)
+            if name.lower().endswith(".pdf") and not name.startswith(".")
+        )
+    raise ValueError("Invalid file type. Please provide a valid file type (csv, course_csv or pdf)")
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_file(path: str, file_type: str):
+    """Load the documents of a single source file (rows of a CSV, field chunks of the course CSV, pages of a PDF)"""
+    if file_type == "csv":
+        return CSVLoader(file_path=path, encoding='utf-8').load()
+    elif file_type == "course_csv":
+        return load_course_chunks(path)
+    elif file_type == "pdf":
+        return load_pdfs([path], workers=1)[path]
+    raise ValueError("Invalid file type. Please provide a valid file type (csv, course_csv or pdf)")
+
+
+def read_manifest(vector_store_path: str):
     try:
-        vector_store = FAISS.load_local(
-            vector_store_path, embeddings, allow_dangerous_deserialization=True)
-        print(f"Vector store loaded from {vector_store_path}")
-    except:
-        documents = process_data(data_file_path,file_type="pdf")
-        vector_store = FAISS.from_documents(documents, embeddings)
-        vector_store.save_local(vector_store_path)
+        with open(os.path.join(vector_store_path, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(vector_store_path: str, manifest: dict):
+    with open(os.path.join(vector_store_path, MANIFEST_FILE), "w", encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_vector_store(vector_store_path: str, embeddings) -> FAISS:
+    """Load a saved vector store fully into memory, so it can be updated"""
+    index = faiss.read_index(os.path.join(vector_store_path, INDEX_FILE))
+    index_to_docstore_id, docstore = read_docstore(os.path.join(vector_store_path, DOCSTORE_FILE))
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def save_vector_store(vector_store: FAISS, vector_store_path: str):
+    os.makedirs(vector_store_path, exist_ok=True)
+    index_path = os.path.join(vector_store_path, INDEX_FILE)
+    docstore_path = os.path.join(vector_store_path, DOCSTORE_FILE)
+
+    # Write aside and rename, so a crash never leaves a half-written store behind
+    if os.path.exists(docstore_path + ".partial"):
+        os.remove(docstore_path + ".partial")
+    faiss.write_index(vector_store.index, index_path + ".partial")
+    write_docstore(docstore_path + ".partial", vector_store.index_to_docstore_id, vector_store.docstore)
+    os.replace(index_path + ".partial", index_path)
+    os.replace(docstore_path + ".partial", docstore_path)
+
+
+def manifest_from_docstore(vector_store, hashes: dict):
+    """
+    Manifest for an index saved before manifests existed, assuming it is up to date.
+    Documents are matched to source files by file name, since the stored paths may come
+    from another machine; documents of files that no longer exist are listed under their
+    stored path with no hash, so they are removed on the next update.
+    """
+    paths_by_name = {os.path.basename(path): path for path in hashes}
+    manifest = {}
+    for doc_id in vector_store.index_to_docstore_id.values():
+        source = vector_store.docstore.search(doc_id).metadata.get("source", "")
+        name = os.path.basename(source.replace("\\", "/"))
+        path = paths_by_name.get(name, source)
+        entry = manifest.setdefault(path, {"hash": hashes.get(path), "ids": []})
+        entry["ids"].append(doc_id)
+    return manifest
+
+
+def add_files(vector_store, paths, embeddings, file_type, manifest, hashes, workers: int = None):
+    """Embed the documents of paths into vector_store (creating it if None) and record them in manifest"""
+    pdf_documents = load_pdfs(paths, workers) if file_type == "pdf" else {}
+    documents, ids = [], []
+    for path in paths:
+        file_documents = pdf_documents[path] if file_type == "pdf" else load_file(path, file_type)
+        file_ids = [str(uuid.uuid4()) for _ in file_documents]
+        manifest[path] = {"hash": hashes[path], "file_type": file_type, "ids": file_ids}
+        documents.extend(file_documents)
+        ids.extend(file_ids)
+    if vector_store is None:
+        return FAISS.from_documents(documents, embeddings, ids=ids)
+    if documents:
+        vector_store.add_documents(documents, ids=ids)
+    return vector_store
+
+
+# Create or load vector store
+def initialize_vector_store(vector_store_path, data_file_path, embeddings, file_type, workers: int = None):
+    """
+    Load the vector store at vector_store_path and bring it up to date with its source files.
+    Only files whose content hash differs from the manifest are parsed and embedded again;
+    the vectors of changed and deleted files are removed. Without a saved store, build it from scratch;
+    a saved store that fails to load raises rather than being re-embedded.
+    PDFs are parsed with `workers` processes (default PDF_WORKERS).
+    """
+    hashes = {path: file_hash(path) for path in source_files(data_file_path, file_type)}
+
+    if os.path.exists(os.path.join(vector_store_path, INDEX_FILE)):
+        vector_store = load_vector_store(vector_store_path, embeddings)
+    else:
+        vector_store = None
+
+    if vector_store is None:
+        manifest = {}
+        vector_store = add_files(None, list(hashes), embeddings, file_type, manifest, hashes, workers)
+        save_vector_store(vector_store, vector_store_path)
+        write_manifest(vector_store_path, manifest)
         print(f"Vector store created and saved to {vector_store_path}")
+        return vector_store
+
+    manifest = read_manifest(vector_store_path)
+    if manifest is None:
+        manifest = manifest_from_docstore(vector_store, hashes)
+        write_manifest(vector_store_path, manifest)
+
+    # A file also needs re-embedding when it is now loaded differently (manifests from
+    # before file_type was recorded only ever used the plain csv and pdf loaders)
+    stale = [path for path, entry in manifest.items()
+             if path not in hashes or hashes[path] != entry["hash"]
+             or entry.get("file_type", "pdf" if path.lower().endswith(".pdf") else "csv") != file_type]
+    added = [path for path in hashes if path not in manifest or path in stale]
+    if not stale and not added:
+        print(f"Vector store loaded from {vector_store_path}")
+        return vector_store
+
+    stale_ids = [doc_id for path in stale for doc_id in manifest.pop(path)["ids"]]
+    if stale_ids:
+        vector_store.delete(stale_ids)
+    vector_store = add_files(vector_store, added, embeddings, file_type, manifest, hashes, workers)
+    save_vector_store(vector_store, vector_store_path)
+    write_manifest(vector_store_path, manifest)
+    print(f"Vector store at {vector_store_path} updated: {len(stale_ids)} documents removed, "
+          f"{len(added)} files added or changed")
     return vector_store
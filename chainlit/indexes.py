@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from helper import INDEX_FILE, initialize_vector_store, read_manifest
+from utils.docstore import DOCSTORE_FILE, SqliteDocstore
+
+# Versioned index artifacts: INDEX_ROOT/<name>/<version>/ holds one build of a store
+# and INDEX_ROOT/<name>/CURRENT names the version the app serves
+INDEX_ROOT = os.getenv("INDEX_ROOT", "indexes")
+CURRENT_FILE = "CURRENT"
+# Bumped whenever the layout of a version directory changes, so old builds are not served
+ARTIFACT_FORMAT = 3
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    source: str  # CSV file, or directory of PDFs
+    file_type: str
+    seed: Optional[str] = None  # Prebuilt store to start from when no version exists yet
+
+
+INDEX_SPECS = {
+    spec.name: spec for spec in [
+        IndexSpec("courses", "data/all_courses_data.csv", "course_csv", seed="Courses_faiss"),
+        IndexSpec("student_reviews", "data/student_reviews", "pdf", seed="student_reviews_faiss"),
+        IndexSpec("handbook", "data/handbook", "pdf", seed="handbook_faiss"),
+    ]
+}
+
+
+class IndexNotBuiltError(RuntimeError):
+    """Raised when an index is used before `python ingest.py` has built a version of it"""
+
+
+def current_version(name: str, root: str = INDEX_ROOT) -> Optional[str]:
+    try:
+        with open(os.path.join(root, name, CURRENT_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def manifest_version(manifest: dict, namespace: str) -> str:
+    """Version id of a build: a hash of its source file hashes and the embedding model"""
+    sources = sorted((os.path.basename(path), entry["hash"]) for path, entry in manifest.items())
+    return hashlib.sha256(json.dumps([ARTIFACT_FORMAT, namespace, sources]).encode("utf-8")).hexdigest()[:12]
+
+
+def build_index(spec: IndexSpec, embeddings, root: str = INDEX_ROOT, keep: int = 3, workers: int = None) -> str:
+    """
+    Bring spec's index up to date as a new version and make it current.
+    The previous version (or the seed store) is copied and updated incrementally, so
+    only changed source files are embedded. The app keeps serving the old version
+    until CURRENT is switched. PDFs are parsed with `workers` processes. Returns the version id.
+    """
+    store_root = os.path.join(root, spec.name)
+    os.makedirs(store_root, exist_ok=True)
+
+    previous = current_version(spec.name, root)
+    staging = os.path.join(store_root, f".staging-{uuid.uuid4().hex}")
+    if previous and os.path.exists(os.path.join(store_root, previous, DOCSTORE_FILE)):
+        shutil.copytree(os.path.join(store_root, previous), staging)
+    elif spec.seed and os.path.isdir(spec.seed):
+        shutil.copytree(spec.seed, staging)
+    # Pickled docstores of older builds are never read; don't carry them along
+    if os.path.exists(os.path.join(staging, "index.pkl")):
+        os.remove(os.path.join(staging, "index.pkl"))
+
+    try:
+        initialize_vector_store(staging, spec.source, embeddings, spec.file_type, workers)
+        namespace = getattr(embeddings, "namespace", type(embeddings).__name__)
+        version = manifest_version(read_manifest(staging), namespace)
+        target = os.path.join(store_root, version)
+        if os.path.isdir(target):
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Switch atomically, so a reader sees either the old or the new version
+    pointer = os.path.join(store_root, f".{CURRENT_FILE}.{uuid.uuid4().hex}")
+    with open(pointer, "w", encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(store_root, CURRENT_FILE))
+    logging.info(f"Index {spec.name} is at version {version} (was {previous})")
+
+    prune_versions(spec.name, root, keep)
+    return version
+
+
+def prune_versions(name: str, root: str = INDEX_ROOT, keep: int = 3):
+    """Delete all but the `keep` most recent versions (never the current one)"""
+    store_root = os.path.join(root, name)
+    current = current_version(name, root)
+    versions = sorted(
+        (entry for entry in os.listdir(store_root)
+         if not entry.startswith(".") and entry != CURRENT_FILE and entry != current),
+        key=lambda entry: os.path.getmtime(os.path.join(store_root, entry)),
+        reverse=True,
+    )
+    for version in versions[max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(store_root, version), ignore_errors=True)
+
+
+def load_version(path: str, embeddings) -> FAISS:
+    """Open a built version read-only: memory-mapped vectors and an on-demand docstore"""
+    # Flat indexes are only mapped with IO_FLAG_MMAP_IFC (faiss >= 1.9); IO_FLAG_MMAP alone copies them.
+    # Version directories are never modified once published, which mapping requires.
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+    else:
+        logging.warning(f"faiss {faiss.__version__} cannot memory-map flat indexes, so every process loads its "
+                        f"own copy of {path}; install faiss-cpu>=1.9 (see requirements.txt)")
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(os.path.join(path, INDEX_FILE), flags)
+    docstore = SqliteDocstore(os.path.join(path, DOCSTORE_FILE))
+    return FAISS(embeddings, index, docstore, docstore.ids_by_position())
+
+
+class LazyVectorStore:
+    """
+    The current version of an index, loaded on first use instead of at import.
+    A new version published by `ingest` is picked up on the next use. Versions are only
+    built by `ingest`: using an index that has none raises IndexNotBuiltError. Coroutines
+    use aget, which loads in a worker thread.
+
+    The FAISS index is memory-mapped and documents are read from SQLite per query,
+    so worker processes share one copy of both in the OS page cache.
+    """
+
+    def __init__(self, spec: IndexSpec, embeddings, root: str = INDEX_ROOT):
+        self.spec = spec
+        self.embeddings = embeddings
+        self.root = root
+        self._lock = threading.Lock()
+        self._store = None
+        self._version = None
+
+    @property
+    def version(self) -> Optional[str]:
+        return current_version(self.spec.name, self.root)
+
+    def get(self) -> FAISS:
+        version = self.version
+        if self._store is None or version != self._version:
+            with self._lock:
+                version = self.version
+                if self._store is None or version != self._version:
+                    if version is None or not os.path.exists(
+                            os.path.join(self.root, self.spec.name, version, DOCSTORE_FILE)):
+                        raise IndexNotBuiltError(f"No built index for {self.spec.name} under {self.root}; "
+                                                 f"run `python ingest.py {self.spec.name}` first")
+                    self._store = load_version(os.path.join(self.root, self.spec.name, version), self.embeddings)
+                    self._version = version
+                    logging.info(f"Loaded index {self.spec.name} version {version}")
+        return self._store
+
+    async def aget(self) -> FAISS:
+        """get for coroutines: a version that is not loaded yet is loaded in a worker thread"""
+        if self._store is not None and self.version == self._version:
+            return self._store
+        return await asyncio.to_thread(self.get)
+
+
+class LazyRetriever(BaseRetriever):
+    """Retriever over a LazyVectorStore, so building retriever tools loads nothing"""
+
+    store: Any
+    search_kwargs: dict = {}
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.store.get().as_retriever(search_kwargs=self.search_kwargs).invoke(query)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        store = await self.store.aget()
+        return await store.as_retriever(search_kwargs=self.search_kwargs).ainvoke(query)
@@ -0,0 +1,48 @@
+"""
+Build the vector indexes ahead of time, so the app never parses or embeds at startup.
+
+    python ingest.py                      # every index
+    python ingest.py courses handbook     # just these
+    python ingest.py --keep 5             # keep more old versions for rollback
+    python ingest.py --workers 4          # parse PDFs with 4 processes (default: one per core)
+
+Each run publishes a new version under INDEX_ROOT only if a source file changed,
+embedding just the changed files; running Chainlit workers switch to it on their next query.
+"""
+import argparse
+import logging
+import os
+
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+
+from indexes import INDEX_ROOT, INDEX_SPECS, build_index
+from utils.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build versioned vector index artifacts")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"Indexes to build: {', '.join(INDEX_SPECS)} (default: all)")
+    parser.add_argument("--root", default=INDEX_ROOT, help="Directory holding the index versions")
+    parser.add_argument("--keep", type=int, default=3, help="Versions to keep per index, including the current one")
+    parser.add_argument("--workers", type=int, default=None, help="Processes parsing PDFs (default: PDF_WORKERS)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in INDEX_SPECS]
+    if unknown:
+        parser.error(f"unknown index: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load_dotenv()
+    embeddings = CachedEmbeddings(
+        OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY")),
+        EmbeddingStore(os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")),
+    )
+
+    for name in args.names or list(INDEX_SPECS):
+        version = build_index(INDEX_SPECS[name], embeddings, args.root, args.keep, args.workers)
+        print(f"{name}: {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import json
 import time
 import asyncio
 from math import sqrt
+from urllib.parse import parse_qs, urlparse
 from dotenv import load_dotenv
 import chainlit as cl
 from langchain_openai import OpenAI, ChatOpenAI, OpenAIEmbeddings
@@ -29,6 +30,7 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 
 # import helper functions
 from helper import process_data, initialize_vector_store
+from utils.grpc_client import user_service
 
 # Global variables
 current_user = None
@@ -43,13 +45,11 @@ chat_history = []
 # Get OpenAI API key from environment variables
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-def get_user_info():
+def get_user_info(token=''):
     global current_user
     try:
         logging.info("Attempting to get user info...")
-        channel = grpc.insecure_channel('localhost:50051')
-        stub = user_pb2_grpc.UserServiceStub(channel)
-        response = stub.GetUser(user_pb2.UserRequest())
+        response = user_service.stub.GetUser(user_pb2.UserRequest(token=token))
         
         user_info = {
             'first_name': response.first_name,
@@ -65,16 +65,25 @@ def get_user_info():
     except Exception as e:
         logging.debug(f"Error getting user info: {str(e)}")
         return None
-    finally:
-        try:
-            channel.close()
-        except:
-            pass
 
-async def wait_for_user_login():
+async def wait_for_user_login(timeout=30):
     global current_user
+    # frontend_app mounts the widget with the /signin handoff token in the user metadata;
+    # a page that opens Chainlit itself passes it in the URL
+    user = cl.user_session.get("user")
+    token = user.metadata.get("handoff_token", "") if user else ""
+    if not token:
+        referer = cl.user_session.get("http_referer") or ""
+        token = parse_qs(urlparse(referer).query).get("handoff_token", [""])[0]
+    if not token:
+        logging.error("No handoff token in this session; sign in through frontend_app")
+        return None
+    deadline = time.monotonic() + timeout
     while not current_user:
-        user_info = get_user_info()
+        if time.monotonic() >= deadline:
+            logging.error(f"No sign-in for this session's handoff token within {timeout} seconds")
+            return None
+        user_info = get_user_info(token)
         if user_info:
             break
         await asyncio.sleep(1)  # Use asyncio.sleep instead of time.sleep
@@ -209,7 +218,7 @@ async def setup_chain():
         cl.user_session.set("llm_chain", agent_executor)
     else:
         logging.warning("Failed to retrieve user info")
-        await cl.Message("Failed to connect to login service. Please try again later.").send()
+        await cl.Message("Could not find your sign-in. Please sign in again and reopen the assistant.").send()
 
 @cl.on_message
 async def handle_message(message: cl.Message):
@@ -7,9 +7,13 @@ import math
 import re
 import time
 import asyncio
-import requests
+import functools
+import hashlib
+import httpx
 import pandas as pd
 from dataclasses import asdict
+from typing import List
+from urllib.parse import parse_qs, urlparse
 from dotenv import load_dotenv
 import chainlit as cl
 import chainlit.data as cl_data
@@ -17,6 +21,7 @@ from chainlit.types import Feedback
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.chains import LLMChain
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnablePassthrough
 from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
 from langchain.agents import initialize_agent, Tool, AgentExecutor
 from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
@@ -26,7 +31,13 @@ from langchain_community.vectorstores import FAISS
 from langchain.tools.retriever import create_retriever_tool
 from validators.models import DegreePlan, Course, SemesterPlan, Program
 from validators.validator import DegreeValidator
+from validators.prerequisites import describe_unmet
 from utils import feedback
+from utils.grpc_client import user_service
+from utils import metrics
+from utils.chat_history import ChatHistory
+from utils.response_cache import SemanticResponseCache
+from utils.embedding_cache import CachedEmbeddings, EmbeddingStore
 import logging
 import numpy as np
 
@@ -34,10 +45,12 @@ import numpy as np
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Import helper functions
-from helper import process_data, initialize_vector_store
+from helper import process_data
+from indexes import INDEX_SPECS, LazyRetriever, LazyVectorStore
+from recommender import CourseRecommender
+from retrieval import CourseCorpus, HybridCourseRetriever, course_reviews
 
 # Global variables
-chat_history = []
 addDone = False
 removeDone = False
 
@@ -49,167 +62,262 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Initialize components
 # llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY)
-embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+# Embeddings go through a persistent cache, so repeated queries and unchanged
+# documents are never sent to OpenAI twice
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+embeddings = CachedEmbeddings(OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY), EmbeddingStore(EMBEDDING_CACHE_PATH))
+
+# Agent latency metrics (seconds from receiving a message)
+time_to_first_token = metrics.histogram("agent_time_to_first_token_seconds")
+response_seconds = metrics.histogram("agent_response_seconds")
+# Every metric (latencies, response cache hit rate) is logged this often, in seconds; 0 disables
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "300"))
+
+# Timeout (seconds) for calls to the Flask backend
+BACKEND_TIMEOUT = 10.0
+
+# Token budget for the chat history sent with each turn, and whether turns that fall
+# out of it are folded into a rolling summary (one extra small-model call when they do)
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "2000"))
+CHAT_HISTORY_SUMMARIZE = os.getenv("CHAT_HISTORY_SUMMARIZE", "false").lower() == "true"
+SUMMARY_MODEL = "gpt-4o-mini"
+
+# Semantic cache of agent answers: a question this similar to an earlier one with the
+# same student details, plan state and conversation so far gets the earlier answer
+# without running the agent (see response_cache_scope)
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+response_cache = SemanticResponseCache(
+    embeddings,
+    threshold=RESPONSE_CACHE_THRESHOLD,
+    ttl_seconds=RESPONSE_CACHE_TTL,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+)
+# Turns that change something besides the answer text are never cached
+UNCACHEABLE_TOOLS = {"add_course_to_plan", "remove_course_from_plan", "save_degree_plan", "export_degree_plan"}
 
 # Load course data and validator
 COURSE_DATA_PATH = "data/all_courses_data.csv"
 CORE_COURSES_PATH = "data/core_courses.json"
-course_catalog_df = pd.read_csv(COURSE_DATA_PATH)
 
-# Create a lookup dictionary using course code as the key
-course_catalog_dict = course_catalog_df.set_index('course_code').to_dict('index')
+# One validator (and catalog) per process, shared by every chat session
+validator = DegreeValidator.shared(COURSE_DATA_PATH)
+course_catalog = validator.catalog
+
 
+# Vector indexes are built ahead of time by `python ingest.py` and loaded on first use,
+# so importing this module (cold start, hot reload, every worker) does not load them
+vector_stores = {name: LazyVectorStore(spec, embeddings) for name, spec in INDEX_SPECS.items()}
 
-# Set up course retriever tool
-vector_store_path = "Courses_faiss"
-vector_store = initialize_vector_store(vector_store_path, COURSE_DATA_PATH, embeddings, file_type="csv")
-retriever = vector_store.as_retriever()
+# Set up course retriever tool: BM25 + vectors, with exact course codes answered directly
+course_retriever = HybridCourseRetriever(corpus=CourseCorpus(COURSE_DATA_PATH), vector_store=vector_stores["courses"])
 course_retriever_tool = create_retriever_tool(
-    retriever,
+    course_retriever,
     "course_search",
     "Search for information about courses. For any questions about CMU Africa courses, you must use this tool!",
 )
 
 # Set up student reviews retriever tool
-vector_store_path = "student_reviews_faiss"
-student_review_directory = "data/student_reviews/"
-vector_store = initialize_vector_store(vector_store_path, student_review_directory, embeddings, file_type="pdf")
-retriever = vector_store.as_retriever()
+student_reviews_retriever = LazyRetriever(store=vector_stores["student_reviews"])
 student_reviews_retriever_tool = create_retriever_tool(
-    retriever,
+    student_reviews_retriever,
     "student_reviews",
     "Search for information about student reviews of courses at CMU-Africa. For any information about student reviews, use this tool!",
 )
 
 # Set up handbook retriever tool
-vector_store_path = "handbook_faiss"
-handbook_directory = "data/handbook/"
-vector_store = initialize_vector_store(vector_store_path, handbook_directory, embeddings, file_type="pdf")
-retriever = vector_store.as_retriever()
 handbook_retriever_tool = create_retriever_tool(
-    retriever,
+    LazyRetriever(store=vector_stores["handbook"]),
     "student_handbook",
     "Search for official information about degree programs, academic policies, and general requirements at CMU-Africa.",
 )
 
+# Course details and student reviews of several courses in one tool call, looked up concurrently
+@tool
+async def course_with_reviews(courses: List[str]) -> str:
+    """Get the official details and the student reviews of a list of courses (course codes or exact course names) in one call. Use it instead of calling student_reviews once per course."""
+    return await course_reviews(course_retriever, student_reviews_retriever, courses)
+
+
+def knowledge_version():
+    """Changes whenever the course catalog is edited or a new index version is published"""
+    catalog_mtime = os.stat(COURSE_DATA_PATH).st_mtime_ns if os.path.exists(COURSE_DATA_PATH) else 0
+    return (catalog_mtime,) + tuple(store.version for store in vector_stores.values())
+
+
+def plan_state_hash(degree_plan):
+    state = [[str(sem.semester), sorted(course.course_code for course in sem.courses)]
+             for sem in degree_plan.semesters]
+    return hashlib.sha256(json.dumps(state).encode("utf-8")).hexdigest()
+
+
+def log_metrics():
+    metrics.log_snapshot()
+    hit_rate, seconds_saved = response_cache.stats()
+    logging.info(f"Response cache: hit rate {hit_rate:.1%}, {seconds_saved:.0f} agent seconds saved, "
+                 f"{len(response_cache)} entries")
+
+
+def response_cache_scope(degree_plan, prompt_variables, history):
+    """
+    Scope of a cached answer. Besides the plan, it covers the prompt variables (answers
+    address the student by name) and the chat history window (follow-ups such as "what
+    about the second one?" depend on it), so answers never cross conversations.
+    """
+    context = json.dumps({
+        "prompt_variables": prompt_variables,
+        "history": [[message.type, message.content] for message in history],
+    }, sort_keys=True, default=str)
+    return (prompt_variables.get("program"), plan_state_hash(degree_plan),
+            hashlib.sha256(context.encode("utf-8")).hexdigest())
+
+
+def user_info_from_response(response):
+    """Convert a UserInfo message to the user_info dict, or None if it carries no user"""
+    if not response.andrew_id:
+        return None
+    return {
+        'first_name': response.first_name,
+        'andrew_id': response.andrew_id,
+        'profile': json.loads(response.profile_json) if response.profile_json else {}
+    }
+
 # Wait for user login function
-def get_user_info():
+def get_user_info(andrew_id='', token=''):
     try:
         logging.info("Attempting to get user info...")
-        channel = grpc.insecure_channel('localhost:50051')
-        stub = user_pb2_grpc.UserServiceStub(channel)
-        response = stub.GetUser(user_pb2.UserRequest())
+        response = user_service.stub.GetUser(user_pb2.UserRequest(andrew_id=andrew_id, token=token))
+        user_info = user_info_from_response(response)
 
-        user_info = {
-            'first_name': response.first_name,
-            'andrew_id': response.andrew_id,
-            'profile': json.loads(response.profile_json) if response.profile_json else {}
-        }
-
-        if user_info['andrew_id']:  # Only return if we got actual user data
+        if user_info:  # Only return if we got actual user data
             logging.info(f"Successfully retrieved user info: {user_info}")
             return user_info
 
     except Exception as e:
         logging.debug(f"Error getting user info: {str(e)}")
         return None
-    finally:
+
+async def aget_user_info(andrew_id='', token=''):
+    """get_user_info for coroutines: uses the grpc.aio channel so the event loop is never blocked"""
+    try:
+        response = await user_service.aio_stub.GetUser(user_pb2.UserRequest(andrew_id=andrew_id, token=token))
+        return user_info_from_response(response)
+    except grpc.aio.AioRpcError as e:
+        logging.debug(f"Error getting user info: {e.code()}")
+        return None
+
+async def watch_for_user_sign_in(andrew_id='', token=''):
+    """
+    Wait for the backend to push the next sign-in over the WatchSignIns stream.
+    One stream is held open while waiting, so there is no polling delay and no
+    per-poll connection setup. Pass andrew_id or the /signin handoff token to
+    claim that user's sign-in; the backend refuses a request with neither unless
+    it runs in single-user mode, and then None is returned.
+    """
+    request = user_pb2.UserRequest(andrew_id=andrew_id, token=token)
+    while True:
+        # wait_for_ready lets the stream open as soon as the backend comes up
+        call = user_service.aio_stub.WatchSignIns(request, wait_for_ready=True)
         try:
-            channel.close()
-        except:
-            pass
+            async for response in call:
+                user_info = user_info_from_response(response)
+                if user_info:
+                    return user_info
+        except grpc.aio.AioRpcError as e:
+            logging.debug(f"Sign-in stream interrupted: {e.code()}")
+            if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+                logging.warning(f"Sign-in refused: {e.details()}")
+                return None
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                # The backend has no stream slot free; poll once until one frees up
+                user_info = await aget_user_info(andrew_id, token)
+                if user_info:
+                    return user_info
+        finally:
+            call.cancel()  # The shared channel stays open for the next caller
+        await asyncio.sleep(1)  # Backend restarted or busy; reopen the stream
+
+async def summarize_chat_history(summary, messages):
+    """Fold turns that no longer fit the history budget into the rolling summary"""
+    transcript = "\n".join(
+        f"{'Student' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}" for m in messages
+    )
+    llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, model=SUMMARY_MODEL, temperature=0)
+    response = await llm.ainvoke(
+        "Update the summary of a conversation between a student and their course advisor. "
+        "Keep the courses, plan changes, preferences and open questions; stay under 150 words.\n\n"
+        f"Current summary: {summary or '(none)'}\n\nNew turns:\n{transcript}"
+    )
+    return response.content
+
+
+def handoff_token_from_session():
+    """
+    The /signin handoff token for this session, or ''. frontend_app mounts the copilot
+    widget with an access token carrying it in the user metadata (CHAINLIT_CUSTOM_AUTH);
+    a page that opens Chainlit itself can pass it in its URL (?handoff_token=...).
+    """
+    user = cl.user_session.get("user")
+    if user and user.metadata.get("handoff_token"):
+        return user.metadata["handoff_token"]
+    referer = cl.user_session.get("http_referer") or ""
+    return parse_qs(urlparse(referer).query).get("handoff_token", [""])[0]
 
-async def wait_for_user_login():
-    user_info = None
-    while not user_info:
-        user_info = get_user_info()
-        await asyncio.sleep(1)  # Use asyncio.sleep instead of time.sleep
-    return user_info
 
 async def poll_for_user_sign_in():
-    while True:
-        user_info = get_user_info()
-        if user_info:
-            logging.info(f"User signed in: {user_info}")
-            cl.user_session.set("user_info", user_info)
-
-            # Initialize degree plan and validator
-            degree_plan = convert_user_info_to_degree_plan(user_info)
-            cl.user_session.set("degree_plan", degree_plan)
-            cl.user_session.set("validator", DegreeValidator(COURSE_DATA_PATH))
-
-            # Initialize LLM tools and chain
-            llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, model="gpt-4", temperature=0)
-            tools = [
-                course_retriever_tool,
-                student_reviews_retriever_tool,
-                handbook_retriever_tool,
-                validate_course_addition,
-                add_course_to_plan,
-                remove_course_from_plan,
-                validate_full_degree_plan,
-                export_degree_plan,
-                show_degree_plan
-            ]
-            llm_with_tools = llm.bind_tools(tools)
-
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", get_personalized_system_prompt(user_info)),
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("user", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad"),
-            ])
-
-            agent = (
-                {
-                    "input": lambda x: x["input"],
-                    "agent_scratchpad": lambda x: format_to_openai_tool_messages(
-                        x["intermediate_steps"]
-                    ),
-                    "chat_history": lambda x: x["chat_history"]
-                }
-                | prompt
-                | llm_with_tools
-                | OpenAIToolsAgentOutputParser()
-            )
+    token = handoff_token_from_session()
+    if not token:
+        logging.warning("No handoff token in this session; only a single-user backend accepts that. "
+                        "Run Chainlit with CHAINLIT_CUSTOM_AUTH=true and sign in through frontend_app.")
+    user_info = await watch_for_user_sign_in(token=token)
+    if user_info:
+        logging.info(f"User signed in: {user_info}")
+        cl.user_session.set("user_info", user_info)
+
+        # Initialize degree plan and validator
+        degree_plan = convert_user_info_to_degree_plan(user_info)
+        cl.user_session.set("degree_plan", degree_plan)
+        cl.user_session.set("validator", validator)
 
-            # Initialize agent executor
-            agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-            cl.user_session.set("llm_chain", agent_executor)
+        cl.user_session.set("chat_history", ChatHistory(
+            max_tokens=CHAT_HISTORY_MAX_TOKENS,
+            summarizer=summarize_chat_history if CHAT_HISTORY_SUMMARIZE else None,
+        ))
 
-            logging.info("Session fully initialized.")
+        # The agent is shared by every session; only the prompt variables are per user
+        cl.user_session.set("prompt_variables", get_personalized_prompt_variables(user_info))
+        cl.user_session.set("llm_chain", get_agent_executor())
 
-            # Send a welcome message
-            welcome_message = f"Welcome {user_info['first_name']}! I see you're a {user_info['profile']['program']} student interested in {user_info['profile']['interests']}. How can I help you today?"
-            await cl.Message(welcome_message).send()
-            return  # Stop polling after successful sign-in
+        logging.info("Session fully initialized.")
 
-        logging.info("Waiting for user sign-in...")
-        await asyncio.sleep(5)
+        # Send a welcome message
+        welcome_message = f"Welcome {user_info['first_name']}! I see you're a {user_info['profile']['program']} student interested in {user_info['profile']['interests']}. How can I help you today?"
+        await cl.Message(welcome_message).send()
 
 
-# Get personalized system prompt function
-def get_personalized_system_prompt(user_info):
-    return f"""You are an AI assistant helping {user_info['first_name']}, a {user_info['profile']['program']} student at CMU-Africa. 
-    You know that {user_info['first_name']} started in {user_info['profile']['starting_year']} and has interests in {user_info['profile']['interests']}.
-    Their previous experience includes: {user_info['profile']['previous_experience']}.
+# Personalized system prompt. The per-user details are prompt variables, so the same
+# template (and agent) serves every session; see get_personalized_prompt_variables
+SYSTEM_PROMPT_TEMPLATE = """You are an AI assistant helping {first_name}, a {program} student at CMU-Africa. 
+    You know that {first_name} started in {starting_year} and has interests in {interests}.
+    Their previous experience includes: {previous_experience}.
 
-    When answering questions, consider their program ({user_info['profile']['program']}) and interests ({user_info['profile']['interests']}) 
+    When answering questions, consider their program ({program}) and interests ({interests}) 
     to provide more relevant recommendations.
 
-    When answering questions about courses, you must **always retrieve information from both the course_search and student_reviews tools** 
-    and combine them in your response. Follow these detailed guidelines:
+    When answering questions about courses, you must **always combine official course information with student reviews** 
+    in your response. Follow these detailed guidelines:
 
     1. **course_search tool**:
-       - Use this tool to gather official course details such as content, prerequisites, schedules, and any other factual information.
+       - Use this tool to find courses matching the user's question, and for official course details such as content, prerequisites, schedules, and any other factual information.
        - This is your primary source for accurate, official course information, and must always be included.
-       - Ensure to pass all courses returned from this tool to the student_review tool.
 
-    2. **student_reviews tool**:
-       - After gathering the list of courses from **course_search**, use the **exact names or codes of each course** to search for student reviews.
-       - Make sure to pass **all course names** to the **student_reviews** tool, one by one, and gather feedback for each.
-       - If no reviews are available for certain courses, mention that no reviews are found for those courses.
+    2. **course_with_reviews tool**:
+       - After finding courses with **course_search** (or when the user names courses), pass the **exact codes of all the courses** to **course_with_reviews** in a single call.
+       - It returns the official details and the student reviews of every course together. Do not call student_reviews once per course.
+       - If no reviews are found for certain courses, mention that no reviews are found for those courses.
        - Clearly label student feedback as personal opinions from students.
+       - Use the **student_reviews tool** only for review questions that are not about specific courses.
 
     3. **student_handbook tool**:
        - Use this tool to answer questions on degree requirements, graduation policies, and other questions related to CMU-Africa.
@@ -231,8 +339,8 @@ def get_personalized_system_prompt(user_info):
         - The input should be formatted as `<course_code> semester <semester_id>`.
 
     8. **RecommendationFilterTool**:
-        - If the user asks you to recommend courses for them. Use the recommendation filter tool to first retrieve the courses that match with the user's query. And from the list of courses, filter courses being offered in the current semester and recommend the courses. Second, Check the list of courses that the student has already done. 
-        - DO NOT recommend courses that a student has already completed in the profile. Use this tool whenever you need to recommend any courses. Provide a comprehensive report of the courses with all details as returned by the course search tool.
+        - If the user asks you to recommend courses for them, pass their request to this tool. It returns the courses offered in the current semester that the student has not completed, whose prerequisites they have completed and that are open to their program, best match to their request and interests first.
+        - DO NOT recommend courses that a student has already completed in the profile. Use this tool whenever you need to recommend any courses. Provide a comprehensive report of the recommended courses, with their details and reviews from the course_with_reviews tool.
 
     9. **show_degree_plan tool**:
         - If the user wants to view their plan, use this tool to display the current degree plan, listing all courses added so far by semester.
@@ -242,24 +350,18 @@ def get_personalized_system_prompt(user_info):
 
     """
 
+
+def get_personalized_prompt_variables(user_info):
+    profile = user_info['profile']
+    return {
+        "first_name": user_info['first_name'],
+        "program": profile['program'],
+        "starting_year": profile['starting_year'],
+        "interests": profile['interests'],
+        "previous_experience": profile['previous_experience'],
+    }
+
 # Define the tools
-def filter_prerequisites(prerequisites):
-    course_code_pattern = r'\b\d{2}-\d{3}(-[A-Za-z])?\b'  # Updated pattern to match 'xx-xxx' and 'xx-xxx-lx'
-    filtered_prerequisites = []
-    
-    # Check if prerequisites is a valid list
-    if isinstance(prerequisites, list):
-        for prereq in prerequisites:
-            # Skip if the prerequisite is NaN (not a number) or is an invalid type
-            if isinstance(prereq, float) and math.isnan(prereq):
-                continue  # Skip this entry
-            
-            # Check if the prerequisite is a valid string matching the course code format
-            valid_codes = re.findall(course_code_pattern, prereq)
-            if valid_codes:
-                filtered_prerequisites.extend(valid_codes)
-    
-    return filtered_prerequisites
 def determine_current_semester(profile):
     """
     Determine the current semester type (Fall or Spring) based on the courses completed.
@@ -272,56 +374,14 @@ def determine_current_semester(profile):
         return None  # Student has completed all semesters
     return "Spring" if semester_count % 2 == 0 else "Fall"
 
-def extract_course_codes(prerequisite_text):
-    """
-    Extract course codes from a prerequisite statement using regex.
-    A course code typically follows the pattern `XX-XXX` or `XX-XXX-XX`.
-
-    Args:
-        prerequisite_text (str): The prerequisite text.
+@functools.lru_cache(maxsize=1)
+def get_recommender(version):
+    """The recommender over the given course index version; rebuilt when a new one is published"""
+    return CourseRecommender.from_vector_store(course_catalog, vector_stores["courses"].get())
 
-    Returns:
-        list: A list of course codes found in the text.
-    """
-    if not isinstance(prerequisite_text, str) or not prerequisite_text.strip():
-        return []  # Return an empty list for NaN or empty prerequisites
-
-    # Regex pattern for course codes (e.g., 04-800, 18-731, 04-800-H)
-    course_code_pattern = r'\b\d{2}-\d{3}(?:-[A-Z0-9]+)?\b'
-    course_name_pattern = r"course_name:\s*(.+)"
-    course_code_pattern = r"course_code:\s*(\d{2}-\d{3})"
-    course_name = re.findall(course_name_pattern, prerequisite_text)
-    course_code = re.findall(course_code_pattern, prerequisite_text)
-    courses = []
-    for i in zip(course_name,course_code):
-        courses.append(i)
-    
-    # Find all matches
-    # course_codes = re.findall(course_code_pattern, prerequisite_text)
-    # return course_name, course_code
-    return courses
-def filter_available_courses(courses, completed_courses):
-    """
-    Given a list of retrieved courses and the set of completed courses, 
-    return only the courses that the student has not taken.
-    
-    Args:
-        retrieved_courses (list): List of course codes retrieved for the current semester.
-        completed_courses (set): Set of course codes the student has already completed.
 
-    Returns:
-        list: A list of available course codes.
-    """
-    for course in courses:
-        if course[1] in completed_courses:
-            courses.remove(course)
-    # return set([course for course in codes if course not in completed_courses])
-    course_names = []
-    for course in courses:
-        course_names.append(course[0])
-    return course_names
 @tool
-def RecommendationFilterTool(query):
+async def RecommendationFilterTool(query):
     '''Recommend courses for a student based on their current semester profile and completed courses'''
     logging.info("Entering RecommendationFilterTool\n")
     logging.info(f"Query ----- {query}")
@@ -332,30 +392,40 @@ def RecommendationFilterTool(query):
     profile = user_info.get("profile",{})
     current_semester = determine_current_semester(profile)
     logging.info(f"The student is in the {current_semester} semester")
-    # check completed courses from the course catalogue (invoke course retriever)
     if current_semester is None:
         return "The student has completed all semesters. No recommendations needed."
     complete_courses = [
         course['course_code'] for sem in profile.get('courses',{}).get('semesters',[])
-        
         for course in sem.get('courses',[]) if course['course_code']
     ]
     logging.info(f"Completed courses: {complete_courses}\n")
-    
-    raw_courses = course_retriever_tool.invoke({"query": query})
-    logging.info(f"Retrieved courses: {raw_courses}\n")
-    
-    courses = extract_course_codes(raw_courses)
-    logging.info(f"Extracted courses - {courses}")
-   
-    available_courses = filter_available_courses(courses, complete_courses)
-    logging.info(f"Recommended courses: {available_courses}\n")
-    
-    if not available_courses:
+
+    # Rank by what the student asked for and their profile interests together
+    texts = [text for text in (query, profile.get('interests')) if text]
+    try:
+        vectors = [np.asarray(vector) for vector in await embeddings.aembed_documents(texts)]
+        interests = np.mean([vector / (np.linalg.norm(vector) or 1) for vector in vectors], axis=0)
+    except Exception as e:
+        logging.error(f"Could not embed the student's interests: {e}")
+        return "Error: Could not rank courses for the student's interests right now. Please try again."
+
+    # Building the recommender (and loading the index) reads files, so it runs off the event loop
+    recommender = await asyncio.to_thread(get_recommender, vector_stores["courses"].version)
+    if interests.shape[0] != recommender.dimensions:
+        logging.error(f"Interest embedding has {interests.shape[0]} dimensions but the course index has "
+                      f"{recommender.dimensions}; rebuild it with `python ingest.py courses`")
+        return "Error: Course recommendations are unavailable because the course index does not match the embedding model."
+    recommendations = recommender.recommend(interests, current_semester, complete_courses, profile.get('program'))
+    logging.info(f"Recommended courses: {[r.course_code for r in recommendations]}\n")
+
+    if not recommendations:
         return "No new courses available to recommend for this semester."
-    
-    return f"Recommended courses for the current semester ({current_semester}). Use the following course names to retrieve their information: {', '.join(available_courses)}" 
-    
+
+    return (f"Recommended courses for the current semester ({current_semester}), best match first. "
+            f"Use course_with_reviews with their codes for details and student reviews:\n"
+            + "\n".join(json.dumps(asdict(recommendation)) for recommendation in recommendations))
+
+
 @tool
 def validate_course_addition(input: str) -> str:
     """Validates if a course can be added to the specified semester in the degree plan."""
@@ -374,45 +444,25 @@ def validate_course_addition(input: str) -> str:
         if not degree_plan:
             return "No degree plan found in the session. Please create or load a degree plan first."
 
-        validator = cl.user_session.get("validator")
-        
-        
-
-       
-        course_data = next(course for course in validator.courses_df.to_dict('records') if course['course_code'] == course_code)
-        
-        prereq = course_data.get('Prerequisites', [""])
-        
-        if not isinstance(prereq, list):
-            prereq = [prereq] if isinstance(prereq, str) else []
-        course = Course(
-            course_code=course_data['course_code'],
-            course_name=course_data['course_name'],
-            units=int(course_data['course_units']),
-            semester_availability=course_data['course_semester'],
-            prerequisites=filter_prerequisites(prereq),
-            program=course_data['Course discipline']
-        )
-        #print('HERE 4')
+        entry = course_catalog.get(course_code)
+        if entry is None:
+            return f"Course {course_code} was not found in the course catalog."
+        course = entry.to_course()
         print("Course data extracted")
 
-        prerequisites = course.prerequisites
-        
-        if prerequisites is None or (isinstance(prerequisites, float) and math.isnan(prerequisites)):
-            pass
-        else:
-            completed_courses = degree_plan.get_completed_courses(semester)
-            print(prerequisites, completed_courses)
-            for prereq in prerequisites:
-                print(prereq)
-                if prereq not in completed_courses:
-                    return f"Cannot add course {course_code}: Prerequisite {prereq} is not met. Please ensure the course is taken in an earlier semester."
+        completed_courses = degree_plan.completed_before(semester)
+        semester_plan = degree_plan.semester_plan(semester)
+        alongside = {course.course_code for course in semester_plan.courses} if semester_plan else set()
+        unmet = course_catalog.prerequisite_graph.missing(course_code, completed_courses, alongside)
+        if unmet:
+            return f"Cannot add course {course_code}: Prerequisites are not met. It needs {describe_unmet(unmet)}."
         print("Passed prerequisites check")
         
-        for sem in degree_plan.semesters:
-            if sem.semester == semester:
-                if course_code in [c.course_code for c in sem.courses]:
-                    return f"Course {course_code} is already added to {semester}."
+        # A course is taken once, so it may not already be in any semester of the plan, earlier or later
+        if degree_plan.has_course(course_code):
+            planned_in = [str(sem.semester) for sem in degree_plan.semesters
+                          if degree_plan.has_course(course_code, sem.semester)]
+            return f"Course {course_code} is already in the plan (semester {', '.join(planned_in)})."
         print("Passed course already added check")
         
        
@@ -426,28 +476,13 @@ def validate_course_addition(input: str) -> str:
 
        
         max_units_per_semester = 54
-        for sem in degree_plan.semesters:
-            print(f"Semester {sem.semester} - ")
-            if sem.semester == semester:
-                print("Semester found")
-                total_units = sem.total_units
-                print(f"Total units: {type(total_units)}")
-                print({type(course.units)})
-                print(f"Total units in semester {semester}: {total_units}")
-                print(f"Total units type {type(total_units)}")
-                if total_units + course.units > max_units_per_semester:
-                    return f"Cannot add course {course_code} to {semester}: Exceeds the maximum units allowed per semester ({max_units_per_semester} units)."
+        total_units = degree_plan.semester_units(semester)
+        print(f"Total units in semester {semester}: {total_units}")
+        if total_units + course.units > max_units_per_semester:
+            return f"Cannot add course {course_code} to {semester}: Exceeds the maximum units allowed per semester ({max_units_per_semester} units)."
 
         print("Passed max units check")
 
-        # Check if the course has been done in the past semesters
-        completed_courses = degree_plan.get_completed_courses( semester)
-        print(f" Completed courses - {list(completed_courses)}")
-        if course_code in completed_courses:
-            return f"Course {course_code} has already been completed in a previous semester."
-
-        print("Passed completed courses check")
-
         return f"The course {course_code} can be added to {semester}."
 
     except Exception as e:
@@ -468,30 +503,13 @@ def add_course_to_plan(input: str) -> str:
         degree_plan = cl.user_session.get("degree_plan")
 
         # Locate the course from the course catalog
-        validator = cl.user_session.get("validator")
-        course_data = next(course for course in validator.courses_df.to_dict('records') if course['course_code'] == course_code)
-        
-        course = Course(
-            course_code=course_data['course_code'],
-            course_name=course_data['course_name'],
-            units=int(course_data['course_units']),
-            semester_availability=course_data['course_semester'],
-            prerequisites=course_data.get('Prerequisites', ""),
-            program=course_data['Course discipline']
-        )
+        entry = course_catalog.get(course_code)
+        if entry is None:
+            return f"Course {course_code} was not found in the course catalog."
+        course = entry.to_course()
 
-        # Locate the appropriate semester in the degree plan
-        semester_found = False
-        for sem in degree_plan.semesters:
-            if sem.semester == semester:
-                sem.courses.append(course)
-                semester_found = True
-                break
-
-        if not semester_found:
-            # If semester not found, create a new SemesterPlan and add the course
-            new_semester = SemesterPlan( semester=semester, courses=[course])
-            degree_plan.semesters.append(new_semester)
+        # Add to the semester, creating it if the plan does not have it yet
+        degree_plan.add_course(semester, course)
 
         # Save updated degree plan in the session
         cl.user_session.set("degree_plan", degree_plan)
@@ -518,29 +536,13 @@ def remove_course_from_plan(input:str):
         degree_plan = cl.user_session.get("degree_plan")
 
         # Locate the course from the course catalog
-        validator = cl.user_session.get("validator")
-        course_data = next(course for course in validator.courses_df.to_dict('records') if course['course_code'] == course_code)
-        course = Course(
-            course_code=course_data['course_code'],
-            course_name=course_data['course_name'],
-            units=course_data['course_units'],
-            semester_availability=course_data['course_semester'],
-            prerequisites=course_data.get('Prerequisites', ""),
-            program=course_data['Course discipline']
-        )
+        entry = course_catalog.get(course_code)
+        if entry is None:
+            return f"Course {course_code} was not found in the course catalog."
+        course = entry.to_course()
 
-        # Locate the appropriate semester in the degree plan
-        semester_found = False
-        for sem in degree_plan.semesters:
-            if sem.semester == semester:
-                # Remove the course from the semester
-                for c in sem.courses:
-                    if c.course_code == course_code:
-                        sem.courses.remove(c)
-                        semester_found = True
-                        break
-                
-        if not semester_found:
+        # Remove the course from the semester
+        if degree_plan.remove_course(semester, course_code) is None:
             return f"Semester {semester} not found in the degree plan. No changes were made."
 
         # Save updated degree plan in the session
@@ -662,7 +664,7 @@ def export_degree_plan() -> str:
         return f"ERROR exporting degree plan: {str(e)}"
     
 @tool
-def save_degree_plan() -> str:
+async def save_degree_plan() -> str:
     """
     Saves the current degree plan in the user session to MongoDB using the provided API.
     """
@@ -741,7 +743,8 @@ def save_degree_plan() -> str:
 
         # Make a PUT request to update the user's profile in MongoDB
         api_url = f"http://localhost:5001/update_profile/{user_info['andrew_id']}"
-        response = requests.put(api_url, json=clean_data(degree_plan_data))
+        async with httpx.AsyncClient(timeout=BACKEND_TIMEOUT) as client:
+            response = await client.put(api_url, json=clean_data(degree_plan_data))
 
         if response.status_code == 200:
             return "Degree plan saved successfully!"
@@ -754,9 +757,59 @@ def save_degree_plan() -> str:
 
 
 # Chat start event
+# Tools available to the agent
+agent_tools = [
+    course_retriever_tool,
+    course_with_reviews,
+    student_reviews_retriever_tool,
+    handbook_retriever_tool,
+    validate_course_addition,
+    add_course_to_plan,
+    show_degree_plan,
+    save_degree_plan,
+    validate_full_degree_plan,
+    export_degree_plan,
+    remove_course_from_plan,
+    RecommendationFilterTool
+]
+
+AGENT_MODEL = "gpt-4o"
+
+
+@functools.lru_cache(maxsize=None)
+def get_agent_executor(model=AGENT_MODEL):
+    """
+    Build the tool-calling agent once per process and model.
+    The bound tool schemas and the prompt skeleton are shared by every session;
+    per-user details are filled in from the invoke inputs (see get_personalized_prompt_variables).
+    """
+    llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, model=model, temperature=0)
+    llm_with_tools = llm.bind_tools(agent_tools)
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT_TEMPLATE),
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("user", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+
+    agent = (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_openai_tool_messages(x["intermediate_steps"])
+        )
+        | prompt
+        | llm_with_tools
+        | OpenAIToolsAgentOutputParser()
+    )
+
+    logging.info(f"Built {model} agent executor with {len(agent_tools)} tools")
+    return AgentExecutor(agent=agent, tools=agent_tools, verbose=True)
+
+
 @cl.on_chat_start
 async def setup_chain():
     cl_data._data_layer=feedback.CustomDataLayer()
+    metrics.start_periodic_log(METRICS_LOG_INTERVAL, log_metrics)
     await cl.Message("Chainlit is ready. Please sign in to continue.").send()
 
     # Start polling for user sign-in
@@ -770,55 +823,61 @@ async def setup_chain():
     else:
         logging.info(f"User session initialized: {user_info}")
 
-
-    
-        # Initialize LLM and tools
-        llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, model="gpt-4o", temperature=0)
-        
-        tools = [
-            course_retriever_tool,
-            student_reviews_retriever_tool,
-            handbook_retriever_tool,
-            validate_course_addition,
-            add_course_to_plan,
-            show_degree_plan,
-            save_degree_plan,
-            validate_full_degree_plan,
-            export_degree_plan,
-            remove_course_from_plan,
-            RecommendationFilterTool
-        ]
-
-        llm_with_tools = llm.bind_tools(tools)
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", get_personalized_system_prompt(user_info)),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("user", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-
-        agent = (
-            {
-                "input": lambda x: x["input"],
-                "agent_scratchpad": lambda x: format_to_openai_tool_messages(
-                    x["intermediate_steps"]
-                ),
-                "chat_history": lambda x: x["chat_history"]
-            }
-            | prompt
-            | llm_with_tools
-            | OpenAIToolsAgentOutputParser()
-        )
-        
-        # Initialize agent executor
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
-
-        # Store user info and LLM chain in session
-        cl.user_session.set("llm_chain", agent_executor)
-        degreePlan = convert_user_info_to_degree_plan(user_info)
-        cl.user_session.set("degree_plan", degreePlan)
-        cl.user_session.set("validator", DegreeValidator(COURSE_DATA_PATH))
+async def stream_agent_response(llm_chain, inputs, thinking_msg, started):
+    """
+    Run the agent and stream its answer to the chat token by token, showing each
+    tool call as a step while it runs. Text streamed before a tool call is cleared,
+    and the message ends up as the agent's final output.
+    Returns the (not yet finalized) response message, the full output text and
+    the names of the tools that were called.
+    """
+    response_msg = cl.Message(content="")
+    tool_steps = {}
+    tools_used = set()
+    output = ""
+    first_token = True
+
+    async for event in llm_chain.astream_events(inputs, version="v2"):
+        kind = event["event"]
+
+        if kind == "on_chat_model_stream":
+            token = event["data"]["chunk"].content
+            if token:
+                if first_token:
+                    first_token = False
+                    ttft = time.perf_counter() - started
+                    time_to_first_token.observe(ttft)
+                    logging.info(f"Time to first token: {ttft:.2f}s")
+                    await thinking_msg.remove()
+                await response_msg.stream_token(token)
+
+        elif kind == "on_tool_start":
+            if response_msg.content:
+                # Text streamed before a tool call is the model thinking aloud, not the answer
+                response_msg.content = ""
+                await response_msg.update()
+            tools_used.add(event["name"])
+            step = cl.Step(name=event["name"], type="tool")
+            step.input = event["data"].get("input")
+            await step.send()
+            tool_steps[event["run_id"]] = step
+
+        elif kind == "on_tool_end":
+            step = tool_steps.pop(event["run_id"], None)
+            if step is not None:
+                step.output = str(event["data"].get("output", ""))
+                await step.update()
+
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            # The top-level AgentExecutor run has finished
+            output = event["data"]["output"]["output"]
+
+    if first_token:
+        # Nothing was streamed (e.g. the answer came from a tool); show it whole
+        await thinking_msg.remove()
+    # Show exactly what goes into the chat history
+    response_msg.content = output
+    return response_msg, output, tools_used
 
 @cl.on_message
 async def handle_message(message: cl.Message):
@@ -828,6 +887,7 @@ async def handle_message(message: cl.Message):
 
     user_info = cl.user_session.get("user_info")
     llm_chain = cl.user_session.get("llm_chain")
+    chat_history = cl.user_session.get("chat_history")
 
     # Block interaction if user info or llm_chain is not ready
     if not user_info or not llm_chain:
@@ -835,28 +895,48 @@ async def handle_message(message: cl.Message):
         return
 
     try:
+        started = time.perf_counter()
+
         # Show a "Thinking..." message while processing
         thinking_msg = cl.Message(content="Thinking...")
         await thinking_msg.send()
 
-        # Process the message through the LLM chain
-        result = await cl.make_async(llm_chain.invoke)({
+        prompt_variables = cl.user_session.get("prompt_variables", {})
+        history = chat_history.messages()
+        scope = response_cache_scope(cl.user_session.get("degree_plan"), prompt_variables, history)
+        version = knowledge_version()
+        try:
+            query_vector = await response_cache.embed(message.content)
+        except Exception as e:
+            logging.warning(f"Response cache unavailable, could not embed the query: {e}")
+            query_vector = None
+
+        cached = response_cache.lookup(query_vector, scope, version) if query_vector is not None else None
+        if cached is not None:
+            logging.info("Answered from the response cache")
+            await thinking_msg.remove()
+            await chat_history.add_turn(message.content, cached)
+            cl.user_session.set("last_query", message.content)
+            cl.user_session.set("last_response", cached)
+            await cl.Message(content=cached).send()
+            response_seconds.observe(time.perf_counter() - started)
+            return
+
+        # Run the agent natively async: LLM calls, retrievers and I/O tools are awaited
+        # on the event loop instead of tying up a worker thread for the whole run
+        response_msg, output, tools_used = await stream_agent_response(llm_chain, {
             "input": message.content,
-            "chat_history": chat_history
-        })
+            "chat_history": history,
+            **prompt_variables
+        }, thinking_msg, started)
 
         # Update chat history and send the result
-        chat_history.extend([HumanMessage(content=message.content), AIMessage(content=result["output"])])
+        await chat_history.add_turn(message.content, output)
         # Store the last query and response in the user session
         cl.user_session.set("last_query", message.content)
-        cl.user_session.set("last_response", result["output"])
+        cl.user_session.set("last_response", output)
 
-        await thinking_msg.remove()
-
-        if addDone == False and removeDone == False:
-            # send the actual response
-            await cl.Message(content=result["output"]).send()
-        else:
+        if addDone or removeDone:
             # Retrieve the degree plan from the session
             degree_plan_dict = cl.user_session.get("degree_plan").to_dict()
             fn = cl.CopilotFunction(name="planUpdate", args={"user_profile": degree_plan_dict})
@@ -865,7 +945,14 @@ async def handle_message(message: cl.Message):
             removeDone = False
             res = await fn.acall()
             print(f"RES: {res}")
-            await cl.Message(content=result["output"]).send()
+
+        # Finalize the streamed response (or send it whole if nothing was streamed)
+        await response_msg.send()
+        elapsed = time.perf_counter() - started
+        response_seconds.observe(elapsed)
+
+        if query_vector is not None and output and not tools_used & UNCACHEABLE_TOOLS:
+            response_cache.store(query_vector, scope, output, elapsed, version)
 
             # feedback_data = Feedback(forId="some-id", comment="Great response!", value=1)
             # data_layer = cl_data._data_layer
@@ -883,18 +970,13 @@ async def handle_message(message: cl.Message):
 
 
 async def wait_for_user_login(timeout=30):
-    retries = timeout
-    while retries > 0:
-        user_info = get_user_info()
-        if user_info:
-            logging.info(f"User profile retrieved: {user_info}")
-            return user_info
-        await asyncio.sleep(1)
-        retries -= 1
-        logging.info(f"Retrying user login... {retries} retries left.")
-
-    logging.error("Failed to retrieve user profile after maximum retries.")
-    return None
+    try:
+        user_info = await asyncio.wait_for(watch_for_user_sign_in(token=handoff_token_from_session()), timeout)
+        logging.info(f"User profile retrieved: {user_info}")
+        return user_info
+    except asyncio.TimeoutError:
+        logging.error(f"No user signed in within {timeout} seconds.")
+        return None
 
 def convert_user_info_to_degree_plan(user_info) -> DegreePlan:
     semesters = []
@@ -907,17 +989,19 @@ def convert_user_info_to_degree_plan(user_info) -> DegreePlan:
                 course_code = course['course_code']
 
                 # Retrieve course details from course catalog using course code
-                course_data = course_catalog_dict.get(course_code, {})
-
-                # Create Course object with the retrieved details
-                course_obj = Course(
-                    course_code=course_code,
-                    course_name=course_data.get('course_name', course['course_name']),
-                    units=int(course_data.get('course_units', 0)),  # Default to 0 if not found
-                    semester_availability=course_data.get('semester_availability', []),
-                    prerequisites=course_data.get('prerequisites', []),
-                    program=course_data.get('program', user_info['profile']['program'])
-                )
+                entry = course_catalog.get(course_code)
+
+                if entry is not None:
+                    course_obj = entry.to_course()
+                else:
+                    course_obj = Course(
+                        course_code=course_code,
+                        course_name=course['course_name'],
+                        units=0,  # Default to 0 if not found
+                        semester_availability=[],
+                        prerequisites=[],
+                        program=user_info['profile']['program']
+                    )
                 courses.append(course_obj)
 
         # Create a SemesterPlan object
@@ -0,0 +1,160 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from retrieval import course_code_of
+from validators.catalog import CourseCatalog
+
+# Course disciplines (the 'Course discipline' column) open to each program (Program values).
+# A course listing none of the known disciplines, such as 'Special Topics in ICT', is open to all.
+PROGRAM_DISCIPLINES = {
+    "IT": {"MSIT"},
+    "MSECE": {"ECE", "MS ECE"},
+    "MS_ECE_AD": {"ECE", "MS ECE"},
+    "EAI": {"MS EAI"},
+}
+KNOWN_DISCIPLINES = set().union(*PROGRAM_DISCIPLINES.values())
+
+
+def course_disciplines(program: str) -> frozenset:
+    """'ECE, MSIT, MS EAI' -> {'ECE', 'MSIT', 'MS EAI'}"""
+    return frozenset(part.strip() for part in (program or "").split(",") if part.strip())
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    course_code: str
+    course_name: str
+    units: Optional[int]
+    semesters: Tuple[str, ...]
+    prerequisites: Tuple[str, ...]
+    score: float  # Cosine similarity to the student's interests
+
+
+class CourseRecommender:
+    """
+    Deterministic course recommendations: no LLM call and no parsing of search results.
+    Candidates are the catalog courses offered in the semester, not yet completed, whose
+    prerequisite groups are all met and which are open to the student's program; they are
+    ranked by cosine similarity between the student's interests and the course's vector
+    (the mean of its vectors in the course index).
+
+    Every filter is a precomputed boolean array over the catalog, so a recommendation
+    costs a few vector operations over ~100 courses.
+    """
+
+    def __init__(self, catalog: CourseCatalog, vectors: Dict[str, np.ndarray]):
+        self.catalog = catalog
+        self.codes = catalog.codes
+        self._positions = {code: position for position, code in enumerate(self.codes)}
+
+        # Completed courses and prerequisites are columns: one per catalog course (either half
+        # of a cross-listed code such as 18-797/11-755 maps to it), then one per other code
+        columns = {}
+        for position, code in enumerate(self.codes):
+            columns[code] = position
+            for part in code.split("/"):
+                columns.setdefault(part.strip(), position)
+        width = len(self.codes)
+        for entry in catalog:
+            for code in entry.prerequisites:
+                if code not in columns:
+                    columns[code] = width
+                    width += 1
+        self._columns = columns
+        self._width = width
+        # One row per required prerequisite group (see validators.prerequisites): met by any of its codes
+        groups = [(position, group) for position, entry in enumerate(catalog)
+                  for group in entry.prerequisite_groups if not group.advisory]
+        self._groups = np.zeros((len(groups), width), dtype=bool)
+        self._group_courses = np.array([position for position, _ in groups], dtype=np.intp)
+        for row, (_, group) in enumerate(groups):
+            for code in group:
+                self._groups[row, columns[code]] = True
+
+        self._offered = defaultdict(lambda: np.zeros(len(self.codes), dtype=bool))
+        for position, entry in enumerate(catalog):
+            for semester in entry.semester_availability:
+                self._offered[semester][position] = True
+
+        disciplines = [course_disciplines(entry.program) for entry in catalog]
+        self._open_to = {
+            program: np.array([bool(found & allowed) or not (found & KNOWN_DISCIPLINES) for found in disciplines])
+            for program, allowed in PROGRAM_DISCIPLINES.items()
+        }
+
+        dimensions = len(next(iter(vectors.values()))) if vectors else 0
+        matrix = np.zeros((len(self.codes), dimensions), dtype=np.float32)
+        for code, vector in vectors.items():
+            if code in self._positions:
+                matrix[self._positions[code]] = vector
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._vectors = matrix / np.where(norms == 0, 1, norms)  # Courses without vectors score 0
+        missing = len(self.codes) - int((norms > 0).sum())
+        if missing:
+            logging.warning(f"{missing} catalog courses have no vector in the course index")
+
+    @classmethod
+    def from_vector_store(cls, catalog: CourseCatalog, vector_store) -> "CourseRecommender":
+        """Course vectors from a FAISS store of the course index (field chunks or whole rows)"""
+        index = vector_store.index
+        vectors = index.reconstruct_n(0, index.ntotal)
+        sums, counts = {}, defaultdict(int)
+        for position in range(index.ntotal):
+            document = vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+            code = course_code_of(document) if not isinstance(document, str) else None
+            if code:
+                sums[code] = sums.get(code, 0) + vectors[position]
+                counts[code] += 1
+        return cls(catalog, {code: total / counts[code] for code, total in sums.items()})
+
+    @property
+    def dimensions(self) -> int:
+        return self._vectors.shape[1]
+
+    def completed_mask(self, completed: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(self._width, dtype=bool)
+        for code in completed:
+            column = self._columns.get(code)
+            if column is not None:
+                mask[column] = True
+        return mask
+
+    def eligible(self, semester: str, completed: Iterable[str], program: Optional[str] = None) -> np.ndarray:
+        """Boolean array over the catalog: the courses the student can take in semester"""
+        done = self.completed_mask(completed)
+        eligible = self._offered[semester].copy()
+        eligible &= ~done[:len(self.codes)]
+        unmet = ~(self._groups & done).any(axis=1)
+        eligible &= np.bincount(self._group_courses[unmet], minlength=len(self.codes)) == 0
+        if program in self._open_to:
+            eligible &= self._open_to[program]
+        return eligible
+
+    def recommend(self, interests: np.ndarray, semester: str, completed: Iterable[str],
+                  program: Optional[str] = None, k: int = 5) -> List[Recommendation]:
+        """
+        The k eligible courses most similar to the interests vector, best first.
+        Ties keep catalog order, so the same inputs always give the same result.
+        """
+        eligible = np.flatnonzero(self.eligible(semester, completed, program))
+        if not len(eligible):
+            return []
+        norm = np.linalg.norm(interests)
+        scores = self._vectors[eligible] @ (np.asarray(interests, dtype=np.float32) / (norm or 1))
+        order = np.argsort(-scores, kind="stable")[:k]
+        recommendations = []
+        for position, score in zip(eligible[order], scores[order]):
+            entry = self.catalog[self.codes[position]]
+            recommendations.append(Recommendation(
+                course_code=entry.course_code,
+                course_name=entry.course_name,
+                units=entry.units,
+                semesters=entry.semester_availability,
+                prerequisites=entry.prerequisites,
+                score=round(float(score), 4),
+            ))
+        return recommendations
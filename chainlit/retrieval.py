@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from helper import course_chunk_body, load_file
+from utils import metrics
+from validators.catalog import COURSE_CODE_PATTERN
+
+# Course codes ('18-661', '04-800-af') are kept whole; everything else splits into words
+TOKEN_PATTERN = re.compile(r"\d{2}-\d{3}(?:-[a-z0-9]+)?|[a-z0-9]+")
+STOP_WORDS = {
+    "a", "an", "and", "are", "about", "as", "at", "be", "by", "can", "course", "courses", "do", "does",
+    "for", "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "tell", "that", "the",
+    "this", "to", "what", "which", "with",
+}
+
+# Besides the corpus's field names, the words a query may add to course codes and still be a
+# plain lookup of those courses ('18-661 prerequisites', 'Is 15-619 offered in the fall?')
+LOOKUP_WORDS = {
+    "between", "code", "compare", "details", "difference", "fall", "faculty", "format", "info", "information",
+    "instructor", "many", "name", "offered", "prereq", "prereqs", "prerequisite", "review", "reviews",
+    "semester", "semesters", "spring", "summer", "syllabus", "taught", "teaches", "unit", "units", "versus",
+    "vs", "when", "who", "workload",
+}
+CODE_TOKEN_PATTERN = re.compile(r"\d{2}-\d{3}(?:-[a-z0-9]+)?")
+
+# A course card shows at most CARD_SNIPPETS matching fields, cut to CARD_SNIPPET_CHARS each
+CARD_SNIPPETS = 2
+CARD_SNIPPET_CHARS = 400
+
+fast_path_hits = metrics.counter("course_search_fast_path_hits")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token)
+        if token.count("-") == 2:
+            # A section such as 04-800-af also matches its base code 04-800
+            tokens.append(token.rsplit("-", 1)[0])
+    return tokens
+
+
+def course_code_of(document: Document) -> Optional[str]:
+    code = document.metadata.get("course_code")
+    if code:
+        return code
+    match = re.search(r"^course_code: *(.+)$", document.page_content, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index"""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(list)  # term -> [(document number, term frequency)]
+        self._lengths = []
+        for number, text in enumerate(texts):
+            tokens = tokenize(text)
+            self._lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self._postings[term].append((number, frequency))
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def search(self, query: str, k: int) -> List[int]:
+        """Numbers of the k best-scoring documents, best first"""
+        scores = defaultdict(float)
+        count = len(self._lengths)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[number] / self._average_length)
+                scores[number] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Merge ranked lists of keys: each key scores the sum of 1 / (k + rank) over the lists it is in"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class CourseCorpus:
+    """
+    The course CSV as field chunks (see helper.load_course_chunks), with a BM25 index
+    over the chunks and a lookup of every course code (including each half of
+    cross-listed codes such as 18-797/11-755). Search results are compact course cards.
+    Loaded on first use and reloaded when the CSV changes.
+    """
+
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.chunks: List[Document] = []
+        self.courses: Dict[str, Dict[str, List[Document]]] = {}  # code -> field -> chunks
+        self._bm25 = None
+        self._lookup: Dict[str, str] = {}
+        self._lookup_words = set(LOOKUP_WORDS)
+
+    def get(self) -> "CourseCorpus":
+        mtime = os.stat(self.data_path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._load()
+                    self._mtime = mtime
+        return self
+
+    async def aget(self) -> "CourseCorpus":
+        """get for coroutines: the CSV is parsed and indexed in a worker thread"""
+        if self._mtime is not None and os.stat(self.data_path).st_mtime_ns == self._mtime:
+            return self
+        return await asyncio.to_thread(self.get)
+
+    def _load(self):
+        chunks = load_file(self.data_path, "course_csv")
+        courses = {}
+        for chunk in chunks:
+            fields = courses.setdefault(chunk.metadata["course_code"], {})
+            fields.setdefault(chunk.metadata["field"], []).append(chunk)
+        self._lookup = {}
+        for code in courses:
+            self._lookup[code.lower()] = code
+            for part in code.split("/"):
+                self._lookup.setdefault(part.strip().lower(), code)
+        self._bm25 = BM25Index([chunk.page_content for chunk in chunks])
+        self._lookup_words = LOOKUP_WORDS.union(*(tokenize(chunk.metadata["field"]) for chunk in chunks))
+        self.chunks, self.courses = chunks, courses
+        logging.info(f"Loaded {len(chunks)} chunks of {len(courses)} courses from {self.data_path}")
+
+    def mentioned_courses(self, query: str) -> List[str]:
+        """The known courses a query names by code, in order"""
+        mentioned = (code.lower() for code in COURSE_CODE_PATTERN.findall(query))
+        return list(dict.fromkeys(self._lookup[code] for code in mentioned if code in self._lookup))
+
+    def exact_matches(self, query: str) -> Optional[List[str]]:
+        """
+        The courses a query names by code, or None unless it is just a lookup of known courses:
+        every code in it is a course and every other word names a field or detail of one
+        ('18-661 learning objectives'). 'courses similar to 18-661' is not a lookup.
+        """
+        mentioned = [code.lower() for code in COURSE_CODE_PATTERN.findall(query)]
+        if not mentioned or any(code not in self._lookup for code in mentioned):
+            return None
+        if any(not CODE_TOKEN_PATTERN.fullmatch(token) and token not in self._lookup_words for token in tokenize(query)):
+            return None
+        return list(dict.fromkeys(self._lookup[code] for code in mentioned))
+
+    def lexical_search(self, query: str, k: int) -> List[Document]:
+        """The k best-matching chunks, best first"""
+        return [self.chunks[number] for number in self._bm25.search(query, k)]
+
+    def card(self, code: str, matched: List[Document] = ()) -> Document:
+        """
+        A short summary of a course: name, units, semesters and prerequisites, plus the
+        fields that matched the query (the start of the description if none did)
+        """
+        fields = self.courses[code]
+        overview = fields["Overview"][0]
+        lines = [f"{code}: {overview.metadata['course_name']}", course_chunk_body(overview)]
+        prerequisites = " ".join(course_chunk_body(chunk) for chunk in fields.get("Prerequisites", []))
+        lines.append(f"Prerequisites: {prerequisites or 'none listed'}")
+
+        snippets = []
+        for chunk in matched:
+            if chunk.metadata.get("field") not in ("Overview", "Prerequisites") and chunk.page_content not in (
+                    snippet.page_content for snippet in snippets):
+                snippets.append(chunk)
+        snippets = snippets[:CARD_SNIPPETS]
+        for chunk in snippets or fields.get("Description", [])[:1]:
+            text = course_chunk_body(chunk)
+            if len(text) > CARD_SNIPPET_CHARS:
+                text = text[:CARD_SNIPPET_CHARS].rsplit(" ", 1)[0] + " ..."
+            lines.append(f"{chunk.metadata['field']}: {text}")
+        return Document(page_content="\n".join(lines), metadata={"course_code": code, "source": self.data_path})
+
+
+class HybridCourseRetriever(BaseRetriever):
+    """
+    Course search combining BM25 and vector similarity over field chunks with reciprocal
+    rank fusion, returning one compact card per course. Lookups of known course codes are
+    answered from the corpus directly, without an embedding call; other queries naming
+    courses are ranked as usual, with the named courses first.
+    """
+
+    corpus: Any
+    vector_store: Any  # LazyVectorStore of the course index
+    k: int = 4
+    fetch_k: int = 30
+    rrf_k: int = 60
+
+    def _fast_path(self, corpus: CourseCorpus, query: str) -> Optional[List[Document]]:
+        codes = corpus.exact_matches(query)
+        if codes is None:
+            return None
+        fast_path_hits.inc()
+        # Show the fields the rest of the query asks about, e.g. '18-661 learning objectives'
+        matched = corpus.lexical_search(query, self.fetch_k)
+        return [corpus.card(code, [chunk for chunk in matched if chunk.metadata["course_code"] == code])
+                for code in codes]
+
+    def _fuse(self, corpus: CourseCorpus, query: str, vector_chunks: List[Document]) -> List[Document]:
+        matched = defaultdict(list)
+        rankings = []
+        for chunks in (corpus.lexical_search(query, self.fetch_k), vector_chunks):
+            ranking = []
+            for chunk in chunks:
+                code = course_code_of(chunk)
+                if code in corpus.courses:
+                    ranking.append(code)
+                    # Chunks from an index built before field chunking have no field to show
+                    if chunk.metadata.get("field"):
+                        matched[code].append(chunk)
+            rankings.append(list(dict.fromkeys(ranking)))
+        codes = reciprocal_rank_fusion(rankings, self.rrf_k)
+        # Courses the query names come first, e.g. 18-661 in 'courses similar to 18-661'
+        named = corpus.mentioned_courses(query)
+        codes = (named + [code for code in codes if code not in named])[:max(self.k, len(named))]
+        return [corpus.card(code, matched[code]) for code in codes]
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        corpus = self.corpus.get()
+        documents = self._fast_path(corpus, query)
+        if documents is not None:
+            return documents
+        vector_chunks = self.vector_store.get().similarity_search(query, k=self.fetch_k)
+        return self._fuse(corpus, query, vector_chunks)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        corpus = await self.corpus.aget()
+        documents = self._fast_path(corpus, query)
+        if documents is not None:
+            return documents
+        vector_store = await self.vector_store.aget()
+        vector_chunks = await vector_store.asimilarity_search(query, k=self.fetch_k)
+        return self._fuse(corpus, query, vector_chunks)
+
+
+async def course_reviews(course_retriever: BaseRetriever, review_retriever: BaseRetriever, courses: List[str]) -> str:
+    """
+    Course cards and student reviews of several courses at once. Every course is looked
+    up concurrently: its card first, then its reviews, searched by code and name.
+    A course named twice, or a review passage found for several courses, appears once.
+    """
+    async def lookup(course: str):
+        cards = await course_retriever.ainvoke(course)
+        if not cards:
+            return None, []
+        card = cards[0]
+        name = card.page_content.split("\n", 1)[0]  # '<code>: <name>'
+        try:
+            reviews = await review_retriever.ainvoke(name.replace(":", ""))
+        except Exception as e:
+            logging.warning(f"Review search for {name} failed: {e}")
+            reviews = None
+        return card, reviews
+
+    courses = list(dict.fromkeys(course.strip() for course in courses if course.strip()))
+    results = await asyncio.gather(*(lookup(course) for course in courses))
+
+    sections, shown_codes, shown_reviews = [], set(), {}
+    for course, (card, reviews) in zip(courses, results):
+        if card is None:
+            sections.append(f"{course}: not found in the course catalog.")
+            continue
+        code = card.metadata["course_code"]
+        if code in shown_codes:
+            continue
+        shown_codes.add(code)
+        if reviews is None:
+            sections.append(f"{card.page_content}\nStudent reviews: unavailable right now.")
+            continue
+        passages, also_under = [], []
+        for review in reviews:
+            first = shown_reviews.setdefault(review.page_content, code)
+            if first == code:
+                if review.page_content.strip() not in passages:
+                    passages.append(review.page_content.strip())
+            elif first not in also_under:
+                also_under.append(first)
+        lines = [card.page_content, "Student reviews:" if passages or also_under else "Student reviews: none found."]
+        lines.extend(passages)
+        if also_under:
+            lines.append(f"(Passages shown under {', '.join(also_under)} also matched this course.)")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nuser.proto\" \n\x0bUserRequest\x12\x11\n\tandrew_id\x18\x01 \x01(\t\"G\n\x08UserInfo\x12\x11\n\tandrew_id\x18\x01 \x01(\t\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x14\n\x0cprofile_json\x18\x03 \x01(\t21\n\x0bUserService\x12\"\n\x07GetUser\x12\x0c.UserRequest\x1a\t.UserInfob\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nuser.proto\"/\n\x0bUserRequest\x12\x11\n\tandrew_id\x18\x01 \x01(\t\x12\r\n\x05token\x18\x02 \x01(\t\"G\n\x08UserInfo\x12\x11\n\tandrew_id\x18\x01 \x01(\t\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x14\n\x0cprofile_json\x18\x03 \x01(\t2\\\n\x0bUserService\x12\"\n\x07GetUser\x12\x0c.UserRequest\x1a\t.UserInfo\x12)\n\x0cWatchSignIns\x12\x0c.UserRequest\x1a\t.UserInfo0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,9 +32,9 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'user_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_USERREQUEST']._serialized_start=14
-  _globals['_USERREQUEST']._serialized_end=46
-  _globals['_USERINFO']._serialized_start=48
-  _globals['_USERINFO']._serialized_end=119
-  _globals['_USERSERVICE']._serialized_start=121
-  _globals['_USERSERVICE']._serialized_end=170
+  _globals['_USERREQUEST']._serialized_end=61
+  _globals['_USERINFO']._serialized_start=63
+  _globals['_USERINFO']._serialized_end=134
+  _globals['_USERSERVICE']._serialized_start=136
+  _globals['_USERSERVICE']._serialized_end=228
 # @@protoc_insertion_point(module_scope)
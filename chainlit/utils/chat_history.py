@@ -0,0 +1,97 @@
+import logging
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+# Role and separator tokens OpenAI adds around every chat message
+TOKENS_PER_MESSAGE = 4
+
+_encoding = None
+
+
+def _get_encoding(model: str):
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            # tiktoken downloads its BPE files on first use; without them, estimate
+            logging.warning(f"Could not load the {model} tokenizer ({e}); estimating 4 characters per token")
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    encoding = _get_encoding(model)
+    if encoding:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(message: BaseMessage, model: str = "gpt-4o") -> int:
+    return TOKENS_PER_MESSAGE + count_tokens(message.content, model)
+
+
+class ChatHistory:
+    """
+    Conversation history of one chat session, bounded by a token budget.
+
+    The most recent turns that fit in max_tokens are kept verbatim. Older turns are
+    dropped or, when a summarizer is given, folded into a rolling summary that is
+    sent ahead of them. The summary counts towards the budget too.
+
+    summarizer is an async callable (previous_summary, dropped_messages) -> new summary;
+    it should keep the summary short, as it is sent with every turn.
+    """
+
+    def __init__(self, max_tokens: int = 2000, model: str = "gpt-4o",
+                 summarizer: Optional[Callable[[str, List[BaseMessage]], Awaitable[str]]] = None):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.summarizer = summarizer
+        self.summary = ""
+        self._summary_tokens = 0
+        self._turns = deque()  # (messages, tokens), oldest first
+        self._tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    @property
+    def tokens(self) -> int:
+        """Tokens the current window adds to the prompt"""
+        return self._tokens + self._summary_tokens
+
+    async def add_turn(self, user_text: str, ai_text: str):
+        turn = [HumanMessage(content=user_text), AIMessage(content=ai_text)]
+        tokens = sum(count_message_tokens(message, self.model) for message in turn)
+        self._turns.append((turn, tokens))
+        self._tokens += tokens
+
+        dropped = []
+        # Always keep the latest turn, even if it alone is over budget
+        while self.tokens > self.max_tokens and len(self._turns) > 1:
+            old_turn, old_tokens = self._turns.popleft()
+            self._tokens -= old_tokens
+            dropped.extend(old_turn)
+
+        if dropped and self.summarizer is not None:
+            try:
+                self.summary = await self.summarizer(self.summary, dropped)
+            except Exception as e:
+                logging.error(f"Could not summarize chat history: {e}")
+                return
+            # If the new summary is longer, the next turn makes room for it
+            self._summary_tokens = count_message_tokens(self._summary_message(), self.model)
+
+    def _summary_message(self) -> SystemMessage:
+        return SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")
+
+    def messages(self) -> List[BaseMessage]:
+        """The window to send as chat_history"""
+        window = [self._summary_message()] if self.summary else []
+        for turn, _ in self._turns:
+            window.extend(turn)
+        return window
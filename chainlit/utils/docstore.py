@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, Union
+
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+
+DOCSTORE_FILE = "docstore.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    position INTEGER PRIMARY KEY,  -- Row of the document's vector in the FAISS index
+    id TEXT NOT NULL UNIQUE,
+    page_content TEXT NOT NULL,
+    metadata TEXT NOT NULL         -- JSON
+)
+"""
+
+
+def write_docstore(path: str, index_to_docstore_id: Dict[int, str], docstore: Docstore):
+    """Write the documents of a FAISS vector store to a new SQLite docstore at path"""
+    db = sqlite3.connect(path)
+    try:
+        db.execute(SCHEMA)
+        rows = []
+        for position, doc_id in sorted(index_to_docstore_id.items()):
+            document = docstore.search(doc_id)
+            rows.append((position, doc_id, document.page_content, json.dumps(document.metadata)))
+        db.executemany("INSERT INTO documents VALUES (?, ?, ?, ?)", rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def read_docstore(path: str):
+    """Read a whole SQLite docstore into memory, as (index_to_docstore_id, InMemoryDocstore), for updating it"""
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = db.execute("SELECT position, id, page_content, metadata FROM documents ORDER BY position").fetchall()
+    finally:
+        db.close()
+    index_to_docstore_id = {position: doc_id for position, doc_id, _, _ in rows}
+    docstore = InMemoryDocstore({
+        doc_id: Document(page_content=page_content, metadata=json.loads(metadata))
+        for _, doc_id, page_content, metadata in rows
+    })
+    return index_to_docstore_id, docstore
+
+
+class SqliteDocstore(Docstore):
+    """
+    Read-only docstore that reads documents from SQLite on demand instead of
+    holding them all in memory. A query only decodes its top-k documents, and
+    the file's pages live in the OS page cache, shared by every worker process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that opened them
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return db
+
+    def search(self, search: str) -> Union[str, Document]:
+        row = self.db.execute("SELECT page_content, metadata FROM documents WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def ids_by_position(self) -> "PositionIndex":
+        return PositionIndex(self)
+
+
+class PositionIndex(Mapping):
+    """FAISS row -> document id, read from the docstore (the index_to_docstore_id of a FAISS store)"""
+
+    def __init__(self, docstore: SqliteDocstore):
+        self.docstore = docstore
+
+    def __getitem__(self, position: int) -> str:
+        row = self.docstore.db.execute("SELECT id FROM documents WHERE position = ?", (int(position),)).fetchone()
+        if row is None:
+            raise KeyError(position)
+        return row[0]
+
+    def __iter__(self) -> Iterator[int]:
+        return (row[0] for row in self.docstore.db.execute("SELECT position FROM documents ORDER BY position"))
+
+    def __len__(self) -> int:
+        return self.docstore.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
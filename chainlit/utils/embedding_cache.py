@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils import metrics
+
+
+class EmbeddingStore:
+    """
+    Persistent key-value store of embedding vectors (SQLite, float32 blobs)
+    with an in-memory LRU of the most recently used ones in front of it. The LRU holds
+    read-only float32 arrays and is bounded by their total size, memory_bytes (a
+    1536-dimension vector takes 6 KB, against ~50 KB as a list of Python floats).
+    Safe to share between threads; WAL mode lets several processes use one file.
+    """
+
+    def __init__(self, path: str, memory_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.memory_used = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._db.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch)
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)  # A read-only view of the blob
+                    found[key] = vector
+                    self._remember(key, vector)
+        return found
+
+    def put_many(self, items: Dict[str, Sequence[float]]):
+        blobs = {key: np.asarray(vector, dtype=np.float32).tobytes() for key, vector in items.items()}
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", blobs.items())
+            self._db.commit()
+            for key, blob in blobs.items():
+                self._remember(key, np.frombuffer(blob, dtype=np.float32))
+
+    def _remember(self, key: str, vector: np.ndarray):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self.memory_used -= previous.nbytes
+        self._memory[key] = vector
+        self.memory_used += vector.nbytes
+        while self.memory_used > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self.memory_used -= evicted.nbytes
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that never embeds the same text twice.
+
+    Vectors are keyed by a hash of the namespace (the embedding model) and the text,
+    so documents and queries share the cache and a changed model starts afresh.
+    Only the texts missing from the store are sent to the underlying model, in one batch.
+    """
+
+    def __init__(self, underlying: Embeddings, store: EmbeddingStore, namespace: Optional[str] = None):
+        self.underlying = underlying
+        self.store = store
+        self.namespace = namespace or getattr(underlying, "model", type(underlying).__name__)
+        self.hits = metrics.counter("embedding_cache_hits")
+        self.misses = metrics.counter("embedding_cache_misses")
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, texts: List[str]):
+        keys = [self._key(text) for text in texts]
+        found = self.store.get_many(list(dict.fromkeys(keys)))
+        # Each distinct missing text is embedded once, however often it repeats
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in found))
+        self.hits.inc(len(texts) - len(missing))
+        self.misses.inc(len(missing))
+        return keys, found, missing
+
+    def _save(self, missing: List[str], vectors: List[List[float]], found: Dict[str, np.ndarray]):
+        # Round to float32 now, so a vector is the same whether it was just embedded or read back
+        new = {self._key(text): np.asarray(vector, dtype=np.float32) for text, vector in zip(missing, vectors)}
+        self.store.put_many(new)
+        found.update(new)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        if missing:
+            logging.debug(f"Embedding {len(missing)} of {len(texts)} texts, the rest are cached")
+            self._save(missing, self.underlying.embed_documents(missing), found)
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._lookup([text])
+        if missing:
+            self._save(missing, [self.underlying.embed_query(text)], found)
+        return found[keys[0]].tolist()
+
+    # The async variants read and write the SQLite store in a worker thread, off the event loop
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = await asyncio.to_thread(self._lookup, texts)
+        if missing:
+            logging.debug(f"Embedding {len(missing)} of {len(texts)} texts, the rest are cached")
+            vectors = await self.underlying.aembed_documents(missing)
+            await asyncio.to_thread(self._save, missing, vectors, found)
+        return [found[key].tolist() for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = await asyncio.to_thread(self._lookup, [text])
+        if missing:
+            vector = await self.underlying.aembed_query(text)
+            await asyncio.to_thread(self._save, missing, [vector], found)
+        return found[keys[0]].tolist()
@@ -1,5 +1,5 @@
 import chainlit.data as cl_data
-import requests
+import httpx
 import logging
 from chainlit.types import Feedback
 
@@ -34,7 +34,8 @@ class CustomDataLayer(cl_data.BaseDataLayer):
             logging.info(f"Feedback saved: {feedback_payload}")
 
             # Optionally send feedback to a Flask API
-            response = requests.post("http://localhost:5001/add_feedback", json=feedback_payload, headers={"Content-Type": "application/json"})
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.post("http://localhost:5001/add_feedback", json=feedback_payload, headers={"Content-Type": "application/json"})
             response.raise_for_status()
             logging.info("Feedback successfully sent to the backend.")
             return "Feedback stored successfully!"
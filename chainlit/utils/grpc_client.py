@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+
+import grpc
+import user_pb2_grpc
+
+GRPC_TARGET = 'localhost:50051'
+
+# Keep the HTTP/2 connection warm between calls and back off (instead of hammering)
+# while the backend is down. The backend allows pings at this rate, see serve_grpc.
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.initial_reconnect_backoff_ms", 500),
+    ("grpc.min_reconnect_backoff_ms", 500),
+    ("grpc.max_reconnect_backoff_ms", 10000),
+]
+
+
+class UserServiceClient:
+    """
+    Process-wide connection to the backend UserService.
+
+    The channel and stub are created on first use and then shared by every call,
+    so each RPC reuses one HTTP/2 connection instead of handshaking again.
+    `stub` is for blocking code; `aio_stub` is the grpc.aio equivalent for coroutines.
+    """
+
+    def __init__(self, target: str = GRPC_TARGET, options=CHANNEL_OPTIONS):
+        self.target = target
+        self.options = list(options)
+        self._lock = threading.Lock()
+        self._channel = None
+        self._stub = None
+        self._aio_channel = None
+        self._aio_stub = None
+        self._aio_loop = None
+
+    @property
+    def stub(self) -> user_pb2_grpc.UserServiceStub:
+        if self._stub is None:
+            with self._lock:
+                if self._stub is None:
+                    logging.info(f"Opening gRPC channel to {self.target}")
+                    self._channel = grpc.insecure_channel(self.target, options=self.options)
+                    self._stub = user_pb2_grpc.UserServiceStub(self._channel)
+        return self._stub
+
+    @property
+    def aio_stub(self) -> user_pb2_grpc.UserServiceStub:
+        """Stub on a grpc.aio channel; must be used from a coroutine on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._aio_stub is None or self._aio_loop is not loop:
+            with self._lock:
+                if self._aio_stub is None or self._aio_loop is not loop:
+                    # aio channels are bound to the loop that created them
+                    if self._aio_channel is not None:
+                        self._close_stale_aio_channel()
+                    logging.info(f"Opening async gRPC channel to {self.target}")
+                    self._aio_channel = grpc.aio.insecure_channel(self.target, options=self.options)
+                    self._aio_stub = user_pb2_grpc.UserServiceStub(self._aio_channel)
+                    self._aio_loop = loop
+        return self._aio_stub
+
+    def _close_stale_aio_channel(self):
+        """Close the aio channel of a previous event loop, on that loop if it still runs"""
+        channel, loop = self._aio_channel, self._aio_loop
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(channel.close(), loop)
+        else:
+            # The loop has stopped, so close() can never be awaited there; release the core channel
+            channel._channel.close()
+
+    def close(self):
+        with self._lock:
+            if self._channel is not None:
+                self._channel.close()
+            self._channel = None
+            self._stub = None
+
+    async def aclose(self):
+        if self._aio_channel is not None:
+            await self._aio_channel.close()
+        self._aio_channel = None
+        self._aio_stub = None
+        self._aio_loop = None
+
+
+# Shared by everything in the Chainlit process
+user_service = UserServiceClient()
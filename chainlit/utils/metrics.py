@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def summary(self) -> Dict:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Count and total of all observations, plus percentiles over the most recent `window` of them"""
+
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self._recent.append(value)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total = self.count, self.total
+        if not recent:
+            return {"count": 0}
+
+        def percentile(fraction):
+            return recent[min(len(recent) - 1, int(fraction * len(recent)))]
+
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "max": recent[-1],
+        }
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = factory(name)
+        return metric
+
+
+def counter(name: str) -> Counter:
+    return _get_or_create(name, Counter)
+
+
+def histogram(name: str) -> Histogram:
+    return _get_or_create(name, Histogram)
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Current value of every registered metric, keyed by name"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {metric.name: metric.summary() for metric in metrics}
+
+
+def log_snapshot(level=logging.INFO):
+    for name, summary in snapshot().items():
+        logging.log(level, f"metric {name}: {summary}")
+
+
+_periodic_log = None
+
+
+def start_periodic_log(interval: float, report=log_snapshot):
+    """
+    Call report (by default, log every metric) each `interval` seconds from a task on the
+    running event loop. Only the first call starts it; an interval of 0 or less disables it.
+    """
+    global _periodic_log
+    if interval <= 0 or (_periodic_log is not None and not _periodic_log.done()):
+        return
+
+    async def log_forever():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                report()
+            except Exception as e:
+                logging.warning(f"Could not log metrics: {e}")
+
+    _periodic_log = asyncio.get_running_loop().create_task(log_forever())
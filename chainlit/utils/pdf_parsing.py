@@ -0,0 +1,17 @@
+"""
+Page text extraction for the process pool in helper.load_pdfs. Kept apart from helper
+and its dependencies, so spawned worker processes unpickle their tasks cheaply.
+"""
+from typing import List
+
+import pypdf
+
+
+def page_count(path: str) -> int:
+    return len(pypdf.PdfReader(path).pages)
+
+
+def extract_pages(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of a PDF, extracted as PyPDFLoader does"""
+    reader = pypdf.PdfReader(path)
+    return [reader.pages[number].extract_text(extraction_mode="plain") for number in range(start, stop)]
@@ -0,0 +1,105 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+
+from utils import metrics
+
+
+class SemanticResponseCache:
+    """
+    Agent answers keyed by the meaning of the question.
+
+    An answer is reused when a new question's embedding is at least `threshold`
+    cosine-similar to a cached one with the same scope (any hashable; the app
+    uses the plan state, the student's details and the conversation so far, so
+    an answer is never reused for a different plan, student or conversation).
+    Entries expire after ttl_seconds; past max_entries the least recently used
+    entry is evicted. Everything is dropped when the knowledge version (catalog
+    and vector indexes) changes.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.95, ttl_seconds: float = 3600.0,
+                 max_entries: int = 1000, clock=time.monotonic):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # entry id -> (scope, vector, answer, seconds, expires_at), LRU first
+        self._ids_by_scope = {}  # scope -> ids of its entries
+        self._next_id = 0
+        self._version = None
+
+        self.hits = metrics.counter("response_cache_hits")
+        self.misses = metrics.counter("response_cache_misses")
+        self.seconds_saved = metrics.histogram("response_cache_seconds_saved")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(await self.embeddings.aembed_query(query), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, vector: np.ndarray, scope: Hashable, version: Hashable = None) -> Optional[str]:
+        """The cached answer closest to vector within scope, or None if none is similar enough"""
+        self._check_version(version)
+        self._evict_expired()
+
+        ids = list(self._ids_by_scope.get(scope, ()))
+        if ids:
+            similarities = np.stack([self._entries[entry_id][1] for entry_id in ids]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                entry_id = ids[best]
+                self._entries.move_to_end(entry_id)
+                _, _, answer, seconds, _ = self._entries[entry_id]
+                self.hits.inc()
+                self.seconds_saved.observe(seconds)
+                return answer
+
+        self.misses.inc()
+        return None
+
+    def store(self, vector: np.ndarray, scope: Hashable, answer: str, seconds: float, version: Hashable = None):
+        """Cache answer, which took the agent `seconds` to produce"""
+        self._check_version(version)
+        while len(self._entries) >= self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (scope, vector, answer, seconds, self._clock() + self.ttl_seconds)
+        self._ids_by_scope.setdefault(scope, set()).add(entry_id)
+
+    def invalidate(self):
+        if self._entries:
+            logging.info(f"Dropping {len(self._entries)} cached responses")
+        self._entries.clear()
+        self._ids_by_scope.clear()
+
+    def _check_version(self, version: Hashable):
+        if version != self._version:
+            self.invalidate()
+            self._version = version
+
+    def _discard(self, entry_id: int):
+        scope = self._entries.pop(entry_id)[0]
+        ids = self._ids_by_scope[scope]
+        ids.discard(entry_id)
+        if not ids:
+            del self._ids_by_scope[scope]
+
+    def _evict_expired(self):
+        now = self._clock()
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry[4] <= now]
+        for entry_id in expired:
+            self._discard(entry_id)
+
+    def stats(self) -> Tuple[float, float]:
+        """(hit rate, total seconds saved) since start"""
+        hits, misses = self.hits.value, self.misses.value
+        return (hits / (hits + misses) if hits + misses else 0.0), self.seconds_saved.total
@@ -0,0 +1,105 @@
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from .models import Course
+from .prerequisites import PrerequisiteGraph, PrerequisiteGroups, parse_prerequisite_groups
+
+# Matches 'xx-xxx' as well as suffixed codes such as '04-800-AF' or '18-787-K3'
+COURSE_CODE_PATTERN = re.compile(r'\b\d{2}-\d{3}(?:-[A-Za-z0-9]+)?\b')
+
+
+def parse_semesters(text) -> Tuple[str, ...]:
+    """Split a 'Fall, Spring' style availability string into its semesters"""
+    if not isinstance(text, str):
+        return ()
+    return tuple(part.strip() for part in text.split(",") if part.strip())
+
+
+def parse_units(value) -> Optional[int]:
+    """Return the course units as an int, or None for non-numeric values such as 'Variable'"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    course_code: str
+    course_name: str
+    units: Optional[int]
+    semester_availability: Tuple[str, ...]
+    prerequisites: Tuple[str, ...]  # Every code in prerequisite_groups
+    prerequisite_groups: PrerequisiteGroups
+    prerequisites_text: str
+    program: str
+
+    def to_course(self) -> Course:
+        """Build a fresh (mutable) Course for use in a degree plan"""
+        return Course(
+            course_code=self.course_code,
+            course_name=self.course_name,
+            units=self.units if self.units is not None else 0,  # Variable-unit courses count as 0
+            semester_availability=list(self.semester_availability),
+            prerequisites=list(self.prerequisites),
+            program=self.program
+        )
+
+
+class CourseCatalog:
+    """
+    Immutable, code-indexed view of the course catalog with pre-parsed fields and the
+    prerequisite graph. Raises PrerequisiteCycleError if prerequisites form a cycle.
+    """
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self._entries = MappingProxyType({entry.course_code: entry for entry in entries})
+        self.prerequisite_graph = PrerequisiteGraph(
+            {code: entry.prerequisite_groups for code, entry in self._entries.items()})
+
+    @classmethod
+    def from_csv(cls, course_data_path: str) -> "CourseCatalog":
+        return cls.from_dataframe(pd.read_csv(course_data_path))
+
+    @classmethod
+    def from_dataframe(cls, courses_df: pd.DataFrame) -> "CourseCatalog":
+        entries = []
+        for row in courses_df.to_dict('records'):
+            prerequisites_text = row.get('Prerequisites')
+            if not isinstance(prerequisites_text, str):
+                prerequisites_text = ""
+            groups = parse_prerequisite_groups(prerequisites_text)
+            entries.append(CatalogEntry(
+                course_code=row['course_code'],
+                course_name=row['course_name'],
+                units=parse_units(row['course_units']),
+                semester_availability=parse_semesters(row['course_semester']),
+                prerequisites=tuple(dict.fromkeys(code for group in groups for code in group)),
+                prerequisite_groups=groups,
+                prerequisites_text=prerequisites_text,
+                program=row['Course discipline']
+            ))
+        return cls(entries)
+
+    def get(self, course_code: str, default=None) -> Optional[CatalogEntry]:
+        return self._entries.get(course_code, default)
+
+    def __getitem__(self, course_code: str) -> CatalogEntry:
+        return self._entries[course_code]
+
+    def __contains__(self, course_code) -> bool:
+        return course_code in self._entries
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def codes(self) -> Tuple[str, ...]:
+        return tuple(self._entries)
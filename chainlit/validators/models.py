@@ -1,6 +1,8 @@
+from collections import Counter
+from collections.abc import Set as AbstractSet
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 import numpy as np
 
 class Semester(Enum):
@@ -24,31 +26,127 @@ class Course:
 
 @dataclass
 class SemesterPlan:
-    semester: str
+    semester: int
     courses: List[Course]
     
     @property
     def total_units(self) -> int:
         return sum(int(course.units) for course in self.courses)
 
+class CompletedCourses(AbstractSet):
+    """
+    Live, read-only set of the course codes a plan has in semesters before a given one.
+    Membership is a lookup in the plan's aggregates; nothing is copied.
+    """
+
+    def __init__(self, taken: Dict[str, Counter], before):
+        self._taken = taken
+        self._before = before
+
+    def __contains__(self, course_code) -> bool:
+        return any(semester < self._before for semester in self._taken.get(course_code, ()))
+
+    def __iter__(self) -> Iterator[str]:
+        return (course_code for course_code in list(self._taken) if course_code in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
 @dataclass
 class DegreePlan:
+    """
+    A student's plan: its SemesterPlans in the order given, which are never reordered or merged.
+    Running aggregates (units per semester number, units and semesters of every course code)
+    are built once here and updated in O(1) by add_course / remove_course, so change
+    courses through those rather than editing SemesterPlan.courses directly.
+    """
     student_id: str
     program: Program
     semesters: List[SemesterPlan]
-    
+
+    def __post_init__(self):
+        self._by_semester: Dict[int, List[SemesterPlan]] = {}  # semester -> its SemesterPlans, in plan order
+        self._semester_units: Dict = {}
+        self._total_units = 0
+        self._course_units: Counter = Counter()  # course code -> units over the whole plan
+        self._taken: Dict[str, Counter] = {}  # course code -> {semester: times taken}
+        for semester in self.semesters:
+            self._by_semester.setdefault(semester.semester, []).append(semester)
+            self._semester_units.setdefault(semester.semester, 0)
+            for course in semester.courses:
+                self._count(semester.semester, course, 1)
+
+    def _count(self, semester, course: Course, sign: int):
+        units = sign * int(course.units)
+        self._semester_units[semester] += units
+        self._total_units += units
+        self._course_units[course.course_code] += units
+        times = self._taken.setdefault(course.course_code, Counter())
+        times[semester] += sign
+        if not times[semester]:
+            del times[semester]
+            if not times:
+                del self._taken[course.course_code]
+                del self._course_units[course.course_code]
+
     @property
     def total_units(self) -> int:
-        return sum(sem.total_units for sem in self.semesters)
-    
-    def get_completed_courses(self, up_to_semester: str) -> Set[str]:
-        """Get all completed course codes up to a specific semester"""
-        completed = set()
-        for semester in self.semesters:
-            completed.update(course.course_code for course in semester.courses)
-        print(f"Completed courses in the degree plan: {completed}")
-        return completed
-        
+        return self._total_units
+
+    def semester_plan(self, semester) -> Optional[SemesterPlan]:
+        """The plan's courses in semester; a semester listed more than once comes back as one new SemesterPlan"""
+        semester_plans = self._by_semester.get(semester)
+        if not semester_plans or len(semester_plans) == 1:
+            return semester_plans[0] if semester_plans else None
+        return SemesterPlan(semester=semester, courses=[course for plan in semester_plans for course in plan.courses])
+
+    def semester_units(self, semester) -> int:
+        return self._semester_units.get(semester, 0)
+
+    def add_course(self, semester, course: Course) -> SemesterPlan:
+        """Add course to semester, creating the semester if the plan does not have it yet"""
+        semester_plans = self._by_semester.get(semester)
+        if semester_plans:
+            semester_plan = semester_plans[0]
+        else:
+            semester_plan = SemesterPlan(semester=semester, courses=[])
+            self._by_semester[semester] = [semester_plan]
+            self._semester_units[semester] = 0
+            # Before the first later semester, so a plan in semester order stays in order
+            index = next((index for index, sem in enumerate(self.semesters) if sem.semester > semester),
+                         len(self.semesters))
+            self.semesters.insert(index, semester_plan)
+        semester_plan.courses.append(course)
+        self._count(semester, course, 1)
+        return semester_plan
+
+    def remove_course(self, semester, course_code: str) -> Optional[Course]:
+        """Remove course_code from semester; returns the removed course, or None if it is not there"""
+        if not self.has_course(course_code, semester):
+            return None
+        for semester_plan in self._by_semester[semester]:
+            for index, course in enumerate(semester_plan.courses):
+                if course.course_code == course_code:
+                    del semester_plan.courses[index]
+                    self._count(semester, course, -1)
+                    return course
+
+    def has_course(self, course_code: str, semester=None) -> bool:
+        """Whether the plan has course_code at all, or in semester if given"""
+        times = self._taken.get(course_code)
+        return bool(times) and (semester is None or semester in times)
+
+    def units_in(self, course_codes: Iterable[str]) -> int:
+        """Units of the plan's courses whose code is one of course_codes"""
+        return sum(self._course_units.get(course_code, 0) for course_code in dict.fromkeys(course_codes))
+
+    def completed_before(self, semester) -> CompletedCourses:
+        """Course codes in semesters before semester, as a live set view"""
+        return CompletedCourses(self._taken, semester)
+
+    def get_completed_courses(self, up_to_semester) -> Set[str]:
+        """Get all completed course codes before a specific semester"""
+        return set(self.completed_before(up_to_semester))
     def to_dict(self) -> Dict:
 
         def clean_data(data):
@@ -0,0 +1,259 @@
+import functools
+import re
+from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import AbstractSet, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Codes in the catalog's prerequisite text are often glued to the preceding word
+# ('Ethical Hacking18-731', 'successful completion of04-800-H'), so only digits may not precede them
+PREREQUISITE_CODE_PATTERN = re.compile(r'(?<![\d-])\d{2}-\d{3}(?:-[A-Za-z0-9]+)?\b')
+# Everything after one of these is not a prior requirement: anti-requisites, exclusions,
+# recommendations and corequisites (taken in the same semester)
+NOT_REQUIRED_PATTERN = re.compile(
+    r'anti-?requisite|co-?requisite|not for students|not suitable|cannot take|no prerequisite|recommended',
+    re.IGNORECASE)
+# 'Any of the following ...': every code listed is an alternative
+ANY_OF_PATTERN = re.compile(r'any of the following|one of the following|either', re.IGNORECASE)
+# Lower-case connectives, which may also be glued to neighbouring words ('(18-631)andCyber')
+OR_PATTERN = re.compile(r'(?<![a-z])or(?![a-z])')
+AND_PATTERN = re.compile(r'(?<![a-z])and(?![a-z])')
+# A way to meet a group other than a course, joined to it by 'or' ('04-801-T3 ...or by permission
+# of the instructor', 'Background or hands-on experience ..., or successful completion of04-800-H'),
+# or offered instead of it ('Alternatively, ...', 'instructor's [consent]'). Only text without a
+# code or an 'and' may separate the 'or' from the alternative.
+_NON_COURSE = r'(?:permission|consent|experience|background|similar|equivalent)'
+_SAME_CLAUSE = r'(?:(?!(?<![a-z])and(?![a-z])|\d{2}-\d{3})[^.\n])*?'
+ALTERNATIVE_PATTERN = re.compile(
+    rf'(?:(?<![a-z])or|or(?=\s+by\s)){_SAME_CLAUSE}\b{_NON_COURSE}'
+    rf'|\b{_NON_COURSE}{_SAME_CLAUSE}(?<![a-z])or(?![a-z])'
+    r'|\balternatively\b|\binstructor.s\b',
+    re.IGNORECASE)
+# '(may be taken concurrently)': the group is also met by a course in the same semester
+CONCURRENT_PATTERN = re.compile(r'concurrent', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PrerequisiteGroup:
+    """
+    Alternative courses, any one of which meets the group. A concurrent group may also be
+    met in the same semester; an advisory group can be met without a course (experience,
+    the instructor's permission, a similar class), so it is shown but never enforced.
+    """
+    codes: Tuple[str, ...]
+    advisory: bool = False
+    concurrent: bool = False
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+# Prerequisites in conjunctive normal form: every group must be met by completing any one of its codes
+PrerequisiteGroups = Tuple[PrerequisiteGroup, ...]
+
+
+def describe_unmet(groups: Iterable[PrerequisiteGroup]) -> str:
+    """Unmet groups as text: '18-631 and 04-623 or 04-720 in an earlier semester'"""
+    parts = []
+    for concurrent, when in ((False, "in an earlier semester"), (True, "in the same or an earlier semester")):
+        alternatives = [' or '.join(group) for group in groups if group.concurrent == concurrent]
+        if alternatives:
+            parts.append(f"{' and '.join(alternatives)} {when}")
+    return ' and '.join(parts)
+
+
+def parse_prerequisite_groups(text) -> PrerequisiteGroups:
+    """
+    Parse a free-text prerequisite statement into AND-ed groups of alternative courses:
+    'Introduction to Information Security (18-631)andCyber Defense (04-623)orEthical Hacking (04-720)'
+    -> groups of ('18-631',) and ('04-623', '04-720'). 'or' binds tighter than 'and'; codes
+    with no connective between them are all required. Each group is flagged from the text
+    around its codes (up to the 'and' or the code starting the next group).
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ()
+    cut = NOT_REQUIRED_PATTERN.search(text)
+    if cut:
+        text = text[:cut.start()]
+    matches = list(PREREQUISITE_CODE_PATTERN.finditer(text))
+    if not matches:
+        return ()
+    if ANY_OF_PATTERN.search(text[:matches[0].start()]):
+        spans = [(list(dict.fromkeys(match.group() for match in matches)), text)]
+    else:
+        spans, start = [[[matches[0].group()], 0]], 0
+        for previous, match in zip(matches, matches[1:]):
+            between = text[previous.end():match.start()]
+            connective = AND_PATTERN.search(between)
+            if OR_PATTERN.search(between) and not connective:
+                spans[-1][0].append(match.group())
+            else:
+                end = previous.end() + (connective.start() if connective else len(between))
+                spans[-1][1], start = text[start:end], end
+                spans.append([[match.group()], None])
+        spans[-1][1] = text[start:]
+
+    unique = {}
+    for codes, span in spans:
+        group = PrerequisiteGroup(tuple(dict.fromkeys(codes)), advisory=bool(ALTERNATIVE_PATTERN.search(span)),
+                                  concurrent=bool(CONCURRENT_PATTERN.search(span)))
+        unique.setdefault(group, None)
+    return tuple(unique)
+
+
+class PrerequisiteCycleError(ValueError):
+    """Raised when courses require each other, directly or through other courses"""
+
+    def __init__(self, cycle: Sequence[str]):
+        self.cycle = tuple(cycle)
+        super().__init__(f"Prerequisite cycle: {' -> '.join(self.cycle)}")
+
+
+class PrerequisiteGraph:
+    """
+    Prerequisite DAG of the catalog, built once: each course's AND/OR groups, the direct
+    edges both ways, a topological order and the transitive closure in both directions.
+    Edges point from a course to every course named in its groups (any alternative), so
+    the closure is everything a course can depend on.
+    """
+
+    def __init__(self, groups: Mapping[str, PrerequisiteGroups]):
+        self.groups = MappingProxyType(dict(groups))
+        requires = {code: frozenset(c for group in course_groups for c in group)
+                    for code, course_groups in self.groups.items()}
+        unlocks: Dict[str, set] = {}
+        for code, prerequisites in requires.items():
+            for prerequisite in prerequisites:
+                unlocks.setdefault(prerequisite, set()).add(code)
+        self.requires = MappingProxyType(requires)
+        self.unlocks = MappingProxyType({code: frozenset(courses) for code, courses in unlocks.items()})
+        self.order = self._topological_order()
+
+        # Prerequisites come first in self.order, so one pass in order (and one in reverse) closes both ways
+        closure: Dict[str, frozenset] = {}
+        for code in self.order:
+            closure[code] = frozenset().union(
+                *({prerequisite} | closure.get(prerequisite, frozenset()) for prerequisite in requires.get(code, ())))
+        unlocked: Dict[str, frozenset] = {}
+        for code in reversed(self.order):
+            unlocked[code] = frozenset().union(
+                *({course} | unlocked.get(course, frozenset()) for course in unlocks.get(code, ())))
+        self.all_requires = MappingProxyType(closure)
+        self.all_unlocks = MappingProxyType(unlocked)
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        """Every code (courses and the codes they name), prerequisites before the courses needing them"""
+        nodes = set(self.requires) | set(self.unlocks)
+        waiting = {code: len(self.requires.get(code, ())) for code in nodes}
+        ready = deque(sorted(code for code, count in waiting.items() if count == 0))
+        order = []
+        while ready:
+            code = ready.popleft()
+            order.append(code)
+            for course in sorted(self.unlocks.get(code, ())):
+                waiting[course] -= 1
+                if waiting[course] == 0:
+                    ready.append(course)
+        if len(order) < len(nodes):
+            raise PrerequisiteCycleError(self._find_cycle({code for code, count in waiting.items() if count}))
+        return tuple(order)
+
+    def _find_cycle(self, remaining: AbstractSet[str]) -> List[str]:
+        # Every remaining course still waits on another remaining one, so walking those edges must loop
+        path, seen = [], {}
+        code = min(remaining)
+        while code not in seen:
+            seen[code] = len(path)
+            path.append(code)
+            code = min(prerequisite for prerequisite in self.requires[code] if prerequisite in remaining)
+        return path[seen[code]:] + [code]
+
+    def missing(self, code: str, completed: AbstractSet[str],
+                alongside: AbstractSet[str] = frozenset()) -> List[PrerequisiteGroup]:
+        """
+        The required groups of code's prerequisites that completed does not meet; concurrent
+        groups are also met by alongside (the courses taken in the same semester). Advisory
+        groups are never missing.
+        """
+        return [group for group in self.groups.get(code, ()) if not group.advisory and completed.isdisjoint(group)
+                and (not group.concurrent or alongside.isdisjoint(group))]
+
+    def is_satisfied(self, code: str, completed: AbstractSet[str], alongside: AbstractSet[str] = frozenset()) -> bool:
+        return not self.missing(code, completed, alongside)
+
+    def plan_issues(self, semesters: Iterable[Iterable[str]]) -> List[Tuple[int, str, List[PrerequisiteGroup]]]:
+        """
+        (semester index, course, unmet groups) for every course in a plan (course codes by
+        semester, in order) whose prerequisites are not completed in an earlier semester
+        (or, for concurrent groups, the same one)
+        """
+        issues, completed = [], set()
+        for index, courses in enumerate(semesters):
+            courses = list(courses)
+            alongside = set(courses)
+            for code in courses:
+                unmet = self.missing(code, completed, alongside)
+                if unmet:
+                    issues.append((index, code, unmet))
+            completed.update(courses)
+        return issues
+
+    @functools.cached_property
+    def _group_table(self):
+        """
+        Every course's required groups as rows of a (-1 padded) matrix of alternative numbers,
+        with whether each row is concurrent, for batch checks
+        """
+        alternatives = {code: number for number, code in enumerate(
+            sorted({code for groups in self.groups.values() for group in groups for code in group}))}
+        rows, first = [], {}
+        for code, groups in self.groups.items():
+            required = [group for group in groups if not group.advisory]
+            if required:
+                first[code] = (len(rows), len(required))
+                rows.extend(required)
+        table = np.full((len(rows), max(map(len, rows), default=1)), -1, dtype=np.intp)
+        for number, group in enumerate(rows):
+            table[number, :len(group)] = [alternatives[code] for code in group]
+        concurrent = np.array([group.concurrent for group in rows], dtype=np.intp)
+        return alternatives, rows, first, table, concurrent
+
+    def batch_plan_issues(self, plans: Sequence[int], semesters: Sequence[int], code_numbers: Sequence[int],
+                          codes: Sequence[str]) -> List[Tuple[int, List[PrerequisiteGroup]]]:
+        """
+        plan_issues for many plans at once. Plans are given as one row per course: plan
+        number, semester number (any ordering number, e.g. the plan's) and course code (a number into codes,
+        which lists each distinct code once). Returns (row, unmet groups) for every row whose
+        prerequisites are not completed in an earlier semester of the same plan (or, for
+        concurrent groups, the same one), in row order.
+        """
+        alternatives, rows, first, table, concurrent = self._group_table
+        plans, semesters = np.asarray(plans, dtype=np.intp), np.asarray(semesters, dtype=np.intp)
+        code_numbers = np.asarray(code_numbers, dtype=np.intp)
+        if not len(code_numbers) or not rows:
+            return []
+
+        # Earliest semester of each alternative in each plan; the extra last column stays at
+        # 'never', so the -1 padding in the table reads it
+        earliest = np.full((plans.max() + 1, len(alternatives) + 1), np.iinfo(np.intp).max, dtype=np.intp)
+        alternative = np.array([alternatives.get(code, -1) for code in codes], dtype=np.intp)[code_numbers]
+        named = alternative >= 0
+        np.minimum.at(earliest, (plans[named], alternative[named]), semesters[named])
+
+        # One check per (row, group of the row's course)
+        spans = np.array([first.get(code, (0, 0)) for code in codes], dtype=np.intp).reshape(-1, 2)[code_numbers]
+        checked = np.repeat(np.arange(len(code_numbers)), spans[:, 1])
+        group = spans[checked, 0] + np.arange(len(checked)) - np.repeat(np.cumsum(spans[:, 1]) - spans[:, 1], spans[:, 1])
+        # A concurrent group is met one semester later: in the course's own semester
+        deadline = semesters[checked] + concurrent[group]
+        met = (earliest[plans[checked, None], table[group]] < deadline[:, None]).any(axis=1)
+
+        issues: Dict[int, List[PrerequisiteGroup]] = {}
+        for row, unmet in zip(checked[~met].tolist(), group[~met].tolist()):
+            issues.setdefault(row, []).append(rows[unmet])
+        return list(issues.items())
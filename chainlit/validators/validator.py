@@ -1,20 +1,75 @@
+import copy
+import operator
+import threading
+import numpy as np
 import pandas as pd
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, List, Sequence
 from .models import DegreePlan, Course
+from .catalog import CourseCatalog
+from .prerequisites import describe_unmet
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of _freeze, producing plain (mutable) dicts and lists"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
 
 
 class DegreeValidator:
     MIN_SEMESTER_UNITS = 36
     MAX_SEMESTER_UNITS = 54
 
+    _shared_instances = {}
+    _shared_lock = threading.Lock()
+
     def __init__(self, course_data_path: str):
         """Initialize validator with course data and program requirements"""
         self.courses_df = pd.read_csv(course_data_path)
+        self.catalog = CourseCatalog.from_dataframe(self.courses_df)
         self._init_program_requirements()
 
+    @classmethod
+    def shared(cls, course_data_path: str) -> "DegreeValidator":
+        """
+        Return the process-wide validator for course_data_path.
+        The CSV is parsed once per process; every session shares the same catalog.
+        """
+        validator = cls._shared_instances.get(course_data_path)
+        if validator is None:
+            with cls._shared_lock:
+                validator = cls._shared_instances.get(course_data_path)
+                if validator is None:
+                    validator = cls(course_data_path)
+                    cls._shared_instances[course_data_path] = validator
+        return validator
+
+    def with_program_requirements(self, program: str, **overrides) -> "DegreeValidator":
+        """
+        Copy-on-write: return a validator that shares this one's course data but
+        uses its own copy of the requirements for program, updated with overrides.
+        """
+        requirements = _thaw(self.program_requirements)
+        requirements.setdefault(program, {}).update(overrides)
+        clone = copy.copy(self)
+        clone.program_requirements = _freeze(requirements)
+        return clone
+
     def _init_program_requirements(self):
-        """Initialize detailed program requirements"""
-        self.program_requirements = {
+        """Initialize detailed program requirements (read-only, shared by all sessions)"""
+        self.program_requirements = _freeze({
             "MSIT": {
                 "min_units": 144,
                 "core_units": 60,
@@ -53,14 +108,13 @@ class DegreeValidator:
                 "project_units": 24,
                 "project_areas": ["04-651", "04-950", "04-653"]
             }
-        }
+        })
 
     def validate_full_plan(self, plan: DegreePlan) -> Dict:
         """
         Validates the entire degree plan against program requirements.
         Returns a detailed validation report.
         """
-        print("HERE-1 in validate_full_plan")
         program_reqs = self.program_requirements[plan.program.value]
         validation_report = {
             "is_valid": True,
@@ -73,20 +127,24 @@ class DegreeValidator:
             "semester_analysis": []
         }
 
-        # Initialize trackers
-        total_units = 0
-        core_units = 0
-        project_units = 0
-        core_courses_completed = set()
-        project_courses_completed = set()
-        missing_core_courses = {}
-
-        print("Starting validation")
-
-        # Analyze each semester
+        # Totals come from the plan's running aggregates, so they cost O(requirements), not O(courses)
+        total_units = plan.total_units
+        core_sections = program_reqs.get("core_sections", {})
+        core_units = sum(plan.units_in(courses) for courses in core_sections.values())
+        core_courses_completed = {course_code for courses in core_sections.values()
+                                  for course_code in courses if plan.has_course(course_code)}
+        project_areas = program_reqs.get("project_areas", [])
+        project_units = plan.units_in(project_areas)
+        project_courses_completed = {course_code for course_code in project_areas if plan.has_course(course_code)}
+
+        graph = self.catalog.prerequisite_graph
         for semester_index, semester in enumerate(plan.semesters):
-            semester_units = semester.total_units
-            total_units += semester_units
+            # A semester listed more than once comes back merged: its courses are taken together,
+            # but each entry reports only its own units
+            merged = plan.semester_plan(semester.semester)
+            semester_units = plan.semester_units(semester.semester) if merged is semester else semester.total_units
+            completed = plan.completed_before(semester.semester)
+            alongside = {course.course_code for course in merged.courses}
 
             # Analyze courses in semester
             semester_analysis = {
@@ -103,21 +161,12 @@ class DegreeValidator:
                     "units": course.units
                 })
 
-                # Check if the course is a core course and track core units
-                for section, courses in program_reqs.get("core_sections", {}).items():
-                    if course.course_code in courses:
-                        core_units += course.units
-                        core_courses_completed.add(course.course_code)
-                        #break  # Prevent double-counting in multiple sections
-                    print('Core courses completed:', core_courses_completed)
-
-                # Check if the course is a project course and track project units
-                if course.course_code in program_reqs.get("project_areas", []):
-                    project_units += int(course.units)
-                    project_courses_completed.add(course.course_code)
-                    print('Project courses completed:', project_courses_completed)
-
-            print("This is the first dummy print")
+                # Prerequisites must be completed in an earlier semester of the plan
+                unmet = graph.missing(course.course_code, completed, alongside)
+                if unmet:
+                    validation_report["warnings"].append(
+                        f"Semester {semester_index + 1}: {course.course_code} needs {describe_unmet(unmet)}"
+                    )
 
             # Validate semester units
             if semester_units < self.MIN_SEMESTER_UNITS:
@@ -127,7 +176,6 @@ class DegreeValidator:
                 validation_report["issues"].append(
                     f"Semester {semester_index + 1} has insufficient units ({semester_units})"
                 )
-                print ("This is the second dummy print")
 
             elif semester_units > self.MAX_SEMESTER_UNITS:
                 semester_analysis["issues"].append(
@@ -136,7 +184,6 @@ class DegreeValidator:
                 validation_report["issues"].append(
                     f"Semester {semester_index + 1} has too many units ({semester_units})"
                 )
-                print ("This is the third dummy print")
 
             validation_report["semester_analysis"].append(semester_analysis)
 
@@ -178,6 +225,137 @@ class DegreeValidator:
 
         return validation_report
 
+    def validate_plans(self, plans: Sequence[DegreePlan]) -> List[Dict]:
+        """
+        Validates many degree plans at once, e.g. a cohort after a catalog or requirements change.
+        Returns validate_full_plan's report for every plan, in order. Plans are encoded as one
+        row per planned course; units, requirement coverage and prerequisites are then computed
+        for all plans together with NumPy, and only the reports' messages are built per plan.
+        """
+        plans = list(plans)
+        program_reqs = [self.program_requirements[plan.program.value] for plan in plans]
+
+        # One row per course, in plan and semester order: code, units, and via np.repeat the
+        # semester number across all plans, the plan number and the position in the plan
+        course_code, course_units = operator.attrgetter("course_code"), operator.attrgetter("units")
+        codes, units, semester_sizes, semester_numbers = [], [], [], []
+        for plan in plans:
+            for semester in plan.semesters:
+                codes.extend(map(course_code, semester.courses))
+                units.extend(map(course_units, semester.courses))
+                semester_sizes.append(len(semester.courses))
+                semester_numbers.append(semester.semester)
+        plan_sizes = [len(plan.semesters) for plan in plans]
+        semester_count = len(semester_sizes)
+        semester_rows = np.repeat(np.arange(semester_count), semester_sizes)
+        plan_rows = np.repeat(np.arange(len(plans)), plan_sizes)[semester_rows]
+        positions = (np.arange(semester_count) - np.repeat(np.cumsum(plan_sizes) - plan_sizes, plan_sizes))[semester_rows]
+        units = np.array(units, dtype=np.int64)
+        code_numbers, code_names = pd.factorize(np.array(codes, dtype=object))
+        total_units = np.bincount(plan_rows, units, len(plans)).astype(np.int64).tolist()
+        semester_units = np.bincount(semester_rows, units, semester_count).astype(np.int64).tolist()
+
+        # Course-membership and unit matrices over the codes the plans' programs require
+        programs = {id(reqs): reqs for reqs in program_reqs}
+        required = {}
+        for reqs in programs.values():
+            for courses in reqs.get("core_sections", {}).values():
+                required.update(dict.fromkeys(courses))
+            required.update(dict.fromkeys(reqs.get("project_areas", [])))
+        column = {code: number for number, code in enumerate(required)}
+        columns = np.array([column.get(code, -1) for code in code_names], dtype=np.intp)[code_numbers]
+        rows = columns >= 0
+        present = np.zeros((len(plans), len(column)), dtype=bool)
+        present[plan_rows[rows], columns[rows]] = True
+        unit_matrix = np.zeros((len(plans), len(column)), dtype=np.int64)
+        np.add.at(unit_matrix, (plan_rows[rows], columns[rows]), units[rows])
+
+        # Per program, how many core sections list each code (a course counts once per section)
+        # and which codes are project courses; each plan gets its program's row
+        core_weights = np.zeros((len(programs), len(column)), dtype=np.int64)
+        project_weights = np.zeros((len(programs), len(column)), dtype=np.int64)
+        for number, reqs in enumerate(programs.values()):
+            for courses in reqs.get("core_sections", {}).values():
+                core_weights[number, [column[code] for code in dict.fromkeys(courses)]] += 1
+            project_weights[number, [column[code] for code in reqs.get("project_areas", [])]] = 1
+        program_number = {key: number for number, key in enumerate(programs)}
+        program_rows = np.fromiter((program_number[id(reqs)] for reqs in program_reqs), dtype=np.intp, count=len(plans))
+        core_weights, project_weights = core_weights[program_rows], project_weights[program_rows]
+        core_units = (unit_matrix * core_weights).sum(axis=1).tolist()
+        project_units = (unit_matrix * project_weights).sum(axis=1).tolist()
+
+        required = list(required)
+        core_completed = [set() for _ in plans]
+        for number, code in zip(*(axis.tolist() for axis in np.nonzero(present & (core_weights > 0)))):
+            core_completed[number].add(required[code])
+        project_completed = [set() for _ in plans]
+        for number, code in zip(*(axis.tolist() for axis in np.nonzero(present & (project_weights > 0)))):
+            project_completed[number].add(required[code])
+
+        prerequisite_warnings = [[] for _ in plans]
+        graph = self.catalog.prerequisite_graph
+        # Prerequisites follow the semester numbers; the list order of the semesters may differ
+        issues = graph.batch_plan_issues(plan_rows, np.repeat(np.array(semester_numbers, dtype=np.intp), semester_sizes),
+                                         code_numbers, list(code_names))
+        flagged = [row for row, _ in issues]
+        for number, semester_index, code, (_, unmet) in zip(
+                plan_rows[flagged].tolist(), positions[flagged].tolist(), [codes[row] for row in flagged], issues):
+            prerequisite_warnings[number].append(f"Semester {semester_index + 1}: {code} needs {describe_unmet(unmet)}")
+
+        reports = []
+        semester_number = 0
+        for number, plan in enumerate(plans):
+            report = {
+                "is_valid": True,
+                "total_units": 0,
+                "core_units": 0,
+                "elective_units": 0,
+                "issues": [],
+                "warnings": prerequisite_warnings[number],
+                "requirements_met": {},
+                "semester_analysis": []
+            }
+            for semester_index, semester in enumerate(plan.semesters):
+                units_taken = semester_units[semester_number]
+                semester_number += 1
+                semester_analysis = {
+                    "semester_index": semester_index + 1,
+                    "units": units_taken,
+                    "courses": [{"code": course.course_code, "name": course.course_name, "units": course.units}
+                                for course in semester.courses],
+                    "issues": []
+                }
+                if units_taken < self.MIN_SEMESTER_UNITS:
+                    semester_analysis["issues"].append(
+                        f"Insufficient units in semester {semester_index + 1}: {units_taken}/{self.MIN_SEMESTER_UNITS}"
+                    )
+                    report["issues"].append(f"Semester {semester_index + 1} has insufficient units ({units_taken})")
+                elif units_taken > self.MAX_SEMESTER_UNITS:
+                    semester_analysis["issues"].append(
+                        f"Too many units in semester {semester_index + 1}: {units_taken}/{self.MAX_SEMESTER_UNITS}"
+                    )
+                    report["issues"].append(f"Semester {semester_index + 1} has too many units ({units_taken})")
+                report["semester_analysis"].append(semester_analysis)
+
+            if plan.program.value == "MSECE":
+                self._validate_msece_requirements(report, total_units[number], core_completed[number])
+            elif plan.program.value == "EAI":
+                self._validate_mseai_requirements(report, total_units[number], core_units[number],
+                                                  project_units[number], core_completed[number],
+                                                  project_completed[number])
+
+            report["is_valid"] = len(report["issues"]) == 0
+            report["total_units"] = total_units[number]
+            report["core_units"] = core_units[number]
+            report["project_units"] = project_units[number]
+            report["elective_units"] = total_units[number] - (core_units[number] + project_units[number])
+            reports.append(report)
+        return reports
+
+    def _get_course_name(self, course_code: str) -> str:
+        entry = self.catalog.get(course_code)
+        return entry.course_name if entry is not None else "Unknown course"
+
     def _validate_msece_requirements(self, report: Dict, total_units: int, core_courses_completed: set):
         """Validate MSECE specific requirements"""
         reqs = self.program_requirements["MSECE"]
@@ -254,20 +432,15 @@ class DegreeValidator:
             if not completed_in_section:
                 # Collect missing courses for this section
                 missing_courses = [
-                    f"{course} - {self.courses_df.loc[self.courses_df['course_code'] == course, 'course_name'].values[0]}"
+                    f"{course} - {self._get_course_name(course)}"
                     for course in courses
                     if course not in core_courses_completed
                 ]
                 missing_sections.append(section)
-                print('Missing sections:', missing_sections)
                 # Append a detailed issue for the section
                 report["issues"].append(
                     f"Missing course(s) from section '{section}': Choose one from {', '.join(missing_courses)}"
                 )
-            else:
-                print(f"Section '{section}' validated with completed courses: {', '.join(completed_in_section)}")
-
-        print('Missing sections:', missing_sections)
 
         # Log the overall missing sections
         if missing_sections:
@@ -279,7 +452,7 @@ class DegreeValidator:
         missing_project_courses = set(reqs["project_areas"]) - project_courses_completed
         if missing_project_courses:
             for missing_course in missing_project_courses:
-                course_name = self.courses_df.loc[self.courses_df['course_code'] == missing_course, 'course_name'].values[0]
+                course_name = self._get_course_name(missing_course)
                 report["issues"].append(
                     f"Missing project course: {missing_course} - {course_name}"
                 )
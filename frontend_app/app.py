@@ -49,6 +49,7 @@ app.layout = dmc.MantineProvider(
                 dcc.Store(id='login-status', data=None, storage_type='session'),  # For tracking login status
                 dcc.Store(id='registration-status', data=None, storage_type='session'),  # For tracking registration status
                 dcc.Store(id='user-profile', data=None, storage_type='session'),  # For tracking registered courses
+                dcc.Store(id='chainlit-access-token', data=None, storage_type='session'),  # For mounting the Chainlit widget
             ]
         )
     ]   
@@ -57,16 +58,17 @@ app.layout = dmc.MantineProvider(
 
 @callback(
     [Output('login-status', 'data', allow_duplicate=True),
-    Output('registration-status', 'data', allow_duplicate=True)],
+    Output('registration-status', 'data', allow_duplicate=True),
+    Output('chainlit-access-token', 'data', allow_duplicate=True)],
     Input('logout-button', 'n_clicks'),
     prevent_initial_call=True
 )
 def logout_callback(logout_click: int):
 
     if logout_click > 0:
-        return {'status': 'logged_out'}, {'status': 'logged_out'}
+        return {'status': 'logged_out'}, {'status': 'logged_out'}, None
     else:
-        return dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update, dash.no_update
 
 
 @callback(
@@ -154,5 +156,14 @@ clientside_callback(
 )
 
 
+clientside_callback(
+    ClientsideFunction(
+        namespace='chainlit',
+        function_name='mount_widget'
+    ),
+    Input("chainlit-access-token", "data"),
+)
+
+
 if __name__ == "__main__":
     app.run_server(debug=True, port= 8050)
\ No newline at end of file
@@ -1,6 +1,19 @@
-window.mountChainlitWidget({
-  // chainlitServer: "http://172.29.104.127:8000",
-  chainlitServer: "http://localhost:8000",
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+
+  chainlit: {
+    // Mount the copilot once signed in: the access token carries the /signin
+    // handoff token the Chainlit session claims the user's sign-in with
+    mount_widget: function (accessToken) {
+      window.unmountChainlitWidget();
+      if (accessToken) {
+        window.mountChainlitWidget({
+          // chainlitServer: "http://172.29.104.127:8000",
+          chainlitServer: "http://localhost:8000",
+          accessToken: accessToken,
+        });
+      }
+    }
+  }
 });
   
 
@@ -17,4 +30,4 @@ window.addEventListener("chainlit-call-fn", (e) => {
     // callback("You sent: " + JSON.stringify((args.user_profile)));
     callback("You sent: ");
   }
-});
\ No newline at end of file
+});
@@ -1,8 +1,14 @@
+import os
 import requests
+import jwt
+from datetime import datetime, timedelta, timezone
 
 # BASE_URL = "http://172.29.104.127:5001"  # Flask backend API URL
 BASE_URL = "http://localhost:5001"  # Flask backend API URL
 
+# Shared with the Chainlit app, which runs with CHAINLIT_CUSTOM_AUTH=true
+CHAINLIT_AUTH_SECRET = os.getenv("CHAINLIT_AUTH_SECRET")
+
 # Function for sign-up request
 def sign_up_user(payload: dict) -> dict:
     """
@@ -40,6 +46,31 @@ def sign_in_user(payload: dict) -> dict:
     return response
 
 
+# Function for the Chainlit widget's access token
+def chainlit_access_token(andrew_id: str, handoff_token: str) -> str:
+    """
+    Signs the access token the Chainlit copilot widget is mounted with. It carries the
+    /signin handoff token, which the Chainlit session uses to claim this user's sign-in.
+
+    Args:
+        andrew_id (str): The Andrew ID of the signed-in user.
+        handoff_token (str): The handoff token returned by the sign-in endpoint.
+
+    Returns:
+        str: A JWT signed with CHAINLIT_AUTH_SECRET, as Chainlit's custom auth expects.
+    """
+    if not CHAINLIT_AUTH_SECRET:
+        raise RuntimeError("CHAINLIT_AUTH_SECRET is not set; use the same value as the Chainlit app")
+
+    payload = {
+        "identifier": andrew_id,
+        "metadata": {"handoff_token": handoff_token},
+        "exp": datetime.now(timezone.utc) + timedelta(days=1),
+    }
+
+    return jwt.encode(payload, CHAINLIT_AUTH_SECRET, algorithm="HS256")
+
+
 # Function for fetching feedack data
 def get_feedback_data() -> dict:
     """
@@ -8,7 +8,7 @@ from dash_iconify import DashIconify
 from dash import Output, Input, State, callback
 
 
-from backend_client import sign_in_user
+from backend_client import sign_in_user, chainlit_access_token
 import pandas as pd
 
 dash.register_page(__name__)
@@ -74,7 +74,8 @@ layout = dmc.Center(
 @callback(
     [Output(component_id="login-status", component_property="data", allow_duplicate=True),
      Output(component_id="sign-in-notifications-container", component_property="children"),
-     Output(component_id="user-profile", component_property="data")],
+     Output(component_id="user-profile", component_property="data"),
+     Output(component_id="chainlit-access-token", component_property="data")],
     Input('login-button', 'n_clicks'),
     State('id-input', 'value'),
     State('password-input', 'value'),
@@ -87,6 +88,7 @@ def handle_login(login_click: int, id: str, password: str):
 
         notification = None
         login_status = None
+        access_token = None
 
         payload = {
             "andrew_ID": id,
@@ -111,6 +113,8 @@ def handle_login(login_click: int, id: str, password: str):
                     icon=DashIconify(icon="ic:round-check"),
                 )
                 profile = construct_user_courses("assets/all_courses_data.csv", response_json)
+                # The Chainlit widget claims this sign-in with the handoff token
+                access_token = chainlit_access_token(id, response_json["handoff_token"])
 
             else:
                 notification = dmc.Notification(
@@ -136,9 +140,9 @@ def handle_login(login_click: int, id: str, password: str):
 
             profile = None
 
-        return login_status, notification, profile
+        return login_status, notification, profile, access_token
     
-    return dash.no_update, dash.no_update, dash.no_update
+    return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 
 def construct_user_courses(course_file_path: str, payload_response) -> dict: